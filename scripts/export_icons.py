@@ -0,0 +1,10 @@
+"""
+互換用の入口: midlab_icons/export_icons.py の main() を実行する（python3 -m midlab_icons export と同じ）
+"""
+
+import sys
+
+from midlab_icons.export_icons import main
+
+if __name__ == "__main__":
+    sys.exit(main())
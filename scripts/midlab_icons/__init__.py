@@ -0,0 +1,8 @@
+"""
+MidLab のアイコン・スプラッシュ生成パイプライン
+
+サブコマンドは cli.py（python3 -m midlab_icons）から、各処理は
+process_icons / generate_icons / export_icons などのモジュールから直接使える。
+numpy・scipy・Pillow は各モジュールで遅延 import しているので、
+パッケージや CLI の import だけでは読み込まれない。
+"""
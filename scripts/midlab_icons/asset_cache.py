@@ -0,0 +1,237 @@
+"""
+アイコン生成・処理スクリプト共通のインクリメンタルビルドキャッシュ
+
+出力ファイルごとに「入力のハッシュ + ステージのパラメータ + 関数バージョン」
+から作ったキーを記録し、キーが変わっていない出力は再生成をスキップする。
+
+キャッシュは出力ディレクトリ内の JSON（デフォルト: .icon-cache.json）に保存する。
+出力ファイルが外部で変更・削除された場合（サイズ・mtime の不一致）はミス扱い。
+
+MemoryLRU は長時間動くプロセス（watch モード）用のメモリ内キャッシュで、
+デコード済みのソースやエンコード済みの出力を同じキーで保持する。
+SingleFlight は同じキーの同時計算を1回にまとめる（preview / store のスレッドで共有する描画用）。
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+CACHE_FILENAME = ".icon-cache.json"
+CACHE_FORMAT = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """ファイル内容の SHA-256（大きなソース画像もチャンクで読む）"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def _function_source(func):
+    # 複数ステージが同じカーネルに依存するので、トークナイズは関数ごとに1回だけ
+    # （watch モードでモジュールを読み直すと新しい関数オブジェクトになり、古いものは追い出される）
+    return inspect.getsource(func)
+
+
+def function_version(*funcs):
+    """関数のソースコードから作るバージョン文字列（コード変更で自動的に無効化）"""
+    h = hashlib.sha256()
+    for func in funcs:
+        h.update(func.__qualname__.encode())
+        h.update(_function_source(func).encode())
+    return h.hexdigest()[:16]
+
+
+def module_version(*modules):
+    """
+    モジュール全体のソースと大文字の定数の現在値から作るバージョン文字列。
+    関数の外にある幾何の定数や内部ヘルパーを変えた場合、実行時に定数を書き換えた場合も無効化する。
+    """
+    h = hashlib.sha256()
+    for module in modules:
+        h.update(module.__name__.encode())
+        h.update(inspect.getsource(module).encode())
+        constants = sorted((name, value) for name, value in vars(module).items() if name.isupper())
+        h.update(repr(constants).encode())
+    return h.hexdigest()[:16]
+
+
+def cache_key(*parts):
+    """JSON 化できる値の組からキャッシュキーを作る"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AssetCache:
+    """出力パス -> キャッシュキーの対応を保持するキャッシュ"""
+
+    def __init__(self, path, force=False):
+        self.path = path
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("format") == CACHE_FORMAT:
+                    self._entries = data.get("entries", {})
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @classmethod
+    def for_directory(cls, output_dir, force=False):
+        return cls(os.path.join(output_dir, CACHE_FILENAME), force=force)
+
+    def is_fresh(self, output_path, key):
+        """出力が最新ならヒットとして True を返す（ミスも集計する）"""
+        if not self.force and self._matches(output_path, key):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def _matches(self, output_path, key):
+        entry = self._entries.get(os.path.abspath(output_path))
+        if entry is None or entry.get("key") != key:
+            return False
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return False
+        return st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns")
+
+    def record(self, output_path, key):
+        """生成済みの出力を記録"""
+        st = os.stat(output_path)
+        self._entries[os.path.abspath(output_path)] = {
+            "key": key,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        self._dirty = True
+
+    def refresh(self, output_path):
+        """
+        記録済みの出力を書き換えた後、キーはそのままでサイズ・mtime を更新する
+        （内容を変えない再エンコードなど）。記録がなければ False。
+        """
+        entry = self._entries.get(os.path.abspath(output_path))
+        if entry is None:
+            return False
+        self.record(output_path, entry["key"])
+        return True
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": CACHE_FORMAT, "entries": self._entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def summary(self):
+        return f"キャッシュ: ヒット {self.hits} / ミス {self.misses}"
+
+
+def image_nbytes(value):
+    """MemoryLRU の容量計算用: bytes は長さ、ndarray は nbytes、PIL 画像は 幅 x 高さ x バンド数"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return nbytes
+    w, h = value.size
+    return w * h * len(value.getbands())
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class MemoryLRU:
+    """
+    合計バイト数の上限つき LRU（スレッドセーフ）。
+    上限を超えたら最も古く使われたものから捨てる。上限より大きい値は保持しない。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = image_nbytes(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._items[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+
+    def __len__(self):
+        return len(self._items)
+
+    def summary(self):
+        return (f"メモリキャッシュ: {len(self._items)}件 {self.nbytes / (1 << 20):.1f}MB / "
+                f"{self.max_bytes / (1 << 20):.0f}MB（ヒット {self.hits} / ミス {self.misses}）")
+
+
+class SingleFlight:
+    """同じキーの同時呼び出しを1回の計算にまとめる（後から来た呼び出しは結果を待つ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
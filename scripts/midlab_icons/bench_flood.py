@@ -0,0 +1,95 @@
+"""
+remove_bg_edge_flood の外周連結成分エンジンのベンチマーク
+
+チェッカー柄にカラーノイズを散らした合成グリッドで各エンジンの時間と tracemalloc ピークを計測し、
+マスクが従来方式（label）と完全一致することを確認する。
+ラベル数は noise で決まる（2048 / 4096 でそれぞれ、0.05: 約 80 / 470、0.3: 約 2.7万 / 10.6万、
+0.5: 約 24万 / 94万）。
+
+使い方:
+  python3 scripts/bench_flood.py
+  python3 scripts/bench_flood.py --sizes 1024 4096 --noise 0.05 0.3 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import ndimage
+
+from .process_icons import FLOOD_ENGINES, _flood_candidate_rows, edge_connected_mask
+
+
+def make_noisy_checker(size, noise, seed=0, cell=32):
+    """
+    チェッカー柄 + 上部ラベル帯 + 緑のリング + カラーノイズの合成画像（RGBA uint8）。
+    noise は非グレーのノイズピクセルの割合で、大きいほど連結成分が細かく分断される。
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size]
+    tone = np.where(((yy // cell) + (xx // cell)) % 2 == 0, 255, 204).astype(np.int16)
+    data = np.empty((size, size, 4), dtype=np.uint8)
+    data[:, :, :3] = np.clip(tone[:, :, None] + rng.integers(-4, 5, (size, size, 3)), 0, 255)
+    data[:, :, 3] = 255
+
+    # ラベル帯（暗いテキスト背景）
+    data[: size // 16, :, :3] = 40
+
+    # ロゴの緑リング
+    cy, cx = size * 0.55, size * 0.5
+    dist = np.hypot((yy - cy) / (size * 0.25), (xx - cx) / (size * 0.35))
+    data[(dist > 0.85) & (dist < 1.0), :3] = (45, 159, 45)
+
+    # カラーノイズ（チェッカー候補から外れるピクセル）
+    speckle = rng.random((size, size)) < noise
+    data[speckle, :3] = rng.integers(0, 256, (int(speckle.sum()), 3))
+    return data
+
+
+def _measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(sizes, noises, repeat):
+    print(f"{'size':>6} {'noise':>6} {'labels':>9} {'engine':>12} {'time':>9} {'speedup':>8} {'peak':>9}  match")
+    ok = True
+    for size in sizes:
+        for noise in noises:
+            candidate = _flood_candidate_rows(make_noisy_checker(size, noise), 0)
+            _, n_labels = ndimage.label(candidate)
+
+            reference = None
+            base_time = None
+            for engine in FLOOD_ENGINES:
+                mask, seconds, peak = _measure(lambda: edge_connected_mask(candidate, engine), repeat)
+                if reference is None:
+                    reference, base_time = mask, seconds
+                match = bool(np.array_equal(mask, reference))
+                ok &= match
+                print(f"{size:>6} {noise:>6.2f} {n_labels:>9} {engine:>12} {seconds * 1000:>7.1f}ms "
+                      f"{base_time / seconds:>7.2f}x {peak / (1 << 20):>7.1f}MB  {'OK' if match else 'MISMATCH'}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="外周連結成分エンジンのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.05, 0.3, 0.5])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    return 0 if run(args.sizes, args.noise, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+アイコンパイプライン各ステージのベンチマーク
+
+synthetic_grid.py の合成ソースグリッド（1k / 2k / 4k / 8k）で process_icons.py の各ステージを、
+generate_icons.py / sdf_render.py の描画関数はそれぞれの既定サイズで計測する。
+各ケースについて以下を記録する:
+  seconds              repeat 回のうち最速の壁時計時間
+  mpix_per_s           入力メガピクセル / seconds
+  tracemalloc_peak_mb  tracemalloc のピーク（NumPy・Pillow の Python 側確保を含む）
+  rss_peak_mb          実行中の RSS の増分のピーク（/proc/self/statm を 2ms 間隔でサンプリング、Linux のみ）
+
+結果は JSON に保存し、--baseline のファイルと比較する。時間・メモリが
+しきい値を超えて悪化したケースがあれば終了コード 1。
+ベースラインはマシン依存なので、比較は同じマシンで取ったもの同士で行う。
+
+使い方:
+  python3 scripts/bench_icons.py                                  # 計測して bench_baseline.json（このモジュールと同じディレクトリ）と比較
+  python3 scripts/bench_icons.py --sizes 1024 2048 --repeat 5 --out build/bench.json
+  python3 scripts/bench_icons.py --only remove_bg_edge_flood --sizes 4096
+  python3 scripts/bench_icons.py --save-baseline                  # ベースラインを更新
+"""
+
+import argparse
+import ctypes
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import PIL
+import scipy
+
+from . import generate_icons, process_icons, sdf_render
+from .synthetic_grid import make_source_grid
+
+DEFAULT_SIZES = (1024, 2048, 4096, 8192)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+TIME_THRESHOLD = 0.25      # 25% 以上遅くなったら回帰
+MEMORY_THRESHOLD = 0.20    # 20% 以上メモリが増えたら回帰
+# 短いケースの揺らぎで回帰と判定しないよう、時間の悪化はこの秒数を超えた場合のみ数える
+MIN_TIME_DELTA = 0.005
+RSS_SAMPLE_INTERVAL = 0.002
+
+
+class RssSampler:
+    """with ブロック内の RSS のピーク増分（バイト）を別スレッドでサンプリング"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._base = 0
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = self.current()
+            self.peak = max(self.peak, rss - self._base)
+
+    def __enter__(self):
+        rss = self.current()
+        if rss is not None:
+            self._base = rss
+            self.peak = 0
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, self.current() - self._base)
+
+
+def _release_free_memory():
+    """glibc が保持している解放済みメモリを OS に返す（RSS の増分を測るため、glibc 以外では何もしない）"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def measure(func, repeat):
+    """(最速の秒数, tracemalloc ピーク, RSS ピーク増分) を返す。メモリはそれぞれ別の1回で計測"""
+    # 遅延インポート（scipy.ndimage など）やキャッシュの初回確保を計測に含めないよう、1回空で呼ぶ
+    func()
+    _release_free_memory()
+    with RssSampler() as sampler:
+        func()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best, peak, sampler.peak
+
+
+def _quadrant(source, fname):
+    for name, _, quadrant, *_ in process_icons.STAGES:
+        if name == fname:
+            return source.crop(process_icons.quadrant_box(source.size, quadrant))
+    raise ValueError(fname)
+
+
+def grid_cases(size, workdir):
+    """合成グリッドのケース: [(名前, 入力ピクセル数, 関数)]"""
+    source = make_source_grid(size)
+    source_path = os.path.join(workdir, f"grid-{size}.png")
+    source.save(source_path, compress_level=1)
+    adaptive = _quadrant(source, "adaptive-icon.png")
+    icon = _quadrant(source, "icon.png")
+    splash = _quadrant(source, "splash-icon.png")
+    favicon = _quadrant(source, "favicon.png")
+    quad = adaptive.width * adaptive.height
+    out_dir = os.path.join(workdir, f"out-{size}")
+
+    def end_to_end():
+        process_icons.process_source_image(source_path, out_dir, copy_dir=None, verbose=False, force=True)
+
+    return [
+        ("remove_all_checker", quad, lambda: process_icons.remove_all_checker(adaptive)),
+        ("remove_bg_edge_flood", quad, lambda: process_icons.remove_bg_edge_flood(favicon)),
+        ("make_app_icon", quad, lambda: process_icons.make_app_icon(icon)),
+        ("make_splash_icon", quad, lambda: process_icons.make_splash_icon(splash)),
+        ("make_favicon", quad, lambda: process_icons.make_favicon(favicon)),
+        ("process_source_image", size * size, end_to_end),
+    ]
+
+
+def render_cases():
+    """描画関数のケース（グリッドサイズに依存しない）: [(名前, サイズ, 出力ピクセル数, 関数)]"""
+    cases = []
+    for fname, func, size in generate_icons.ASSETS:
+        cases.append((func.__name__, size, size * size, lambda func=func, size=size: func(size)))
+    for fname, variant in generate_icons.SDF_VARIANTS.items():
+        size = next(s for f, _, s in generate_icons.ASSETS if f == fname)
+        cases.append((f"sdf_{variant}", size, size * size,
+                      lambda variant=variant, size=size: sdf_render.render_variant(variant, size)))
+    return cases
+
+
+def _record(name, size, pixels, func, repeat, only):
+    if only and not any(pattern in name for pattern in only):
+        return None
+    seconds, peak, rss = measure(func, repeat)
+    result = {
+        "name": name,
+        "size": size,
+        "megapixels": round(pixels / 1e6, 3),
+        "seconds": round(seconds, 6),
+        "mpix_per_s": round(pixels / 1e6 / seconds, 2),
+        "tracemalloc_peak_mb": round(peak / (1 << 20), 2),
+        "rss_peak_mb": None if rss is None else round(rss / (1 << 20), 2),
+    }
+    rss_text = "-" if rss is None else f"{result['rss_peak_mb']:.1f}MB"
+    print(f"{name:<24} {size:>6} {seconds * 1000:>10.1f}ms {result['mpix_per_s']:>9.1f} "
+          f"{result['tracemalloc_peak_mb']:>9.1f}MB {rss_text:>10}")
+    return result
+
+
+def run(sizes, repeat, only=None, render=True):
+    """全ケースを計測。戻り値: {"meta": ..., "results": {"名前@サイズ": 結果}}"""
+    results = {}
+    print(f"{'stage':<24} {'size':>6} {'time':>12} {'MP/s':>9} {'tracemalloc':>11} {'RSS':>10}")
+    workdir = tempfile.mkdtemp(prefix="bench-icons-")
+    try:
+        for size in sizes:
+            for name, pixels, func in grid_cases(size, workdir):
+                result = _record(name, size, pixels, func, repeat, only)
+                if result:
+                    results[f"{name}@{size}"] = result
+            gc.collect()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if render:
+        for name, size, pixels, func in render_cases():
+            result = _record(name, size, pixels, func, repeat, only)
+            if result:
+                results[f"{name}@{size}"] = result
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """ベースラインとの比較を表示。戻り値: 回帰したケース名のリスト"""
+    regressions = []
+    print(f"\nベースライン比較（時間 +{time_threshold:.0%} / メモリ +{memory_threshold:.0%} で回帰）")
+    print(f"{'case':<32} {'time':>9} {'tracemalloc':>12} {'RSS':>9}")
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"{key:<32} {'(ベースラインなし)':>9}")
+            continue
+        marks = []
+        time_ratio = cur["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        if time_ratio > 1 + time_threshold and cur["seconds"] - base["seconds"] > MIN_TIME_DELTA:
+            marks.append("time")
+        mem_ratio = _ratio(cur["tracemalloc_peak_mb"], base["tracemalloc_peak_mb"])
+        if mem_ratio is not None and mem_ratio > 1 + memory_threshold:
+            marks.append("tracemalloc")
+        rss_ratio = _ratio(cur.get("rss_peak_mb"), base.get("rss_peak_mb"))
+        if rss_ratio is not None and rss_ratio > 1 + memory_threshold:
+            marks.append("rss")
+        if marks:
+            regressions.append(key)
+        print(f"{key:<32} {_format_ratio(time_ratio):>9} {_format_ratio(mem_ratio):>12} "
+              f"{_format_ratio(rss_ratio):>9}  {'回帰: ' + ', '.join(marks) if marks else 'OK'}")
+    return regressions
+
+
+def _ratio(current, base):
+    # 1MB 未満のメモリは揺らぎが大きいので比較しない
+    if current is None or base is None or base < 1.0:
+        return None
+    return current / base
+
+
+def _format_ratio(ratio):
+    return "-" if ratio is None else f"{ratio:.2f}x"
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="アイコンパイプライン各ステージのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="合成グリッドの一辺 (デフォルト: 1024 2048 4096 8192)")
+    parser.add_argument("--repeat", type=int, default=3, help="時間計測の繰り返し回数（最速を採用）")
+    parser.add_argument("--only", nargs="+", default=None, help="名前にこの文字列を含むケースだけ計測")
+    parser.add_argument("--no-render", action="store_true", help="generate_icons / sdf_render の描画を計測しない")
+    parser.add_argument("--out", default=None, help="結果の JSON の保存先")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="比較するベースライン JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存（比較しない）")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.repeat, args.only, render=not args.no_render)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"\n結果: {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"ベースラインを保存しました: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"ベースラインがありません: {args.baseline}（--save-baseline で作成）")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.time_threshold, args.memory_threshold)
+    if regressions:
+        print(f"\n{len(regressions)}件の回帰があります")
+        return 1
+    print("\n回帰はありません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
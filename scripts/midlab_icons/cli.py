@@ -0,0 +1,54 @@
+"""
+アイコンパイプラインの統合 CLI
+
+使い方（scripts/ を PYTHONPATH に入れるか、npm run icons -- <サブコマンド> ...）:
+  PYTHONPATH=scripts python3 -m midlab_icons generate --renderer sdf --out assets/images
+  PYTHONPATH=scripts python3 -m midlab_icons split scripts/source_icon.png --out assets/images
+  PYTHONPATH=scripts python3 -m midlab_icons export --source scripts/source_icon.png --out build/icons
+  PYTHONPATH=scripts python3 -m midlab_icons bench --sizes 1024 2048
+  PYTHONPATH=scripts python3 -m midlab_icons split --help   # サブコマンドごとのオプション
+
+サブコマンドのモジュールは選ばれたときに初めて import し、残りの引数をその main() に渡す。
+numpy・scipy・Pillow も実際に画像を処理するまで読み込まないので、
+全出力がキャッシュヒットする実行（pre-commit フックなど）は数十 ms で終わる。
+"""
+
+import argparse
+import importlib
+
+# (サブコマンド, モジュール, 説明)
+COMMANDS = [
+    ("generate", "generate_icons", "アイコン・スプラッシュをプロシージャル描画で生成"),
+    ("split", "process_icons", "nanobanana の 2x2 グリッド画像を個別アイコンに分割・処理"),
+    ("sheet", "process_sheets", "NxM の探索シートのグリッドを検出し、全セルをまとめて処理"),
+    ("animate", "splash_animation", "スプラッシュのアニメーション（APNG / WebP）を差分描画で生成"),
+    ("export", "export_icons", "iOS / Android / Web のアイコンサイズ一式を書き出す"),
+    ("optimize", "optimize_assets", "PNG の可逆最適化と Web 向け形式の書き出し"),
+    ("variants", "icon_variants", "パレットファイルごとのテーマ違いアイコンを一括生成"),
+    ("safezone", "safe_zone", "適応型アイコン前景をランチャーマスク（円・スクワークル・角丸・ティアドロップ）でまとめて検査"),
+    ("store", "store_graphics", "fastlane のメタデータからフィーチャーグラフィック・スクリーンショットのフレームを生成"),
+    ("contact", "contact_sheet", "アイコンセットをラベル付きのコンタクトシートに並べる（サムネイルは永続キャッシュ）"),
+    ("verify", "verify_assets", "出力をゴールデン画像と知覚的に比較（ΔE / SSIM、不合格はヒートマップ）"),
+    ("bench", "bench_icons", "各ステージのベンチマークとベースライン比較"),
+    ("preview", "preview_server", "パラメータを指定してその場で描画するローカルのプレビューサーバー"),
+    ("watch", "watch", "ソースグリッド・ジェネレータのパラメータを監視し、変わった出力だけ再生成"),
+]
+
+
+def main(argv=None):
+    width = max(len(name) for name, _, _ in COMMANDS)
+    parser = argparse.ArgumentParser(
+        prog="midlab_icons",
+        description="MidLab アイコンパイプラインの統合 CLI",
+        epilog="サブコマンド:\n" + "\n".join(f"  {name:<{width}}  {text}" for name, _, text in COMMANDS),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=[name for name, _, _ in COMMANDS], metavar="COMMAND",
+                        help="サブコマンド（下記）")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="サブコマンドの引数（COMMAND --help で表示）")
+    args = parser.parse_args(argv)
+
+    module_name = next(module for name, module, _ in COMMANDS if name == args.command)
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    return module.main(args.args, prog=f"{parser.prog} {args.command}")
+
@@ -0,0 +1,333 @@
+"""
+アイコンセットのコンタクトシート（レビュー用の一覧ページ）
+
+デザインの1ラウンドで process_source_image / generate_icons.py / sheet / variants の出力が数百セットたまると、
+1ファイルずつ開いて見比べるのは現実的でない。指定したディレクトリ配下から icon / adaptive-icon /
+splash-icon / favicon を含むディレクトリを1セットとして集め、ラベル付きのページに並べる:
+
+  icon       そのまま（透過部分はチェッカー柄の上）
+  adaptive   背景色 #0a0a0f の上に前景を置き、ランチャーのマスク（--mask、safe_zone.py と同じ形）で切り抜く
+  splash     #0a0a0f の上（アプリの splash の backgroundColor）
+  favicon    そのまま
+
+サムネイルは1ファイル（sqlite）の永続キャッシュに、ファイル内容のハッシュ x 表示方法 x 大きさをキーに保存する。
+ファイルのハッシュも (パス, mtime, サイズ) ごとに同じファイルに記録するので、数回ぶんの出力が増えただけなら
+デコード・縮小するのは新しいファイルだけで、残りはキャッシュの PNG を読むだけ。
+容量は --cache-max で制限し、最後に使ったのが古い順に削除する。
+
+ページの合成はスレッドで並行に行い、サムネイルが変わっていないページは AssetCache でスキップする。
+
+使い方:
+  npm run icons -- contact build/icon-sheet build/icon-variants assets/images
+  npm run icons -- contact build/icon-sheet --out build/contact --thumb 160 --mask squircle
+"""
+
+import argparse
+import glob
+import io
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from .asset_cache import AssetCache, cache_key, file_sha256, function_version
+from .generate_icons import BG_DARK
+from .lazy_modules import lazy_import
+from .process_icons import OUTPUT_FILES
+from .safe_zone import LAYER_DP, MASKS, VISIBLE_DP, mask_distance
+from .sinks import FileSink, encode_png
+from .verify_assets import collect_pngs
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+
+DEFAULT_OUTPUT_DIR = "build/contact"
+DEFAULT_CACHE = "build/.icon-thumbnails.sqlite"
+DEFAULT_CACHE_MB = 256
+DEFAULT_THUMB = 128
+DEFAULT_COLUMNS = 3
+DEFAULT_ROWS = 8
+PAGE_BG = (38, 40, 46)
+LABEL_COLOR = (210, 214, 220)
+CHECKER = ((85, 85, 85), (119, 119, 119))
+# 出力ファイル名 -> 表示方法
+KINDS = dict(zip(OUTPUT_FILES, ("icon", "adaptive", "splash", "favicon")))
+
+
+class ThumbnailCache:
+    """
+    サムネイルの永続キャッシュ（sqlite の1ファイル）。
+      files:  パス -> (mtime, サイズ, 内容の sha256)。変わっていないファイルはハッシュを計算し直さない
+      thumbs: キー（内容のハッシュ x 表示方法 x 大きさ）-> サムネイルの PNG と最終使用時刻
+    sqlite の接続はスレッド間で共有しないので、呼び出しは作成したスレッドからだけ行う。
+    """
+
+    def __init__(self, path=DEFAULT_CACHE, max_bytes=DEFAULT_CACHE_MB << 20):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT);
+            CREATE TABLE IF NOT EXISTS thumbs (key TEXT PRIMARY KEY, data BLOB, used INTEGER);
+            CREATE INDEX IF NOT EXISTS thumbs_used ON thumbs (used);
+        """)
+
+    def file_hash(self, path):
+        """ファイル内容の sha256（mtime・サイズが記録と同じなら記録の値）"""
+        st = os.stat(path)
+        path = os.path.abspath(path)
+        row = self.db.execute("SELECT mtime_ns, size, sha256 FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            return row[2]
+        digest = file_sha256(path)
+        self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, st.st_mtime_ns, st.st_size, digest))
+        return digest
+
+    def get(self, key):
+        row = self.db.execute("SELECT data FROM thumbs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute("UPDATE thumbs SET used = ? WHERE key = ?", (time.time_ns(), key))
+        return row[0]
+
+    def put(self, key, data):
+        self.db.execute("INSERT OR REPLACE INTO thumbs VALUES (?, ?, ?)", (key, data, time.time_ns()))
+
+    def evict(self):
+        """合計が max_bytes 以下になるまで最終使用の古い順に削除する。戻り値: 削除数"""
+        total = self.db.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM thumbs").fetchone()[0]
+        removed = 0
+        for key, size in self.db.execute("SELECT key, LENGTH(data) FROM thumbs ORDER BY used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM thumbs WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        return removed
+
+    def close(self):
+        self.evict()
+        self.db.commit()
+        self.db.close()
+
+    def summary(self):
+        return f"サムネイルキャッシュ: ヒット {self.hits} / ミス {self.misses}（{self.path}）"
+
+
+def collect_sets(paths):
+    """
+    paths 配下で OUTPUT_FILES のどれかを含むディレクトリを1セットとして集める。
+    ラベルは指定したディレクトリのパス + セットのディレクトリ（basename だけだと別の実行の
+    runA/icons と runB/icons が同じラベルになり、片方のファイルで上書きされる）。
+    戻り値: [(ラベル, {ファイル名: パス}), ...]（ラベル順）
+    """
+    sets = {}
+    for root in paths:
+        name = os.path.normpath(root)
+        for rel in collect_pngs(root):
+            directory, fname = os.path.split(rel)
+            if fname in KINDS:
+                label = os.path.join(name, directory) if directory else name
+                sets.setdefault(label, {})[fname] = os.path.join(root, rel)
+    return sorted(sets.items(), key=lambda item: _natural_key(item[0]))
+
+
+def _natural_key(text):
+    """r2c10 が r2c9 の後に来るように数字を数値として比べる"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", text)]
+
+
+def _launcher_mask(size, mask):
+    """表示範囲（72dp）を size px にしたときのマスクのカバレッジ（L 画像）"""
+    c = (np.arange(size, dtype=np.float32) + 0.5) * VISIBLE_DP / size - VISIBLE_DP / 2
+    y, x = np.meshgrid(c, c, indexing="ij")
+    coverage = np.clip(0.5 - mask_distance(mask, x, y) * size / VISIBLE_DP, 0.0, 1.0)
+    return Image.fromarray(np.rint(coverage * 255).astype(np.uint8), "L")
+
+
+def make_thumbnail(image, kind, size, mask="circle"):
+    """表示方法ごとのサムネイル（size x size の RGBA）"""
+    image = image.convert("RGBA")
+    if kind == "adaptive":
+        # 108dp のレイヤーのうち中央 72dp が表示される
+        layer = round(size * LAYER_DP / VISIBLE_DP)
+        fg = image.resize((layer, layer), Image.LANCZOS, reducing_gap=2.0)
+        offset = (layer - size) // 2
+        thumb = Image.new("RGBA", (size, size), BG_DARK + (255,))
+        thumb.alpha_composite(fg.crop((offset, offset, offset + size, offset + size)))
+        thumb.putalpha(_launcher_mask(size, mask))
+        return thumb
+    thumb = image.resize((size, size), Image.LANCZOS, reducing_gap=2.0)
+    if kind == "splash":
+        base = Image.new("RGBA", (size, size), BG_DARK + (255,))
+        base.alpha_composite(thumb)
+        return base
+    return thumb
+
+
+def _checker(size, cell=8):
+    yy, xx = np.mgrid[0:size, 0:size]
+    light = ((yy // cell + xx // cell) % 2).astype(bool)
+    data = np.where(light[:, :, None], np.array(CHECKER[1], np.uint8), np.array(CHECKER[0], np.uint8))
+    return Image.fromarray(data.astype(np.uint8), "RGB")
+
+
+def _fit_label(draw, text, font, width):
+    """width に収まらないラベルは先頭を省略する（末尾のセル名などを残す）"""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength("…" + text, font=font) > width:
+        text = text[1:]
+    return "…" + text
+
+
+def compose_page(cards, thumb, columns, rows):
+    """
+    cards: [(ラベル, [サムネイル PNG or None] x 種類数), ...] を1ページに並べた RGB 画像。
+    1枚のカードは横に種類数ぶんのサムネイルと、その下のラベル。
+    """
+    gap = max(4, thumb // 8)
+    label_h = max(12, thumb // 7)
+    card_w = len(KINDS) * thumb + (len(KINDS) - 1) * gap
+    card_h = thumb + label_h + gap
+    used_rows = min(rows, (len(cards) + columns - 1) // columns)
+    width = columns * card_w + (columns + 1) * gap * 2
+    height = used_rows * card_h + (used_rows + 1) * gap * 2
+    page = Image.new("RGB", (width, height), PAGE_BG)
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(label_h - 2)
+    checker = _checker(thumb)
+    for i, (label, thumbs) in enumerate(cards):
+        x0 = gap * 2 + (i % columns) * (card_w + gap * 2)
+        y0 = gap * 2 + (i // columns) * (card_h + gap * 2)
+        for j, data in enumerate(thumbs):
+            x = x0 + j * (thumb + gap)
+            if data is None:
+                draw.rectangle((x, y0, x + thumb - 1, y0 + thumb - 1), outline=LABEL_COLOR)
+                draw.line((x, y0, x + thumb - 1, y0 + thumb - 1), fill=LABEL_COLOR)
+                continue
+            with Image.open(io.BytesIO(data)) as image:
+                tile = image.convert("RGBA")
+            page.paste(checker, (x, y0))
+            page.paste(tile, (x, y0), tile)
+        draw.text((x0, y0 + thumb + gap // 2), _fit_label(draw, label, font, card_w), font=font, fill=LABEL_COLOR)
+    return page
+
+
+# 出力に影響する関数（キャッシュキーの関数バージョンに含める）
+THUMBNAIL_FUNCTIONS = (make_thumbnail, _launcher_mask, mask_distance)
+PAGE_FUNCTIONS = (compose_page, _checker, _fit_label)
+
+
+def build_contact_sheets(paths, output_dir=DEFAULT_OUTPUT_DIR, thumb=DEFAULT_THUMB, columns=DEFAULT_COLUMNS,
+                         rows=DEFAULT_ROWS, mask="circle", cache_path=DEFAULT_CACHE, cache_mb=DEFAULT_CACHE_MB,
+                         force=False, workers=None, verbose=True):
+    """paths 配下の全セットをページに並べて output_dir/contact-001.png ... に書き出す。戻り値: ページのパス"""
+    from concurrent.futures import ThreadPoolExecutor
+    log = print if verbose else (lambda *args, **kwargs: None)
+    start = time.perf_counter()
+    sets = collect_sets(paths)
+    if not sets:
+        log(f"アイコンセットが見つかりません: {' '.join(paths)}")
+        return []
+    cache = ThumbnailCache(cache_path, int(cache_mb * (1 << 20)))
+    version = function_version(*THUMBNAIL_FUNCTIONS)
+    workers = workers or os.cpu_count() or 1
+
+    # サムネイルのキー（内容のハッシュ x 表示方法 x 大きさ）とキャッシュの照会はメインスレッドで
+    keys = {}
+    thumbs = {}
+    missing = {}
+    for _, files in sets:
+        for fname, path in files.items():
+            kind = KINDS[fname]
+            key = cache_key(cache.file_hash(path), kind, thumb, mask if kind == "adaptive" else None, version)
+            keys[path] = key
+            if key not in thumbs and key not in missing:
+                data = cache.get(key)
+                if data is None:
+                    missing[key] = (path, kind)
+                else:
+                    thumbs[key] = data
+
+    def render(item):
+        path, kind = item
+        with Image.open(path) as image:
+            return encode_png(make_thumbnail(image, kind, thumb, mask), compress_level=1)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            for key, data in zip(missing, pool.map(render, missing.values())):
+                thumbs[key] = data
+                cache.put(key, data)
+    log(f"セット {len(sets)}件 / サムネイル: 新規 {len(missing)} / キャッシュ {len(thumbs) - len(missing)}")
+    cache.close()
+
+    per_page = columns * rows
+    pages = [sets[i:i + per_page] for i in range(0, len(sets), per_page)]
+    sink = FileSink(output_dir)
+    outputs = AssetCache.for_directory(output_dir, force=force)
+    page_version = function_version(*PAGE_FUNCTIONS)
+    tasks = []
+    written = []
+    names = set()
+    for n, page_sets in enumerate(pages, 1):
+        fname = f"contact-{n:03d}.png"
+        names.add(fname)
+        cards = [(label, [keys.get(files.get(f)) for f in OUTPUT_FILES]) for label, files in page_sets]
+        key = cache_key(cards, thumb, columns, rows, page_version)
+        written.append(sink.location(fname))
+        if not outputs.is_fresh(sink.location(fname), key):
+            tasks.append((fname, cards, key))
+
+    def compose(task):
+        fname, cards, _ = task
+        page = compose_page([(label, [thumbs.get(k) for k in ks]) for label, ks in cards], thumb, columns, rows)
+        return sink.write(fname, encode_png(page))
+
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for (_, _, key), path in zip(tasks, pool.map(compose, tasks)):
+                outputs.record(path, key)
+                log(f"  保存: {path}")
+    # セットが減って余ったページは消す
+    for path in glob.glob(os.path.join(output_dir, "contact-*.png")):
+        if os.path.basename(path) not in names:
+            os.unlink(path)
+    outputs.save()
+
+    log(f"\nページ {len(pages)}枚（更新 {len(tasks)}枚） ({time.perf_counter() - start:.2f}s)")
+    log(cache.summary())
+    return written
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="アイコンセットをラベル付きのコンタクトシートに並べる")
+    parser.add_argument("paths", nargs="+", help="アイコンセット（icon.png などを含むディレクトリ）を探すディレクトリ")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help=f"出力ディレクトリ (デフォルト: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--thumb", type=int, default=DEFAULT_THUMB, help=f"サムネイルの一辺 px (デフォルト: {DEFAULT_THUMB})")
+    parser.add_argument("--columns", type=int, default=DEFAULT_COLUMNS, help=f"1ページの列数 (デフォルト: {DEFAULT_COLUMNS})")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help=f"1ページの行数 (デフォルト: {DEFAULT_ROWS})")
+    parser.add_argument("--mask", choices=MASKS, default="circle", help="adaptive を切り抜くマスク (デフォルト: circle)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"サムネイルキャッシュのファイル (デフォルト: {DEFAULT_CACHE})")
+    parser.add_argument("--cache-max", type=float, default=DEFAULT_CACHE_MB, metavar="MB",
+                        help=f"サムネイルキャッシュの容量の上限 (デフォルト: {DEFAULT_CACHE_MB}MB)")
+    parser.add_argument("--force", action="store_true", help="ページのキャッシュを無視して全ページを書き直す")
+    parser.add_argument("--workers", type=int, default=None, help="縮小・ページ合成のスレッド数 (デフォルト: CPU コア数)")
+    args = parser.parse_args(argv)
+
+    build_contact_sheets(args.paths, args.out, args.thumb, args.columns, args.rows, args.mask, args.cache,
+                         args.cache_max, force=args.force, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+iOS / Android / Web 向けのアイコンサイズ一式を書き出すスクリプト
+
+マスター（1024x1024）から LANCZOS で 1/2 ずつ縮小したピラミッドを一度だけ作り、
+各ターゲットサイズは「そのサイズ以上で最も小さいレベル」から縮小する。
+毎回 1024 から直接縮小するより速く、48px 以下の小さなサイズでも
+段階的な縮小でエイリアシングを抑えられる。
+
+出力（--out 配下）:
+  ios/AppIcon.appiconset/       Icon-<px>.png + Contents.json
+  android/res/mipmap-<dpi>/      ic_launcher.png, ic_launcher_foreground.png
+  android/res/mipmap-anydpi-v26/ ic_launcher.xml（適応型アイコン定義）
+  android/res/values/            ic_launcher_background.xml
+  android/playstore-icon.png     512x512
+  web/                           favicon-16.png, favicon-32.png, apple-touch-icon.png, icon-192.png, icon-512.png
+
+使い方:
+  # generate_icons.py の create_icon / create_adaptive_icon をマスターにする
+  python3 scripts/export_icons.py --out build/icons
+
+  # nanobanana の 2x2 グリッドを process_icons.py の処理でマスターにする
+  python3 scripts/export_icons.py --source scripts/source_icon.png --out build/icons
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .intermediate_store import add_store_arguments, store_from_args
+
+# アダプティブアイコンの背景色（app.config.js の android.adaptiveIcon.backgroundColor）
+ADAPTIVE_BACKGROUND = "#0a0a0f"
+
+# iOS AppIcon: (idiom, pt サイズ, スケール)
+IOS_ICONS = [
+    ("iphone", 20, 2), ("iphone", 20, 3),
+    ("iphone", 29, 2), ("iphone", 29, 3),
+    ("iphone", 40, 2), ("iphone", 40, 3),
+    ("iphone", 60, 2), ("iphone", 60, 3),
+    ("ipad", 20, 1), ("ipad", 20, 2),
+    ("ipad", 29, 1), ("ipad", 29, 2),
+    ("ipad", 40, 1), ("ipad", 40, 2),
+    ("ipad", 76, 1), ("ipad", 76, 2),
+    ("ipad", 83.5, 2),
+    ("ios-marketing", 1024, 1),
+]
+
+# Android mipmap: 密度 -> 倍率（mdpi = 1x）
+ANDROID_DENSITIES = [
+    ("mdpi", 1.0),
+    ("hdpi", 1.5),
+    ("xhdpi", 2.0),
+    ("xxhdpi", 3.0),
+    ("xxxhdpi", 4.0),
+]
+ANDROID_LAUNCHER_DP = 48      # レガシーランチャーアイコン
+ANDROID_FOREGROUND_DP = 108   # 適応型アイコン前景（外周 18dp はマスク・視差用）
+PLAYSTORE_SIZE = 512
+
+# Web: (ファイル名, px)
+WEB_ICONS = [
+    ("favicon-16.png", 16),
+    ("favicon-32.png", 32),
+    ("apple-touch-icon.png", 180),
+    ("icon-192.png", 192),
+    ("icon-512.png", 512),
+]
+
+
+def build_pyramid(master, min_size=16):
+    """マスターから 1/2 ずつ縮小したレベルのリスト（大きい順）"""
+    levels = [master]
+    while levels[-1].width // 2 >= min_size:
+        prev = levels[-1]
+        levels.append(prev.resize((prev.width // 2, prev.height // 2), Image.LANCZOS))
+    return levels
+
+
+def from_pyramid(levels, size):
+    """size 以上で最も小さいレベルから size に縮小"""
+    base = levels[0]
+    for level in levels:
+        if level.width >= size:
+            base = level
+    if base.width == size:
+        return base
+    return base.resize((size, size), Image.LANCZOS)
+
+
+def _ios_pixels(points, scale):
+    return int(round(points * scale))
+
+
+def _format_points(points):
+    return f"{points:g}"
+
+
+def export_targets():
+    """
+    書き出すターゲットの一覧: (マスター名, 出力相対パス, px)
+    マスター名は "icon"（不透明アイコン）または "adaptive"（透過の前景）
+    """
+    targets = []
+    for px in sorted({_ios_pixels(pt, scale) for _, pt, scale in IOS_ICONS}):
+        targets.append(("icon", f"ios/AppIcon.appiconset/Icon-{px}.png", px))
+    for dpi, factor in ANDROID_DENSITIES:
+        targets.append(("icon", f"android/res/mipmap-{dpi}/ic_launcher.png",
+                        int(ANDROID_LAUNCHER_DP * factor)))
+        targets.append(("adaptive", f"android/res/mipmap-{dpi}/ic_launcher_foreground.png",
+                        int(ANDROID_FOREGROUND_DP * factor)))
+    targets.append(("icon", "android/playstore-icon.png", PLAYSTORE_SIZE))
+    for fname, px in WEB_ICONS:
+        targets.append(("icon", f"web/{fname}", px))
+    return targets
+
+
+def ios_contents_json():
+    """AppIcon.appiconset/Contents.json（同じ px のエントリは同じファイルを共有）"""
+    images = []
+    for idiom, pt, scale in IOS_ICONS:
+        px = _ios_pixels(pt, scale)
+        images.append({
+            "filename": f"Icon-{px}.png",
+            "idiom": idiom,
+            "scale": f"{scale}x",
+            "size": f"{_format_points(pt)}x{_format_points(pt)}",
+        })
+    return {"images": images, "info": {"author": "xcode", "version": 1}}
+
+
+ANDROID_ADAPTIVE_XML = """<?xml version="1.0" encoding="utf-8"?>
+<adaptive-icon xmlns:android="http://schemas.android.com/apk/res/android">
+    <background android:drawable="@color/ic_launcher_background"/>
+    <foreground android:drawable="@mipmap/ic_launcher_foreground"/>
+</adaptive-icon>
+"""
+
+ANDROID_BACKGROUND_XML = """<?xml version="1.0" encoding="utf-8"?>
+<resources>
+    <color name="ic_launcher_background">{color}</color>
+</resources>
+"""
+
+
+def load_masters(source_path=None, store=None):
+    """
+    マスター画像を用意する。
+    source_path があれば process_icons.py の App Icon / Adaptive Icon 処理結果、
+    なければ generate_icons.py の create_icon / create_adaptive_icon。
+    store（中間ストア）を渡すと split と同じデコード済みソース・マスクを memmap で読む。
+    """
+    if source_path and store is not None:
+        from .asset_cache import file_sha256
+        from .process_icons import load_source, process_quadrant_array
+        source_hash = file_sha256(source_path)
+        source_data = load_source(source_path, source_hash, store)
+        return {
+            "icon": process_quadrant_array(source_data, "icon.png", store, source_hash),
+            "adaptive": process_quadrant_array(source_data, "adaptive-icon.png", store, source_hash),
+        }
+    if source_path:
+        from .process_icons import process_quadrant
+        source = Image.open(source_path)
+        return {
+            "icon": process_quadrant(source, "icon.png"),
+            "adaptive": process_quadrant(source, "adaptive-icon.png"),
+        }
+    from .generate_icons import create_adaptive_icon, create_icon
+    return {"icon": create_icon(1024), "adaptive": create_adaptive_icon(1024)}
+
+
+def _write_png(image, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path, "PNG")
+    return path
+
+
+def _write_text(text, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def export_icons(masters, output_dir, workers=None):
+    """ピラミッドから全ターゲットを作り、並列に書き出す。戻り値: 書き出したパスのリスト"""
+    pyramids = {name: build_pyramid(img) for name, img in masters.items()}
+    targets = export_targets()
+
+    # 同じマスター・サイズのリサイズは1回だけ
+    resized = {}
+    for master, _, px in targets:
+        if (master, px) not in resized:
+            resized[(master, px)] = from_pyramid(pyramids[master], px)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_png, resized[(master, px)], os.path.join(output_dir, rel))
+            for master, rel, px in targets
+        ]
+        futures.append(pool.submit(
+            _write_text,
+            json.dumps(ios_contents_json(), indent=2) + "\n",
+            os.path.join(output_dir, "ios/AppIcon.appiconset/Contents.json"),
+        ))
+        futures.append(pool.submit(
+            _write_text,
+            ANDROID_ADAPTIVE_XML,
+            os.path.join(output_dir, "android/res/mipmap-anydpi-v26/ic_launcher.xml"),
+        ))
+        futures.append(pool.submit(
+            _write_text,
+            ANDROID_BACKGROUND_XML.format(color=ADAPTIVE_BACKGROUND),
+            os.path.join(output_dir, "android/res/values/ic_launcher_background.xml"),
+        ))
+        return [f.result() for f in futures]
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="iOS / Android / Web のアイコンサイズ一式を書き出す")
+    parser.add_argument("--source", help="nanobanana の 2x2 グリッド画像（省略時は generate_icons.py で生成）")
+    parser.add_argument("--out", default="build/icons", help="出力先 (デフォルト: build/icons)")
+    parser.add_argument("--workers", type=int, default=None, help="書き出しスレッド数")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    masters = load_masters(args.source, store_from_args(args))
+    paths = export_icons(masters, args.out, args.workers)
+    print(f"{len(paths)}ファイルを書き出しました: {args.out} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
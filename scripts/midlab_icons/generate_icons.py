@@ -0,0 +1,602 @@
+"""
+MidLab アプリアイコン・スプラッシュスクリーン生成スクリプト
+
+デザインコンセプト:
+- エメラルドグリーン基調のスポーティなデザイン
+- 陸上トラックのオーバル（横向き）+ 上昇グラフ（ラボのメタファー）
+- 2026年フラットデザイントレンド
+- 全年齢に親しまれるクリーンなデザイン
+"""
+
+import argparse
+import math
+import sys
+
+from .asset_cache import AssetCache, cache_key, function_version, module_version
+from .lazy_modules import lazy_import
+from .sinks import FileSink, encode_png, primary_directory
+from .stage_profiler import profiling, span
+
+# Pillow は描画するときに初めて import する（全アセットがキャッシュヒットなら不要）
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
+
+# カラーパレット
+BG_DARK = (10, 10, 15)           # #0a0a0f
+EMERALD = (45, 159, 45)          # #2d9f2d プライマリ
+EMERALD_LIGHT = (60, 200, 80)    # 明るいエメラルド
+EMERALD_DARK = (25, 120, 35)     # 暗いエメラルド
+TEAL = (30, 180, 140)            # ティール（アクセント）
+WHITE = (255, 255, 255)
+WHITE_50 = (255, 255, 255, 128)
+WHITE_20 = (255, 255, 255, 51)
+WHITE_10 = (255, 255, 255, 26)
+
+
+def draw_rounded_rect(draw, bbox, radius, fill=None, outline=None, width=1):
+    """角丸矩形を描画"""
+    x0, y0, x1, y1 = bbox
+    draw.rounded_rectangle(bbox, radius=radius, fill=fill, outline=outline, width=width)
+
+
+class Layer:
+    """
+    半透明レイヤー。描画命令を記録し、合成時に全命令のバウンディングボックス分だけ
+    RGBA 画像を確保して、座標を平行移動して描画する。
+    """
+
+    def __init__(self):
+        self._ops = []
+        self._bounds = []
+
+    def _add(self, method, xy, kwargs, pad=0):
+        xs = [p[0] for p in _points(xy)]
+        ys = [p[1] for p in _points(xy)]
+        self._bounds.append((min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad))
+        self._ops.append((method, xy, kwargs))
+
+    def ellipse(self, xy, **kwargs):
+        self._add('ellipse', xy, kwargs)
+
+    def polygon(self, xy, **kwargs):
+        self._add('polygon', xy, kwargs)
+
+    def line(self, xy, **kwargs):
+        self._add('line', xy, kwargs, pad=kwargs.get('width', 1))
+
+    def bbox(self, size):
+        """キャンバス内にクリップした整数バウンディングボックス（右下は排他的）"""
+        x0 = max(0, math.floor(min(b[0] for b in self._bounds)) - 1)
+        y0 = max(0, math.floor(min(b[1] for b in self._bounds)) - 1)
+        x1 = min(size[0], math.ceil(max(b[2] for b in self._bounds)) + 2)
+        y1 = min(size[1], math.ceil(max(b[3] for b in self._bounds)) + 2)
+        return x0, y0, x1, y1
+
+    def render(self, size):
+        """バウンディングボックス分だけ確保して描画。戻り値: (surface, 左上座標)"""
+        if not self._ops:
+            return None, None
+        x0, y0, x1, y1 = self.bbox(size)
+        if x1 <= x0 or y1 <= y0:
+            return None, None
+        surface = Image.new('RGBA', (x1 - x0, y1 - y0), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(surface)
+        for method, xy, kwargs in self._ops:
+            getattr(draw, method)(_translate(xy, -x0, -y0), **kwargs)
+        return surface, (x0, y0)
+
+
+def _points(xy):
+    """[x0, y0, x1, y1] または [(x, y), ...] を点のリストに"""
+    if xy and not isinstance(xy[0], (tuple, list)):
+        return [(xy[i], xy[i + 1]) for i in range(0, len(xy), 2)]
+    return list(xy)
+
+
+def _translate(xy, dx, dy):
+    if xy and not isinstance(xy[0], (tuple, list)):
+        return [v + (dx if i % 2 == 0 else dy) for i, v in enumerate(xy)]
+    return [(x + dx, y + dy) for x, y in xy]
+
+
+class Compositor:
+    """
+    アイコン描画用の合成エンジン。
+    不透明な描画はベース画像に直接（1つの ImageDraw で続けて）描き、
+    半透明レイヤーはバウンディングボックス分だけ確保してその場で合成する。
+    """
+
+    def __init__(self, size, fill):
+        self.image = Image.new('RGBA', (size, size), fill)
+        self._draw = ImageDraw.Draw(self.image)
+        # 合成で self.image が差し替わっても同じ draw で描き続けられるようにする
+        self.draw = _DrawProxy(self)
+
+    def layer(self):
+        return _LayerContext(self)
+
+    def composite(self, layer):
+        surface, dest = layer.render(self.image.size)
+        if surface is None:
+            return
+        if surface.size == self.image.size:
+            # キャンバス全体を覆う場合は crop / paste を挟まずに合成
+            self.image = Image.alpha_composite(self.image, surface)
+            self._draw = ImageDraw.Draw(self.image)
+        else:
+            self.image.alpha_composite(surface, dest=dest)
+
+
+class _DrawProxy:
+    def __init__(self, compositor):
+        self._compositor = compositor
+
+    def __getattr__(self, name):
+        return getattr(self._compositor._draw, name)
+
+
+class _LayerContext:
+    def __init__(self, compositor):
+        self._compositor = compositor
+        self._layer = Layer()
+
+    def __enter__(self):
+        return self._layer
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._compositor.composite(self._layer)
+        return False
+
+
+def create_icon(size=1024):
+    """メインアプリアイコンを生成"""
+    canvas = Compositor(size, BG_DARK + (255,))
+    draw = canvas.draw
+
+    # 背景にサブトルなグラデーション風の円
+    for i in range(3):
+        r = size // 2 - i * 60
+        alpha = 15 + i * 5
+        with canvas.layer() as od:
+            od.ellipse(
+                [size // 2 - r, size // 2 - r, size // 2 + r, size // 2 + r],
+                fill=(45, 159, 45, alpha)
+            )
+
+    # --- トラックオーバル ---
+    cx, cy = size // 2, size // 2 + 30
+    rx, ry = 340, 240
+    track_thickness = 48
+
+    # トラックの影（深み）
+    with canvas.layer() as sd:
+        sd.ellipse([cx - rx - 4, cy - ry + 8, cx + rx + 4, cy + ry + 8], fill=(0, 0, 0, 40))
+
+    # トラック本体 (外側)
+    draw.ellipse(
+        [cx - rx, cy - ry, cx + rx, cy + ry],
+        fill=EMERALD
+    )
+    # トラック内側を切り抜き
+    inner_rx = rx - track_thickness
+    inner_ry = ry - track_thickness
+    draw.ellipse(
+        [cx - inner_rx, cy - inner_ry, cx + inner_rx, cy + inner_ry],
+        fill=BG_DARK
+    )
+
+    # トラック上半分にグラデーション風のハイライト
+    with canvas.layer() as hd:
+        hd.ellipse(
+            [cx - rx, cy - ry, cx + rx, cy],
+            fill=(255, 255, 255, 20)
+        )
+        # 内側部分をマスク
+        hd.ellipse(
+            [cx - inner_rx, cy - inner_ry, cx + inner_rx, cy],
+            fill=(0, 0, 0, 0)
+        )
+
+    # トラックのレーンライン（内側）
+    lane_rx = rx - track_thickness + 6
+    lane_ry = ry - track_thickness + 6
+    with canvas.layer() as ld:
+        ld.ellipse(
+            [cx - lane_rx, cy - lane_ry, cx + lane_rx, cy + lane_ry],
+            outline=(255, 255, 255, 60), width=3
+        )
+
+    # --- 上昇グラフ（トラック内部） ---
+    # グラフのポイント（トラック内部に収まるように）
+    graph_points = [
+        (cx - 180, cy + 80),
+        (cx - 90, cy + 40),
+        (cx - 10, cy + 10),
+        (cx + 80, cy - 50),
+        (cx + 170, cy - 130),
+    ]
+
+    # グラフの下にグロー効果
+    # グラフ下の塗りつぶし領域
+    fill_points = list(graph_points) + [
+        (cx + 170, cy + 100),
+        (cx - 180, cy + 100),
+    ]
+    with canvas.layer() as gd:
+        gd.polygon(fill_points, fill=(45, 159, 45, 35))
+
+    # グラフライン
+    for i in range(len(graph_points) - 1):
+        draw.line(
+            [graph_points[i], graph_points[i + 1]],
+            fill=EMERALD_LIGHT, width=10
+        )
+
+    # グラフのドット
+    for i, (px, py) in enumerate(graph_points):
+        dot_r = 12 if i == len(graph_points) - 1 else 8
+        # 外側のリング
+        draw.ellipse(
+            [px - dot_r - 3, py - dot_r - 3, px + dot_r + 3, py + dot_r + 3],
+            fill=EMERALD_DARK
+        )
+        # 内側のドット
+        draw.ellipse(
+            [px - dot_r, py - dot_r, px + dot_r, py + dot_r],
+            fill=EMERALD_LIGHT if i < len(graph_points) - 1 else WHITE
+        )
+
+    # --- 矢印（最後のドットから上方向） ---
+    arrow_x = graph_points[-1][0]
+    arrow_y = graph_points[-1][1] - 16
+    arrow_top = arrow_y - 40
+    draw.line([(arrow_x, arrow_y), (arrow_x, arrow_top)], fill=WHITE, width=6)
+    # 矢じり
+    draw.polygon([
+        (arrow_x, arrow_top - 12),
+        (arrow_x - 14, arrow_top + 6),
+        (arrow_x + 14, arrow_top + 6),
+    ], fill=WHITE)
+
+    # --- "M" テキスト（左上） ---
+    # フォントなしでも見栄えするようにシンプルに
+    m_x, m_y = 140, 140
+    m_size = 120
+    # "M" を線で描画
+    m_weight = 14
+    draw.line([(m_x, m_y + m_size), (m_x, m_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x, m_y), (m_x + m_size // 2, m_y + m_size * 0.5)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size // 2, m_y + m_size * 0.5), (m_x + m_size, m_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size, m_y), (m_x + m_size, m_y + m_size)], fill=WHITE, width=m_weight)
+
+    # RGB に変換（iOS はアルファチャンネルなし必須）
+    img = canvas.image
+    rgb_img = Image.new('RGB', (size, size), BG_DARK)
+    rgb_img.paste(img, mask=img.split()[3])
+
+    return rgb_img
+
+
+def create_adaptive_icon(size=1024):
+    """Android 適応型アイコン前景を生成（中央66%にコンテンツ）"""
+    canvas = Compositor(size, (0, 0, 0, 0))
+    draw = canvas.draw
+
+    # Android 適応型アイコンは外側が切り抜かれるため、
+    # 重要な要素を中央 66% に収める
+    safe_margin = int(size * 0.17)  # 17% マージン
+
+    cx, cy = size // 2, size // 2 + 20
+    rx, ry = 240, 170
+    track_thickness = 36
+
+    # トラック本体
+    draw.ellipse(
+        [cx - rx, cy - ry, cx + rx, cy + ry],
+        fill=EMERALD
+    )
+    inner_rx = rx - track_thickness
+    inner_ry = ry - track_thickness
+    draw.ellipse(
+        [cx - inner_rx, cy - inner_ry, cx + inner_rx, cy + inner_ry],
+        fill=(0, 0, 0, 0)
+    )
+
+    # 上昇グラフ
+    graph_points = [
+        (cx - 120, cy + 55),
+        (cx - 50, cy + 25),
+        (cx + 10, cy + 5),
+        (cx + 70, cy - 30),
+        (cx + 130, cy - 85),
+    ]
+
+    # グラフ下の塗りつぶし
+    fill_points = list(graph_points) + [
+        (cx + 130, cy + 70),
+        (cx - 120, cy + 70),
+    ]
+    with canvas.layer() as gd:
+        gd.polygon(fill_points, fill=(45, 159, 45, 50))
+
+    for i in range(len(graph_points) - 1):
+        draw.line(
+            [graph_points[i], graph_points[i + 1]],
+            fill=EMERALD_LIGHT, width=8
+        )
+
+    for i, (px, py) in enumerate(graph_points):
+        dot_r = 9 if i == len(graph_points) - 1 else 6
+        draw.ellipse(
+            [px - dot_r, py - dot_r, px + dot_r, py + dot_r],
+            fill=EMERALD_LIGHT if i < len(graph_points) - 1 else WHITE
+        )
+
+    # 矢印
+    arrow_x = graph_points[-1][0]
+    arrow_y = graph_points[-1][1] - 12
+    arrow_top = arrow_y - 30
+    draw.line([(arrow_x, arrow_y), (arrow_x, arrow_top)], fill=WHITE, width=5)
+    draw.polygon([
+        (arrow_x, arrow_top - 10),
+        (arrow_x - 11, arrow_top + 5),
+        (arrow_x + 11, arrow_top + 5),
+    ], fill=WHITE)
+
+    # "M" テキスト
+    m_x, m_y = safe_margin + 30, safe_margin + 30
+    m_size = 90
+    m_weight = 11
+    draw.line([(m_x, m_y + m_size), (m_x, m_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x, m_y), (m_x + m_size // 2, m_y + m_size * 0.5)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size // 2, m_y + m_size * 0.5), (m_x + m_size, m_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size, m_y), (m_x + m_size, m_y + m_size)], fill=WHITE, width=m_weight)
+
+    return canvas.image
+
+
+def create_splash_icon(size=1024):
+    """スプラッシュスクリーン用アイコンを生成"""
+    canvas = Compositor(size, (0, 0, 0, 0))
+    draw = canvas.draw
+
+    cx, cy = size // 2, size // 2 - 20
+
+    # トラックオーバル
+    rx, ry = 300, 210
+    track_thickness = 40
+
+    draw.ellipse(
+        [cx - rx, cy - ry, cx + rx, cy + ry],
+        fill=EMERALD
+    )
+    inner_rx = rx - track_thickness
+    inner_ry = ry - track_thickness
+    draw.ellipse(
+        [cx - inner_rx, cy - inner_ry, cx + inner_rx, cy + inner_ry],
+        fill=(0, 0, 0, 0)
+    )
+
+    # 上昇グラフ
+    graph_points = [
+        (cx - 160, cy + 70),
+        (cx - 80, cy + 35),
+        (cx, cy + 10),
+        (cx + 80, cy - 40),
+        (cx + 155, cy - 110),
+    ]
+
+    # グラフ下の塗りつぶし
+    fill_points = list(graph_points) + [
+        (cx + 155, cy + 85),
+        (cx - 160, cy + 85),
+    ]
+    with canvas.layer() as gd:
+        gd.polygon(fill_points, fill=(60, 200, 80, 40))
+
+    for i in range(len(graph_points) - 1):
+        draw.line(
+            [graph_points[i], graph_points[i + 1]],
+            fill=EMERALD_LIGHT, width=9
+        )
+
+    for i, (px, py) in enumerate(graph_points):
+        dot_r = 10 if i == len(graph_points) - 1 else 7
+        draw.ellipse(
+            [px - dot_r, py - dot_r, px + dot_r, py + dot_r],
+            fill=EMERALD_LIGHT if i < len(graph_points) - 1 else WHITE
+        )
+
+    # 矢印
+    arrow_x = graph_points[-1][0]
+    arrow_y = graph_points[-1][1] - 14
+    arrow_top = arrow_y - 35
+    draw.line([(arrow_x, arrow_y), (arrow_x, arrow_top)], fill=WHITE, width=5)
+    draw.polygon([
+        (arrow_x, arrow_top - 10),
+        (arrow_x - 12, arrow_top + 5),
+        (arrow_x + 12, arrow_top + 5),
+    ], fill=WHITE)
+
+    # "MidLab" テキストをトラック下に
+    text_y = cy + ry + 60
+    # "M" ロゴ大きめ
+    m_x = cx - 160
+    m_size = 80
+    m_weight = 10
+    draw.line([(m_x, text_y + m_size), (m_x, text_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x, text_y), (m_x + m_size // 2, text_y + m_size * 0.5)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size // 2, text_y + m_size * 0.5), (m_x + m_size, text_y)], fill=WHITE, width=m_weight)
+    draw.line([(m_x + m_size, text_y), (m_x + m_size, text_y + m_size)], fill=WHITE, width=m_weight)
+
+    return canvas.image
+
+
+def create_favicon(size=48):
+    """ファビコン用の簡略アイコン"""
+    img = Image.new('RGBA', (size, size), BG_DARK + (255,))
+    draw = ImageDraw.Draw(img)
+
+    cx, cy = size // 2, size // 2 + 2
+    rx, ry = 18, 13
+    thickness = 4
+
+    # トラック
+    draw.ellipse([cx - rx, cy - ry, cx + rx, cy + ry], fill=EMERALD)
+    draw.ellipse(
+        [cx - rx + thickness, cy - ry + thickness, cx + rx - thickness, cy + ry - thickness],
+        fill=BG_DARK
+    )
+
+    # ミニグラフ
+    pts = [
+        (cx - 8, cy + 4),
+        (cx - 2, cy),
+        (cx + 4, cy - 4),
+        (cx + 9, cy - 9),
+    ]
+    for i in range(len(pts) - 1):
+        draw.line([pts[i], pts[i + 1]], fill=EMERALD_LIGHT, width=2)
+
+    # ドット
+    last = pts[-1]
+    draw.ellipse([last[0] - 2, last[1] - 2, last[0] + 2, last[1] + 2], fill=WHITE)
+
+    rgb_img = Image.new('RGB', (size, size), BG_DARK)
+    rgb_img.paste(img, mask=img.split()[3])
+    return rgb_img
+
+
+# 生成するアセット: (ファイル名, 生成関数, サイズ)
+ASSETS = [
+    ('icon.png', create_icon, 1024),                    # アプリアイコン（iOS / ストア用）
+    ('adaptive-icon.png', create_adaptive_icon, 1024),  # Android 適応型アイコン前景
+    ('splash-icon.png', create_splash_icon, 1024),      # スプラッシュスクリーン
+    ('favicon.png', create_favicon, 48),                # ファビコン
+]
+
+
+# create_* が描画に使うヘルパー（変更するとピクセルが変わる）
+DRAW_HELPERS = (draw_rounded_rect, Layer, _points, _translate, Compositor, _DrawProxy, _LayerContext)
+
+
+def palette_params():
+    """キャッシュキーに含めるカラーパレット"""
+    return {
+        'BG_DARK': BG_DARK,
+        'EMERALD': EMERALD,
+        'EMERALD_LIGHT': EMERALD_LIGHT,
+        'EMERALD_DARK': EMERALD_DARK,
+        'TEAL': TEAL,
+        'WHITE': WHITE,
+    }
+
+
+# --renderer sdf で使う logo_scene.py のアイコン種別
+SDF_VARIANTS = {
+    'icon.png': 'icon',
+    'adaptive-icon.png': 'adaptive',
+    'splash-icon.png': 'splash',
+    'favicon.png': 'favicon',
+}
+RENDERERS = ('pil', 'sdf')
+
+
+def _renderer_funcs(renderer):
+    """{ファイル名: (生成関数, キャッシュキー用のバージョン)}"""
+    if renderer == 'pil':
+        # 各 create_* はレイヤー合成のヘルパーを通して描くので、それらもキーに含める
+        return {fname: (func, function_version(func, *DRAW_HELPERS)) for fname, func, _ in ASSETS}
+    from . import logo_scene
+    from . import sdf_render
+    # シーンの幾何の定数や距離関数のヘルパーも出力を左右するので、モジュール全体をキーにする
+    version = module_version(logo_scene, sdf_render)
+    funcs = {}
+    for fname, variant in SDF_VARIANTS.items():
+        def render(size, variant=variant):
+            return sdf_render.render_variant(variant, size)
+        funcs[fname] = (render, cache_key(version, logo_scene.VARIANTS[variant]))
+    return funcs
+
+
+def generate_assets(base_path, force=False, renderer='pil', optimize=False, memo=None, compress_level=None,
+                    sink=None):
+    """
+    全アセットを生成（パレット・サイズ・関数が変わっていないものはスキップ）
+    renderer='sdf' は logo_scene.py のシーンを sdf_render.py で各サイズに直接描画する
+    optimize=True でエンコードした PNG を optimize_assets.py の可逆最適化にかけてから書き出す
+    memo（asset_cache.MemoryLRU）を渡すとエンコード済みの PNG をキャッシュキーで保持し、
+    以前と同じパラメータに戻したときは描画・エンコードせずに書き込む（watch モード用）
+    compress_level は PNG の zlib 圧縮レベル（None は Pillow の既定、指定時はキャッシュキーに含める）
+    sink（sinks.py）を省略すると base_path の FileSink に書き出す。
+    ファイルに書かないシンクではキャッシュせず、戻り値の AssetCache は None
+    """
+    if sink is None:
+        sink = FileSink(base_path)
+    cache_dir = primary_directory(sink)
+    cache = AssetCache.for_directory(cache_dir, force=force) if cache_dir is not None else None
+    palette = palette_params()
+    funcs = _renderer_funcs(renderer)
+    save_options = {} if compress_level is None else {'compress_level': compress_level}
+    for fname, _, size in ASSETS:
+        path = sink.location(fname)
+        func, version = funcs[fname]
+        key = cache_key(fname, size, palette, renderer, optimize, version)
+        if compress_level is not None:
+            key = cache_key(key, compress_level)
+        if cache is not None and cache.is_fresh(path, key):
+            sink.sync(fname)
+            print(f'{fname} スキップ（変更なし）')
+            continue
+        with span('stage', cprofile=True, file=fname):
+            data = memo.get(key) if memo is not None else None
+            if data is None:
+                with span('render', file=fname, renderer=renderer):
+                    image = func(size)
+                with span('encode', file=fname):
+                    data = encode_png(image, **save_options)
+                if optimize:
+                    from .optimize_assets import optimize_png
+                    with span('optimize', file=fname):
+                        data, _ = optimize_png(image, data)
+                if memo is not None:
+                    memo.put(key, data)
+            with span('write', file=fname):
+                sink.write(fname, data)
+        if cache is not None:
+            cache.record(path, key)
+        print(f'{fname} 生成完了 ({size}x{size})')
+    if cache is not None:
+        cache.save()
+        print(cache.summary())
+    return cache
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='MidLab アイコン・スプラッシュ生成')
+    parser.add_argument('--out', default='assets/images', help='出力先 (デフォルト: assets/images)')
+    parser.add_argument('--force', action='store_true', help='キャッシュを無視して全アセットを再生成')
+    parser.add_argument('--renderer', choices=RENDERERS, default='pil',
+                        help='pil: 従来の ImageDraw 描画 / sdf: logo_scene.py のシーンを SDF で描画')
+    parser.add_argument('--optimize', action='store_true', help='保存した PNG を可逆最適化する（optimize_assets.py）')
+    parser.add_argument('--profile', nargs='?', const='build/profile/generate_icons.json', default=None,
+                        metavar='TRACE_JSON',
+                        help='描画・保存の時間・メモリを計測し、Chrome トレース JSON と集計表を出力 '
+                             '(デフォルト: build/profile/generate_icons.json)')
+    parser.add_argument('--profile-cprofile', default=None, metavar='PROF',
+                        help='--profile 時、最も時間のかかったアセットの cProfile をこのパスに保存')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        with profiling(args.profile, args.profile_cprofile):
+            generate_assets(args.out, force=args.force, renderer=args.renderer, optimize=args.optimize)
+    else:
+        generate_assets(args.out, force=args.force, renderer=args.renderer, optimize=args.optimize)
+
+    print('\nすべてのアセット生成完了')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+ソースシートの NxM グリッド検出
+
+nanobanana の探索シートは 2x2 とは限らず、3x3・4x4 のバリエーションや中央からずれた区切りもある。
+デコード済みの配列 1 枚から、全セルの切り出し範囲とラベル帯・ガイド帯の幅をまとめて求める:
+
+  1. ガイド破線（GUIDE_GRAY）の列・行ごとの割合（射影）を、間引いたサンプルでベクトル計算
+  2. 割合が GUIDE_FRACTION 以上の連続区間をガイド線とし、各セルの右端・下端のガイドとみなす
+     （ガイドからセル端までの余白はセルの大きさに比例するとみなし、最後のガイドと画像端の間隔から求める）
+  3. 各セル上部の「インク」（チェッカー・ロゴの緑・ガイド以外）の行射影から
+     ラベル帯の下端を求める。見つからなければ 2x2 用の固定幅をセルの高さに比例させる
+
+ガイドが見つからない軸は、指定された列数・行数（なければ 1）で等分する。
+"""
+
+from collections import namedtuple
+
+from .lazy_modules import lazy_import
+from .pixel_masks import CHECKER_CANDIDATE, GUIDE_GRAY, KEEP_GREEN, classify_pixels
+
+np = lazy_import("numpy")
+
+GUIDE_FRACTION = 0.2        # ガイド線とみなす列・行の GUIDE_GRAY の割合
+PROJECTION_STRIDE = 4       # 射影を計算するときの間引き間隔（px）
+LABEL_SEARCH = 0.2          # ラベル帯を探すセル上部の範囲（セルの高さに対する割合）
+LABEL_INK_FRACTION = 0.01   # ラベル帯の行とみなすインクの割合
+LABEL_PAD = 8               # 検出したラベル帯・ガイド帯に足す余白（1024px のセルあたり）
+REFERENCE_CELL = 1024       # 2x2 用の固定幅（process_icons.py）が前提とするセルの大きさ
+
+# セルの位置 (行, 列)・切り出し範囲 (x0, y0, x1, y1)・ラベル帯の高さ・右端/下端のガイド帯の幅
+CellGeometry = namedtuple("CellGeometry", "row col box label_band guide_band")
+
+
+def _runs(flags):
+    """bool の 1 次元配列の連続区間 [(開始, 終了), ...]（終了は含まない）"""
+    edges = np.diff(np.concatenate(([0], flags.view(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def guide_runs(data, axis, stride=PROJECTION_STRIDE):
+    """
+    GUIDE_GRAY の射影からガイド線の区間を求める。
+    axis=0 は縦のガイド（列の区間）、axis=1 は横のガイド（行の区間）。
+    射影の向きと直交する方向だけ stride で間引くので、線の位置は 1px 単位で求まる。
+    """
+    sample = data[::stride] if axis == 0 else data[:, ::stride]
+    guide = classify_pixels(sample, (GUIDE_GRAY,))[GUIDE_GRAY]
+    return _runs(guide.mean(axis=axis) >= GUIDE_FRACTION)
+
+
+def _cell_edges(length, ends):
+    """
+    各セルの右端（下端）のガイドの終わり ends からセル境界を求める。
+    ガイドからセル端までの余白はセルの大きさに比例する（比率 m は全セル共通）とみなし、
+    最後のセルが画像端でちょうど終わる m を二分法で求める:
+      end_k = b_(k+1) - m * (b_(k+1) - b_k)  →  b_(k+1) = (end_k - m * b_k) / (1 - m)
+    """
+    def edges_for(m):
+        edges = [0.0]
+        for end in ends:
+            edges.append((end - m * edges[-1]) / (1 - m))
+        return edges
+
+    lo, hi = 0.0, 0.5
+    for _ in range(40):
+        mid = (lo + hi) / 2
+        if edges_for(mid)[-1] < length:
+            lo = mid
+        else:
+            hi = mid
+    edges = [min(length, round(e)) for e in edges_for(lo)[:-1]]
+    return edges + [length]
+
+
+def _split_axis(length, runs, count):
+    """
+    1 軸ぶんのセル境界とガイド区間。
+    ガイドが count 本（count が None なら 1 本以上）あればガイドで区切り、
+    なければ count（なければ 1）で等分してガイド区間は None にする。
+    """
+    if runs and (count is None or len(runs) == count):
+        return _cell_edges(length, [end for _, end in runs]), runs
+    count = count or 1
+    return [length * i // count for i in range(count + 1)], [None] * count
+
+
+def label_band(cell, fallback, scale):
+    """
+    セル上部のラベル帯の高さ（px）。上から LABEL_SEARCH の範囲でインクの行が続く区間
+    （短い途切れはつなげる）の下端に余白を足す。ラベルがなければ fallback を scale 倍する。
+    """
+    h, w = cell.shape[:2]
+    search = max(1, int(h * LABEL_SEARCH))
+    masks = classify_pixels(cell[:search], (CHECKER_CANDIDATE, KEEP_GREEN, GUIDE_GRAY))
+    ink = ~(masks[CHECKER_CANDIDATE] | masks[KEEP_GREEN] | masks[GUIDE_GRAY])
+    rows = np.flatnonzero(ink.mean(axis=1) > LABEL_INK_FRACTION)
+    if not len(rows):
+        return round(fallback * scale)
+    gap = max(2, round(LABEL_PAD * scale))
+    breaks = np.flatnonzero(np.diff(rows) > gap)
+    end = rows[breaks[0]] if len(breaks) else rows[-1]
+    return min(search, int(end) + 1 + max(1, round(LABEL_PAD * scale)))
+
+
+def detect_grid(data, cols=None, rows=None, label_fallback=100, guide_fallback=40):
+    """
+    decode_source() の配列から全セルの CellGeometry を行優先で返す。
+    cols / rows を指定すると、その本数のガイドが見つかった軸だけガイドで区切り、
+    それ以外は等分する。label_fallback / guide_fallback は 1024px のセルでの既定幅。
+    """
+    h, w = data.shape[:2]
+    xs, vertical = _split_axis(w, guide_runs(data, 0), cols)
+    ys, horizontal = _split_axis(h, guide_runs(data, 1), rows)
+    cells = []
+    for r, guide_y in enumerate(horizontal):
+        for c, guide_x in enumerate(vertical):
+            x0, y0, x1, y1 = xs[c], ys[r], xs[c + 1], ys[r + 1]
+            scale = min(x1 - x0, y1 - y0) / REFERENCE_CELL
+            pad = max(1, round(LABEL_PAD * scale))
+            bands = [end - run[0] + pad for end, run in ((x1, guide_x), (y1, guide_y)) if run is not None]
+            guide = max(bands) if bands else max(1, round(guide_fallback * scale))
+            label = label_band(data[y0:y1, x0:x1], label_fallback, scale)
+            cells.append(CellGeometry(r, c, (x0, y0, x1, y1), label, guide))
+    return cells
+
+
+# 検出結果に影響する関数（キャッシュキーの関数バージョンに含める）
+DETECT_FUNCTIONS = (detect_grid, guide_runs, _split_axis, _cell_edges, _runs, label_band, classify_pixels)
@@ -0,0 +1,163 @@
+"""
+パレットファイルごとのテーマ違いアイコンを一括生成するスクリプト
+
+各アセット（icon / adaptive / splash / favicon）を sdf_render.py で一度だけ描画し、
+パレットに依存しない「ロールごとの重み（uint8）+ アルファ」の組み合わせ表と、
+ピクセルごとの組み合わせ番号（インデックス画像）にする。
+各バリアントは組み合わせ表（千エントリ程度）の色を計算し、インデックス画像で引くだけなので、
+N 個のバリアントでも描画は1回、以降は軽い LUT パスが N 回になる。
+重みの量子化による誤差は各チャネル ±2 程度。
+
+パレットファイル（JSON）:
+  {
+    "name": "autumn",                       # 省略時はファイル名
+    "colors": {"EMERALD": "#c8641e", ...}   # 省略したロールはデフォルトの色
+  }
+ロール名は BG_DARK / EMERALD / EMERALD_LIGHT / EMERALD_DARK / TEAL / WHITE / BLACK。
+
+使い方:
+  python3 scripts/icon_variants.py scripts/palettes/*.json --out build/icon-variants
+  # 出力: build/icon-variants/<name>/icon.png, adaptive-icon.png, splash-icon.png, favicon.png
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from .generate_icons import ASSETS, SDF_VARIANTS
+from .logo_scene import build_scene
+from .sdf_render import DEFAULT_PALETTE, role_weights
+
+# 一度だけ描画したアセット（インデックスカラー形式）
+#   roles:  重みに対応するロール名のタプル
+#   index:  (h, w) uint16、各ピクセルの重みの組み合わせ番号
+#   table:  (K, R) uint8、組み合わせごとのロールの重み（0〜255）
+#   alpha:  (K,) uint8、組み合わせごとのアルファ。背景ありのアセットは None
+BaseRender = namedtuple('BaseRender', 'fname size roles index table alpha')
+
+
+def parse_color(value):
+    """'#rrggbb' または [r, g, b] を (r, g, b) に"""
+    if isinstance(value, str):
+        text = value.lstrip('#')
+        if len(text) != 6:
+            raise ValueError(f'色の形式が不正です: {value}')
+        return tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+    if len(value) != 3 or not all(0 <= int(c) <= 255 for c in value):
+        raise ValueError(f'色の形式が不正です: {value}')
+    return tuple(int(c) for c in value)
+
+
+def load_palette(path):
+    """パレットファイルを読み込む。戻り値: (名前, {ロール: (r, g, b)})"""
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+    colors = dict(DEFAULT_PALETTE)
+    for role, value in spec.get('colors', {}).items():
+        if role not in DEFAULT_PALETTE:
+            raise ValueError(f'{path}: 未知のロール {role}')
+        colors[role] = parse_color(value)
+    name = spec.get('name') or os.path.splitext(os.path.basename(path))[0]
+    return name, colors
+
+
+def render_base(fname, size):
+    """
+    アセットを一度だけ描画し、パレット非依存の BaseRender にする。
+    ロールの重みとアルファ（各 uint8）を1ピクセル 8 バイト以内の整数に詰めて np.unique し、
+    重みの組み合わせの表とピクセルごとの番号に分ける（1024px でも組み合わせは千程度）。
+    """
+    background, prims = build_scene(SDF_VARIANTS[fname], size)
+    roles, weights, alpha = role_weights(background, prims, size)
+    planes = list(np.rint(weights * 255).astype(np.uint8))
+    if not background:
+        planes.append(np.rint(alpha * 255).astype(np.uint8))
+    key = np.zeros((size, size), dtype=np.uint64)
+    for plane in planes:
+        key <<= np.uint64(8)
+        key |= plane
+    combos, index = np.unique(key.ravel(), return_inverse=True)
+    if len(combos) > np.iinfo(np.uint16).max:
+        raise ValueError(f'{fname}: 重みの組み合わせが多すぎます ({len(combos)})')
+
+    columns = [(combos >> np.uint64(8 * shift)).astype(np.uint8)
+               for shift in range(len(planes) - 1, -1, -1)]
+    table = np.stack(columns[:len(roles)], axis=1)
+    combo_alpha = None if background else columns[-1]
+    index = index.reshape(size, size).astype(np.uint16)
+    return BaseRender(fname, size, roles, index, table, combo_alpha)
+
+
+def recolor(base, palette):
+    """BaseRender をパレットで塗り直した PIL 画像（背景ありは RGB、なしは RGBA）"""
+    colors = np.array([palette[role][:3] for role in base.roles], dtype=np.uint32)
+    # 組み合わせごとのプリマルチプライド色（255 x 255 スケール）
+    acc = base.table.astype(np.uint32) @ colors
+
+    if base.alpha is None:
+        lut = np.minimum((acc + 127) // 255, 255).astype(np.uint8)
+        return Image.fromarray(lut[base.index], 'RGB')
+    # プリマルチプライド（255 x 255 スケール）/ アルファ（255 スケール）= ストレート（255 スケール）
+    lut = np.zeros((len(acc), 4), dtype=np.uint8)
+    visible = base.alpha > 0
+    straight = acc[visible] / base.alpha[visible, None].astype(np.float64)
+    lut[visible, :3] = np.minimum(np.rint(straight), 255)
+    lut[:, 3] = base.alpha
+    return Image.fromarray(lut[base.index], 'RGBA')
+
+
+def _save(image, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    image.save(path, 'PNG')
+    return path
+
+
+def generate_variants(palette_paths, output_dir, workers=None):
+    """
+    全パレットのテーマ違いアセットを生成。
+    戻り値: {パレット名: {ファイル名: パス}}
+    """
+    palettes = [load_palette(path) for path in palette_paths]
+    names = [name for name, _ in palettes]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f'パレット名が重複しています: {", ".join(duplicates)}')
+
+    start = time.perf_counter()
+    bases = [render_base(fname, size) for fname, _, size in ASSETS]
+    print(f'ベース描画: {len(bases)}アセット ({time.perf_counter() - start:.2f}s)')
+
+    start = time.perf_counter()
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for name, colors in palettes:
+            for base in bases:
+                path = os.path.join(output_dir, name, base.fname)
+                futures[(name, base.fname)] = pool.submit(_save, recolor(base, colors), path)
+        for (name, fname), future in futures.items():
+            results.setdefault(name, {})[fname] = future.result()
+    print(f'{len(palettes)}バリアントを書き出しました: {output_dir} ({time.perf_counter() - start:.2f}s)')
+    return results
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description='パレットファイルごとのテーマ違いアイコンを一括生成')
+    parser.add_argument('palettes', nargs='+', help='パレットファイル（JSON）')
+    parser.add_argument('--out', default='build/icon-variants', help='出力先 (デフォルト: build/icon-variants)')
+    parser.add_argument('--workers', type=int, default=None, help='書き出しスレッド数')
+    args = parser.parse_args(argv)
+
+    generate_variants(args.palettes, args.out, args.workers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
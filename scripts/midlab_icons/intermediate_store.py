@@ -0,0 +1,145 @@
+"""
+デコード済みソース・マスクのディスク上の中間ストア（.npy の memmap）
+
+ソースグリッドのデコードや KEEP_GREEN / SPLASH_WHITE のマスク計算は、同じソースに対して
+実行ごと・ツールごと（split / sheet / export）・バッチのワーカーごとに繰り返されていた。
+中間ストアはそれらを .npy として保存し、次からは np.load(mmap_mode="r") で読み取り専用に
+マップする。ページキャッシュを共有するので、並列のワーカーが同じソースを読んでもコピーは増えない。
+
+配置:  <root>/<ソースのハッシュ先頭2文字>/<ソースのハッシュ>/<名前>.npy
+  名前は source（デコード結果）や <マスク名>-<x0>-<y0>-<x1>-<y1>-<関数バージョン> など。
+  マスクの計算方法が変わると名前が変わるので、古いファイルは参照されずに追い出される。
+
+容量は max_bytes で制限し、保存のたびに最終参照時刻（読み込み時に mtime を更新）の古い順に削除する。
+書き込みは一時ファイル + os.replace なので、他のプロセスが途中の .npy を読むことはない。
+"""
+
+import os
+import threading
+
+from .lazy_modules import lazy_import
+
+np = lazy_import("numpy")
+
+DEFAULT_ROOT = "build/.icon-intermediate"
+DEFAULT_MAX_MB = 2048
+
+
+class IntermediateStore:
+    """ソースのハッシュ + 名前 -> 読み取り専用の memmap"""
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_MB << 20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # バッチのワーカープロセスへ渡すときはロックを除いて pickle する（ヒット数はワーカーごとに数える）
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def path(self, key, name):
+        return os.path.join(self.root, key[:2], key, f"{name}.npy")
+
+    def load(self, key, name):
+        """保存済みなら memmap（mode "r"）、なければ None"""
+        path = self.path(key, name)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return array
+
+    def save(self, key, name, array):
+        """array を保存し、保存したファイルの memmap を返す（容量を超えたら古いものを削除）"""
+        path = self.path(key, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return np.load(path, mmap_mode="r")
+
+    def get(self, key, name, compute):
+        """保存済みならその memmap、なければ compute() の結果を保存して memmap を返す"""
+        array = self.load(key, name)
+        if array is None:
+            array = self.save(key, name, compute())
+        return array
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.root):
+            for fname in files:
+                if not fname.endswith(".npy"):
+                    continue
+                path = os.path.join(root, fname)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def usage(self):
+        """保存済みの合計バイト数"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        """合計が max_bytes 以下になるまで最終参照の古い順に削除する（keep は残す）。戻り値: 削除数"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                # 削除しても、既にマップしているプロセスは閉じるまで読める
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            # 空になったハッシュのディレクトリ・先頭2文字のディレクトリも消す（root は残す）
+            for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+        return removed
+
+    def summary(self):
+        return f"中間ストア: ヒット {self.hits} / ミス {self.misses}"
+
+
+def add_store_arguments(parser):
+    """split / sheet / export 共通の --store / --store-max"""
+    parser.add_argument("--store", nargs="?", const=DEFAULT_ROOT, default=None, metavar="DIR",
+                        help=f"デコード済みのソースとマスクを .npy の中間ストアに保存・再利用する (デフォルト: {DEFAULT_ROOT})")
+    parser.add_argument("--store-max", type=float, default=DEFAULT_MAX_MB, metavar="MB",
+                        help=f"中間ストアの容量の上限。超えたら古いものから削除 (デフォルト: {DEFAULT_MAX_MB}MB)")
+
+
+def store_from_args(args):
+    """add_store_arguments() の引数から IntermediateStore（--store なしなら None）"""
+    if not args.store:
+        return None
+    return IntermediateStore(args.store, int(args.store_max * (1 << 20)))
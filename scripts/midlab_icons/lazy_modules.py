@@ -0,0 +1,40 @@
+"""
+重い依存（numpy / Pillow / scipy）の遅延 import
+
+  np = lazy_import("numpy")
+
+のようにモジュールの先頭で束縛しておくと、最初に属性を参照した時点で初めて import される。
+キャッシュが全て有効で何も描画しない実行（pre-commit フックなど）では
+numpy・scipy の import（合わせて数百 ms）を払わずに済む。
+読み込み後は本物のモジュールの名前空間をコピーするので、以降の属性参照は通常の
+モジュールとほぼ同じ速さ。読み込みはロックで1回だけ行う（スレッドから最初に触っても安全）。
+"""
+
+import importlib
+import threading
+import types
+
+_lock = threading.Lock()
+
+
+class _LazyModule(types.ModuleType):
+    """最初の属性参照で本物のモジュールを import して名前空間を取り込む"""
+
+    def __getattr__(self, attr):
+        # 取り込み済みの名前はインスタンスの __dict__ から直接引かれるので、
+        # ここに来るのは未読み込みか、本物のモジュール側の遅延属性だけ
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            with _lock:
+                module = self.__dict__.get("_lazy_module")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__.update(module.__dict__)
+                    self.__dict__["_lazy_module"] = module
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """name（"numpy" / "PIL.Image" など）を遅延 import するモジュールオブジェクト"""
+    return _LazyModule(name)
+
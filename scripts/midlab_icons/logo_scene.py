@@ -0,0 +1,162 @@
+"""
+MidLab ロゴの宣言的なシーン記述
+
+トラックオーバル・上昇グラフ・ドット・矢印・"M" を一度だけ解像度非依存のプリミティブで定義し、
+アイコン種別（icon / adaptive / splash / favicon）ごとの配置・スタイルの差分だけを持つ。
+座標はキャンバスに対する正規化座標（0〜1）。描画は sdf_render.py が行う。
+
+プリミティブの色は「ロール」（パレットのキー名）で指定し、パレットは描画時に渡す。
+"""
+
+from collections import namedtuple
+
+# --- プリミティブ（座標・長さは正規化座標） ---
+# 塗りつぶし楕円
+Ellipse = namedtuple('Ellipse', 'cx cy rx ry role alpha')
+# 楕円リング（外側半径 rx, ry から内側へ thickness の幅）。clip_below が指定されると y > clip_below を除外
+Ring = namedtuple('Ring', 'cx cy rx ry thickness role alpha clip_below')
+# 丸端の線分（折れ線は線分の列で表す）
+Segment = namedtuple('Segment', 'x0 y0 x1 y1 width role alpha')
+# 塗りつぶし円
+Circle = namedtuple('Circle', 'cx cy r role alpha')
+# 塗りつぶし多角形
+Polygon = namedtuple('Polygon', 'points role alpha')
+
+# デザイン単位（1024px キャンバスの px）での基本ロゴ。原点はトラック中心
+DESIGN_SIZE = 1024
+TRACK_RX, TRACK_RY = 340, 240
+TRACK_THICKNESS = 48
+LANE_INSET = 42            # トラック外周からレーンラインまで
+LANE_WIDTH = 3
+GRAPH_POINTS = [(-180, 80), (-90, 40), (-10, 10), (80, -50), (170, -130)]
+GRAPH_FILL_BOTTOM = 100    # グロー領域の下端（トラック中心からの y）
+GRAPH_WIDTH = 10
+DOT_RADIUS = 8
+LAST_DOT_RADIUS = 12
+DOT_RING = 3
+ARROW_GAP = 16             # 最後のドットから矢印の根元まで
+ARROW_LENGTH = 40
+ARROW_WIDTH = 6
+ARROW_HEAD = (12, 14, 6)   # (先端の高さ, 半幅, 根元側の張り出し)
+M_WEIGHT_RATIO = 14 / 120  # "M" の線幅 / 高さ
+
+# アイコン種別ごとの配置とスタイル
+#   center:  トラック中心（デザイン単位）
+#   scale:   基本ロゴに対する倍率
+#   m:       "M" の (左上x, 左上y, 高さ)（デザイン単位, None で省略）
+#   background / circles / shadow / highlight / lane / dot_rings: 装飾の有無
+#   glow:    グラフ下の塗り (ロール, 不透明度)
+#   weight:  線幅・リング幅の倍率（小さいサイズ向けに太くする）
+#   min_px:  線幅・リング幅の最小ピクセル数（小さいサイズでの潰れ防止）
+#   detail:  'full' または 'simple'（simple はドット・矢印・"M" を省略し、最後の点だけ描く）
+VARIANTS = {
+    'icon': dict(
+        center=(512, 542), scale=1.0, m=(140, 140, 120),
+        background='BG_DARK', circles=True, shadow=True, highlight=True, lane=True,
+        dot_rings=True, glow=('EMERALD', 35 / 255), weight=1.0, min_px=1.0, detail='full',
+    ),
+    'adaptive': dict(
+        center=(512, 532), scale=240 / 340, m=(204, 204, 90),
+        background=None, circles=False, shadow=False, highlight=False, lane=False,
+        dot_rings=False, glow=('EMERALD', 50 / 255), weight=1.0, min_px=1.0, detail='full',
+    ),
+    'splash': dict(
+        center=(512, 492), scale=300 / 340, m=(352, 762, 80),
+        background=None, circles=False, shadow=False, highlight=False, lane=False,
+        dot_rings=False, glow=('EMERALD_LIGHT', 40 / 255), weight=1.0, min_px=1.0, detail='full',
+    ),
+    'favicon': dict(
+        center=(512, 555), scale=384 / 340, m=None,
+        background='BG_DARK', circles=False, shadow=False, highlight=False, lane=False,
+        dot_rings=False, glow=None, weight=1.8, min_px=2.0, detail='simple',
+    ),
+}
+
+
+def build_scene(variant, size):
+    """
+    アイコン種別のシーンを構築。
+    戻り値: (背景ロール or None, プリミティブのリスト)。描画順に並ぶ。
+    size は min_px（最小ピクセル幅）を正規化座標に換算するためだけに使う。
+    """
+    spec = VARIANTS[variant]
+    u = 1.0 / DESIGN_SIZE
+    s = spec['scale']
+    ox, oy = spec['center']
+    min_w = spec['min_px'] / size
+
+    def pt(x, y):
+        return ((ox + x * s) * u, (oy + y * s) * u)
+
+    def length(v):
+        return v * s * u
+
+    def stroke(v):
+        return max(length(v) * spec['weight'], min_w)
+
+    prims = []
+    if spec['circles']:
+        for i in range(3):
+            r = (DESIGN_SIZE // 2 - i * 60) * u
+            prims.append(Circle(0.5, 0.5, r, 'EMERALD', (15 + i * 5) / 255))
+
+    rx, ry = length(TRACK_RX), length(TRACK_RY)
+    cx, cy = pt(0, 0)
+    thickness = stroke(TRACK_THICKNESS)
+    if spec['shadow']:
+        prims.append(Ellipse(cx, cy + length(8), rx + length(4), ry, 'BLACK', 40 / 255))
+    prims.append(Ring(cx, cy, rx, ry, thickness, 'EMERALD', 1.0, None))
+    if spec['highlight']:
+        prims.append(Ring(cx, cy, rx, ry, thickness, 'WHITE', 20 / 255, cy))
+    if spec['lane']:
+        lane = LANE_INSET
+        prims.append(Ring(cx, cy, length(TRACK_RX - lane), length(TRACK_RY - lane),
+                          stroke(LANE_WIDTH), 'WHITE', 60 / 255, None))
+
+    points = [pt(x, y) for x, y in GRAPH_POINTS]
+    if spec['glow']:
+        role, alpha = spec['glow']
+        last_x, first_x = GRAPH_POINTS[-1][0], GRAPH_POINTS[0][0]
+        fill = points + [pt(last_x, GRAPH_FILL_BOTTOM), pt(first_x, GRAPH_FILL_BOTTOM)]
+        prims.append(Polygon(tuple(fill), role, alpha))
+
+    if spec['detail'] == 'simple':
+        line_points = points[1:]
+        for (x0, y0), (x1, y1) in zip(line_points, line_points[1:]):
+            prims.append(Segment(x0, y0, x1, y1, stroke(GRAPH_WIDTH), 'EMERALD_LIGHT', 1.0))
+        lx, ly = points[-1]
+        prims.append(Circle(lx, ly, max(length(LAST_DOT_RADIUS) * spec['weight'], min_w), 'WHITE', 1.0))
+        return spec['background'], prims
+
+    width = stroke(GRAPH_WIDTH)
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        prims.append(Segment(x0, y0, x1, y1, width, 'EMERALD_LIGHT', 1.0))
+
+    for i, (px, py) in enumerate(points):
+        last = i == len(points) - 1
+        r = length(LAST_DOT_RADIUS if last else DOT_RADIUS)
+        if spec['dot_rings']:
+            prims.append(Circle(px, py, r + length(DOT_RING), 'EMERALD_DARK', 1.0))
+        prims.append(Circle(px, py, r, 'WHITE' if last else 'EMERALD_LIGHT', 1.0))
+
+    # 矢印（最後のドットから上方向）
+    ax, ay = GRAPH_POINTS[-1]
+    base_y = ay - ARROW_GAP
+    top_y = base_y - ARROW_LENGTH
+    tip, half, back = ARROW_HEAD
+    (sx0, sy0), (sx1, sy1) = pt(ax, base_y), pt(ax, top_y)
+    prims.append(Segment(sx0, sy0, sx1, sy1, stroke(ARROW_WIDTH), 'WHITE', 1.0))
+    prims.append(Polygon((pt(ax, top_y - tip), pt(ax - half, top_y + back), pt(ax + half, top_y + back)),
+                         'WHITE', 1.0))
+
+    if spec['m']:
+        prims.extend(m_strokes(*spec['m'], u=u, min_w=min_w))
+    return spec['background'], prims
+
+
+def m_strokes(x, y, height, u, min_w=0.0):
+    """M のレターマーク（4本の線分）。x, y は左上、デザイン単位"""
+    w = max(height * M_WEIGHT_RATIO * u, min_w)
+    corners = [(x, y + height), (x, y), (x + height / 2, y + height / 2), (x + height, y), (x + height, y + height)]
+    corners = [(cx * u, cy * u) for cx, cy in corners]
+    return [Segment(x0, y0, x1, y1, w, 'WHITE', 1.0) for (x0, y0), (x1, y1) in zip(corners, corners[1:])]
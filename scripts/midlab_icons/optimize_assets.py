@@ -0,0 +1,407 @@
+"""
+アイコン PNG のサイズ最適化と Web 向け形式（WebP / AVIF / ICO）の書き出し
+
+PNG は複数の可逆エンコード方式を並列に試し、最小のものを残す:
+  - 色の削減: 全ピクセル不透明なら RGB、灰色のみならグレースケール、
+    色数が 256 以下なら完全一致のパレット（1/2/4/8 bit + tRNS）
+  - フィルタ: None / Sub / Up / Average / Paeth と行ごとの適応選択（NumPy で一括計算）
+  - zlib: レベル 9 で戦略 DEFAULT / FILTERED / RLE
+  - 比較用に Pillow の optimize=True と元ファイルそのもの
+メタデータ（テキスト・EXIF・時刻チャンクなど）は書き出さない。
+完全に透明なピクセルの RGB は見た目に影響しないため (0, 0, 0) に揃えてから比較する。
+採用する前にデコード結果が元画像と一致することを確認する。
+
+--palette-favicon を付けると 64px 以下の画像に限り、256 色への量子化と
+1bit アルファ（しきい値 128）のパレット PNG も候補にする（非可逆）。
+
+Web 向け（--web-out 配下）:
+  <名前>.webp   可逆 WebP
+  <名前>.avif   品質 100 / 4:4:4（Pillow が AVIF 対応の場合のみ）
+  favicon.ico   16 / 32 / 48px を含むマルチサイズ ICO（favicon.png がある場合）
+
+使い方:
+  python3 scripts/optimize_assets.py                       # assets/images/*.png を最適化
+  python3 scripts/optimize_assets.py assets/images/icon.png --time-budget 10
+  python3 scripts/optimize_assets.py --web-out build/web-icons
+"""
+
+import argparse
+import glob
+import io
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, features
+
+from .asset_cache import AssetCache
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG のカラータイプ
+GRAY, RGB, PALETTE, GRAY_ALPHA, RGBA = 0, 2, 3, 4, 6
+
+# フィルタ番号（ADAPTIVE は行ごとに最小のものを選ぶ）
+FILTERS = (0, 1, 2, 3, 4)
+ADAPTIVE = "adaptive"
+FILTER_NAMES = {0: "none", 1: "sub", 2: "up", 3: "average", 4: "paeth", ADAPTIVE: ADAPTIVE}
+
+ZLIB_STRATEGIES = (
+    ("default", zlib.Z_DEFAULT_STRATEGY),
+    ("filtered", zlib.Z_FILTERED),
+    ("rle", zlib.Z_RLE),
+)
+
+# --palette-favicon の対象になる最大サイズ
+FAVICON_MAX_SIZE = 64
+ICO_SIZES = (16, 32, 48)
+
+
+# --- PNG エンコーダ ---
+
+def _chunk(tag, data):
+    body = tag + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def _filter_rows(rows, bpp, ftype):
+    """(h, stride) uint8 の生データに PNG フィルタを適用（全行同じフィルタ）"""
+    x = rows.astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    b = np.zeros_like(x)
+    b[1:] = x[:-1]
+    if ftype == 0:
+        out = x
+    elif ftype == 1:
+        out = x - a
+    elif ftype == 2:
+        out = x - b
+    elif ftype == 3:
+        out = x - ((a + b) >> 1)
+    else:
+        c = np.zeros_like(x)
+        c[1:, bpp:] = x[:-1, :-bpp]
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        pred = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        out = x - pred
+    return (out & 0xFF).astype(np.uint8)
+
+
+def filtered_scanlines(rows, bpp, ftype):
+    """フィルタ番号の先頭バイト付きスキャンライン（IDAT に圧縮する前のバイト列）"""
+    h, stride = rows.shape
+    lines = np.empty((h, stride + 1), dtype=np.uint8)
+    if ftype == ADAPTIVE:
+        # 行ごとに「符号付きバイトの絶対値和」が最小のフィルタを選ぶ（libpng と同じ経験則）
+        candidates = [_filter_rows(rows, bpp, f) for f in FILTERS]
+        scores = np.stack([np.abs(c.view(np.int8).astype(np.int16)).sum(axis=1) for c in candidates])
+        best = scores.argmin(axis=0)
+        lines[:, 0] = best
+        for f, c in zip(FILTERS, candidates):
+            selected = best == f
+            lines[selected, 1:] = c[selected]
+    else:
+        lines[:, 0] = ftype
+        lines[:, 1:] = _filter_rows(rows, bpp, ftype)
+    return lines.tobytes()
+
+
+def encode_png(view, raw, strategy):
+    """
+    削減済みの画像表現 view とフィルタ済みスキャンライン raw から PNG バイト列を作る。
+    view: dict(color_type, bit_depth, width, height, palette, trns)
+    """
+    ihdr = struct.pack(">IIBBBBB", view["width"], view["height"], view["bit_depth"],
+                       view["color_type"], 0, 0, 0)
+    parts = [PNG_SIGNATURE, _chunk(b"IHDR", ihdr)]
+    if view["palette"] is not None:
+        parts.append(_chunk(b"PLTE", view["palette"]))
+    if view["trns"]:
+        parts.append(_chunk(b"tRNS", view["trns"]))
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    parts.append(_chunk(b"IDAT", compressor.compress(raw) + compressor.flush()))
+    parts.append(_chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+# --- 色の削減 ---
+
+def normalized_rgba(image):
+    """比較用の RGBA 配列（完全に透明なピクセルの RGB は 0 に揃える）"""
+    data = np.array(image.convert("RGBA"))
+    data[data[:, :, 3] == 0] = 0
+    return data
+
+
+def _pack_bits(indices, bit_depth):
+    """(h, w) のパレット番号を bit_depth で詰めた (h, stride) uint8 に"""
+    if bit_depth == 8:
+        return indices.astype(np.uint8)
+    h, w = indices.shape
+    per_byte = 8 // bit_depth
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :w] = indices
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bit_depth
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def _palette_view(data, width, height):
+    """色数が 256 以下なら完全一致のパレット表現、超えるなら None"""
+    flat = data.reshape(-1, 4)
+    keys = flat.view(np.uint32).ravel()
+    colors, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    if len(colors) > 256:
+        return None
+    rgba = colors.view(np.uint8).reshape(-1, 4)
+    # 半透明の色を先頭に集めて tRNS を短くし、その中では出現数の多い順
+    order = np.lexsort((-counts, rgba[:, 3] == 255))
+    remap = np.empty(len(colors), dtype=np.int64)
+    remap[order] = np.arange(len(colors))
+    rgba = rgba[order]
+    indices = remap[inverse].reshape(height, width)
+
+    bit_depth = next(d for d in (1, 2, 4, 8) if len(colors) <= 1 << d)
+    translucent = int((rgba[:, 3] < 255).sum())
+    return dict(
+        name=f"palette{len(colors)}", color_type=PALETTE, bit_depth=bit_depth,
+        width=width, height=height, bpp=1,
+        palette=rgba[:, :3].tobytes(), trns=rgba[:translucent, 3].tobytes(),
+        rows=_pack_bits(indices, bit_depth),
+    )
+
+
+def reduced_views(image, lossy_palette=False):
+    """試す画像表現（カラータイプ・ビット深度・パレット）のリスト"""
+    data = normalized_rgba(image)
+    height, width = data.shape[:2]
+    opaque = bool((data[:, :, 3] == 255).all())
+    gray = bool(((data[:, :, 0] == data[:, :, 1]) & (data[:, :, 1] == data[:, :, 2])).all())
+
+    def direct(name, color_type, channels):
+        pixels = data[:, :, channels]
+        return dict(name=name, color_type=color_type, bit_depth=8, width=width, height=height,
+                    bpp=len(channels), palette=None, trns=b"",
+                    rows=np.ascontiguousarray(pixels).reshape(height, -1))
+
+    views = []
+    if gray:
+        views.append(direct("gray", GRAY, [0]) if opaque else direct("gray+alpha", GRAY_ALPHA, [0, 3]))
+    else:
+        views.append(direct("rgb", RGB, [0, 1, 2]) if opaque else direct("rgba", RGBA, [0, 1, 2, 3]))
+    palette = _palette_view(data, width, height)
+    if palette:
+        views.append(palette)
+    elif lossy_palette and max(width, height) <= FAVICON_MAX_SIZE:
+        views.append(_quantized_view(data, width, height))
+    return views
+
+
+def _quantized_view(data, width, height):
+    """256 色 + 1bit アルファに量子化したパレット表現（非可逆）"""
+    rgb = Image.fromarray(np.ascontiguousarray(data[:, :, :3]), "RGB")
+    quantized = np.array(rgb.quantize(255, method=Image.Quantize.MEDIANCUT).convert("RGB"))
+    binary = np.dstack([quantized, np.where(data[:, :, 3] >= 128, 255, 0).astype(np.uint8)])
+    binary[binary[:, :, 3] == 0] = 0
+    view = _palette_view(binary, width, height)
+    view["name"] = "quantized" + view["name"][len("palette"):]
+    view["lossy"] = True
+    return view
+
+
+# --- 最適化 ---
+
+def _trials(views):
+    """(view, フィルタ, 戦略名, zlib 戦略) を有望な順に並べる"""
+    first, rest = [], []
+    for view in views:
+        filters = (0, ADAPTIVE) if view["color_type"] == PALETTE else (ADAPTIVE, 4, 0, 1, 2, 3)
+        for i, ftype in enumerate(filters):
+            for j, (sname, strategy) in enumerate(ZLIB_STRATEGIES):
+                (first if i == 0 and j == 0 else rest).append((view, ftype, sname, strategy))
+    return first + rest
+
+
+def optimize_png(image, original=None, deadline=None, workers=None, lossy_palette=False):
+    """
+    最小の PNG を探す。
+    original に元ファイルのバイト列を渡すとそれも候補に含める。
+    deadline（time.perf_counter() の値）を過ぎたら新しい候補は試さない
+    （各表現の最初の候補と Pillow optimize は必ず試す）。
+    戻り値: (PNG バイト列, 方式の説明)
+    """
+    # (PNG バイト列, 方式, 非可逆か)
+    candidates = []
+    if original is not None:
+        candidates.append((original, "元ファイル", False))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    candidates.append((buffer.getvalue(), "pillow optimize", False))
+
+    views = reduced_views(image, lossy_palette)
+    lines = {}
+
+    def scanlines(view, ftype):
+        # 同じ (表現, フィルタ) のフィルタ処理は1回だけ（スレッド間で重複しても結果は同じ）
+        key = (view["name"], ftype)
+        if key not in lines:
+            lines[key] = filtered_scanlines(view["rows"], view["bpp"], ftype)
+        return lines[key]
+
+    def attempt(trial, required):
+        view, ftype, sname, strategy = trial
+        if not required and deadline is not None and time.perf_counter() > deadline:
+            return None
+        data = encode_png(view, scanlines(view, ftype), strategy)
+        label = f"{view['name']} / {FILTER_NAMES[ftype]} / {sname}"
+        lossy = view.get("lossy", False)
+        return data, label + "（非可逆）" if lossy else label, lossy
+
+    trials = _trials(views)
+    required = len(views)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(attempt, trial, i < required) for i, trial in enumerate(trials)]
+        results = [f.result() for f in futures]
+    candidates.extend(r for r in results if r is not None)
+
+    reference = normalized_rgba(image)
+    for data, label, lossy in sorted(candidates, key=lambda c: len(c[0])):
+        if lossy or np.array_equal(normalized_rgba(Image.open(io.BytesIO(data))), reference):
+            return data, label
+    raise RuntimeError("デコード結果が一致する候補がありません")
+
+
+def optimize_file(path, deadline=None, workers=None, lossy_palette=False, refresh_cache=True):
+    """
+    PNG ファイルを最適化して上書き（小さくなった場合のみ）。
+    refresh_cache=True なら、出力先の .icon-cache.json に記録がある場合に
+    キーを保ったままサイズ・mtime を更新する（呼び出し側が記録する場合は False）。
+    戻り値: dict(path, before, after, method, seconds)
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        original = f.read()
+    image = Image.open(io.BytesIO(original))
+    image.load()
+    data, method = optimize_png(image, original, deadline, workers, lossy_palette)
+    if len(data) < len(original):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        if refresh_cache:
+            cache = AssetCache.for_directory(os.path.dirname(path) or ".")
+            if cache.refresh(path):
+                cache.save()
+    return dict(path=path, before=len(original), after=min(len(data), len(original)),
+                method=method, seconds=time.perf_counter() - start)
+
+
+def optimize_files(paths, time_budget=None, workers=None, lossy_palette=False, verbose=True):
+    """
+    複数の PNG を順に最適化。time_budget（秒）は残り時間を残りのファイル数で等分する。
+    戻り値: optimize_file の結果のリスト
+    """
+    start = time.perf_counter()
+    results = []
+    for i, path in enumerate(paths):
+        deadline = None
+        if time_budget is not None:
+            remaining = time_budget - (time.perf_counter() - start)
+            deadline = time.perf_counter() + max(0.0, remaining) / (len(paths) - i)
+        result = optimize_file(path, deadline, workers, lossy_palette)
+        results.append(result)
+        if verbose:
+            print(f"  {path}: {result['before']:,} -> {result['after']:,} bytes "
+                  f"({result['method']}, {result['seconds']:.1f}s)")
+    return results
+
+
+# --- Web 向け ---
+
+def export_web(paths, web_dir, verbose=True):
+    """WebP / AVIF / favicon.ico を書き出す。戻り値: [(パス, バイト数)]"""
+    os.makedirs(web_dir, exist_ok=True)
+    avif = features.check("avif")
+    if not avif and verbose:
+        print("  AVIF は Pillow が未対応のためスキップします")
+    written = []
+
+    def save(image, path, **params):
+        image.save(path, **params)
+        written.append((path, os.path.getsize(path)))
+
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        image = Image.open(path)
+        image.load()
+        save(image, os.path.join(web_dir, f"{name}.webp"), format="WEBP", lossless=True,
+             quality=100, method=6, exact=False)
+        if avif:
+            save(image, os.path.join(web_dir, f"{name}.avif"), format="AVIF", quality=100,
+                 subsampling="4:4:4")
+        if name == "favicon":
+            save(image.convert("RGBA"), os.path.join(web_dir, "favicon.ico"), format="ICO",
+                 sizes=[(s, s) for s in ICO_SIZES])
+    return written
+
+
+def print_report(results, web=()):
+    """変換前後のバイト数のレポート"""
+    print(f"\n{'ファイル':<32} {'変換前':>10} {'変換後':>10} {'削減':>7}  方式")
+    for r in results:
+        saved = 1 - r["after"] / r["before"] if r["before"] else 0.0
+        print(f"{os.path.basename(r['path']):<32} {r['before']:>10,} {r['after']:>10,} "
+              f"{saved:>6.1%}  {r['method']}")
+    before = sum(r["before"] for r in results)
+    after = sum(r["after"] for r in results)
+    if before:
+        print(f"{'合計':<32} {before:>10,} {after:>10,} {1 - after / before:>6.1%}")
+    if web:
+        print(f"\n{'Web 向け':<32} {'バイト':>10}")
+        for path, size in web:
+            print(f"{os.path.basename(path):<32} {size:>10,}")
+
+
+def collect_pngs(targets):
+    """ファイル・ディレクトリの指定から PNG のリストを作る"""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(sorted(glob.glob(os.path.join(target, "*.png"))))
+        else:
+            paths.append(target)
+    return paths
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="アイコン PNG のサイズ最適化と Web 向け形式の書き出し")
+    parser.add_argument("paths", nargs="*", default=["assets/images"],
+                        help="PNG ファイルまたはディレクトリ (デフォルト: assets/images)")
+    parser.add_argument("--web-out", default=None, help="WebP / AVIF / favicon.ico の出力先")
+    parser.add_argument("--time-budget", type=float, default=None, metavar="SECONDS",
+                        help="PNG 最適化全体の時間の目安（秒）")
+    parser.add_argument("--workers", type=int, default=None, help="候補を試すスレッド数")
+    parser.add_argument("--palette-favicon", action="store_true",
+                        help=f"{FAVICON_MAX_SIZE}px 以下の画像に 256 色 + 1bit アルファの候補も試す（非可逆）")
+    args = parser.parse_args(argv)
+
+    paths = collect_pngs(args.paths)
+    if not paths:
+        print("PNG が見つかりません")
+        return 1
+    print(f"{len(paths)}ファイルを最適化中...")
+    results = optimize_files(paths, args.time_budget, args.workers, args.palette_favicon)
+    web = export_web(paths, args.web_out) if args.web_out else []
+    print_report(results, web)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
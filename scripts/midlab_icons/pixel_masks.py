@@ -0,0 +1,132 @@
+"""
+process_icons.py 共通のピクセル分類カーネル
+
+チェッカー柄・ロゴの緑・スプラッシュのノイズ判定を、行チャンク単位の1パスで計算する。
+各チャネルは int16 のスクラッチバッファ（チャンク分のみ事前確保）に読み込み、
+明るさは (r + g + b) / 3 > T の代わりに整数和 r + g + b > 3T で比較する。
+結果は従来の astype(int) + float 比較と完全に一致する。
+
+マスク:
+  KEEP_GREEN         ロゴの緑（remove_all_checker で保護するピクセル）
+  CHECKER_CANDIDATE  灰色で明るいピクセル（remove_bg_edge_flood の背景候補）
+  SPLASH_WHITE       スプラッシュで白に置き換えるチェッカー・ノイズ
+  GUIDE_GRAY         灰色で中間の明るさのピクセル（ガイド破線、グリッド検出用）
+"""
+
+from .lazy_modules import lazy_import
+
+np = lazy_import("numpy")
+
+KEEP_GREEN = "keep_green"
+CHECKER_CANDIDATE = "checker_candidate"
+SPLASH_WHITE = "splash_white"
+GUIDE_GRAY = "guide_gray"
+ALL_MASKS = (KEEP_GREEN, CHECKER_CANDIDATE, SPLASH_WHITE, GUIDE_GRAY)
+
+# 1チャンクあたりのピクセル数の目安（スクラッチは int16 x 7 + bool x 2）
+CHUNK_PIXELS = 1 << 20
+
+
+def chunk_rows_for(width, chunk_pixels=CHUNK_PIXELS):
+    return max(1, chunk_pixels // max(1, width))
+
+
+def classify_pixels(data, masks=ALL_MASKS, chunk_rows=None, out=None):
+    """
+    RGB(A) の uint8 配列 (h, w, 3 or 4) から指定マスクを1パスで計算。
+    out に {マスク名: (h, w) bool 配列} を渡すとそこに書き込む。
+    戻り値: {マスク名: (h, w) bool 配列}
+    """
+    h, w = data.shape[:2]
+    # 行ストリーミングの小さなスラブではスラブの高さ分だけ確保する
+    rows = max(1, min(h, chunk_rows or chunk_rows_for(w)))
+    if out is None:
+        out = {}
+    for name in masks:
+        if name not in ALL_MASKS:
+            raise ValueError(f"unknown mask: {name}")
+        if name not in out:
+            out[name] = np.empty((h, w), dtype=bool)
+
+    # チャンク分のスクラッチを事前確保
+    r = np.empty((rows, w), dtype=np.int16)
+    g = np.empty((rows, w), dtype=np.int16)
+    b = np.empty((rows, w), dtype=np.int16)
+    total = np.empty((rows, w), dtype=np.int16)
+    d_rg = np.empty((rows, w), dtype=np.int16)
+    d_gb = np.empty((rows, w), dtype=np.int16)
+    tmp = np.empty((rows, w), dtype=np.int16)
+    t0 = np.empty((rows, w), dtype=bool)
+    t1 = np.empty((rows, w), dtype=bool)
+    need_gray = CHECKER_CANDIDATE in masks or SPLASH_WHITE in masks or GUIDE_GRAY in masks
+
+    for y0 in range(0, h, rows):
+        y1 = min(h, y0 + rows)
+        n = y1 - y0
+        cr, cg, cb = r[:n], g[:n], b[:n]
+        np.copyto(cr, data[y0:y1, :, 0])
+        np.copyto(cg, data[y0:y1, :, 1])
+        np.copyto(cb, data[y0:y1, :, 2])
+        s, m, a, c = total[:n], tmp[:n], t0[:n], t1[:n]
+        np.add(cr, cg, out=s)
+        s += cb
+        if need_gray:
+            np.subtract(cr, cg, out=d_rg[:n])
+            np.abs(d_rg[:n], out=d_rg[:n])
+            np.subtract(cg, cb, out=d_gb[:n])
+            np.abs(d_gb[:n], out=d_gb[:n])
+
+        if KEEP_GREEN in masks:
+            # is_green = (g > r+15) & (g > b+15) & (g > 50) は
+            # green_dominant = (g > r) & (g > b) & (g - min(r, b) > 10) に包含される
+            dst = out[KEEP_GREEN][y0:y1]
+            np.greater(cg, cr, out=dst)
+            np.greater(cg, cb, out=a)
+            dst &= a
+            np.minimum(cr, cb, out=m)
+            np.subtract(cg, m, out=m)
+            np.greater(m, 10, out=a)
+            dst &= a
+
+        if CHECKER_CANDIDATE in masks:
+            # is_gray(<15) & brightness > 170
+            dst = out[CHECKER_CANDIDATE][y0:y1]
+            np.less(d_rg[:n], 15, out=dst)
+            np.less(d_gb[:n], 15, out=a)
+            dst &= a
+            np.greater(s, 510, out=a)
+            dst &= a
+
+        if SPLASH_WHITE in masks:
+            # is_gray(<12) & 150 < brightness < 253 & ~is_green
+            # （brightness > 170 のチェッカー判定はこのマスクに包含され、
+            #   is_dark = brightness < 100 は brightness > 150 と両立しないため省略）
+            dst = out[SPLASH_WHITE][y0:y1]
+            np.less(d_rg[:n], 12, out=dst)
+            np.less(d_gb[:n], 12, out=a)
+            dst &= a
+            np.greater(s, 450, out=a)
+            dst &= a
+            np.less(s, 759, out=a)
+            dst &= a
+            # is_green = (g > r + 15) & (g > b + 15)
+            np.subtract(cg, cr, out=m)
+            np.greater(m, 15, out=a)
+            np.subtract(cg, cb, out=m)
+            np.greater(m, 15, out=c)
+            a &= c
+            np.logical_not(a, out=a)
+            dst &= a
+
+        if GUIDE_GRAY in masks:
+            # is_gray(<15) & 100 <= brightness <= 170（チェッカーより暗く、ラベル帯・黒より明るい灰色）
+            dst = out[GUIDE_GRAY][y0:y1]
+            np.less(d_rg[:n], 15, out=dst)
+            np.less(d_gb[:n], 15, out=a)
+            dst &= a
+            np.greater_equal(s, 300, out=a)
+            dst &= a
+            np.less_equal(s, 510, out=a)
+            dst &= a
+
+    return out
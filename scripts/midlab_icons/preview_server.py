@@ -0,0 +1,272 @@
+"""
+アイコンのプレビューサーバー（ローカル HTTP）
+
+generate_icons.py の定数を編集したり process_icons.py を実行し直して PNG を開く代わりに、
+ブラウザからパラメータを指定してその場で描画した画像を見る。
+
+  GET /icon?variant=adaptive&size=192&palette=autumn
+      sdf_render.py でアイコン種別（icon / adaptive / splash / favicon）を size px で描画し、
+      パレット（--palettes のディレクトリの <名前>.json、省略時は default）で塗り直した PNG
+  GET /icon?variant=adaptive&size=192&source=scripts/source_icon.png
+      ソースグリッド（起動時に指定したもの）を process_icons.py で処理して size px に縮小した PNG
+  GET /
+      全パレット・全ソース x 全種別のサムネイル一覧（レビュー用、?size= で大きさを変える）
+
+結果は MemoryLRU（--memory MB）に保持する:
+  - パレット非依存の描画（icon_variants.render_base、種別 x サイズごと）
+  - デコード済みのソース配列と処理済みの出力（ソースのハッシュごと）
+  - エンコード済みの PNG（全パラメータのキャッシュキーごと）
+同じキーの同時リクエストは1回の描画にまとめる（single-flight）。サムネイル一覧のように
+同じサイズでパレット違いの画像が並ぶ場合、描画は種別ごとに1回で、残りは LUT での塗り直しだけ。
+PNG のキャッシュキーを ETag として返すので、再読み込みは 304 で済む。
+
+描画関数・パレットファイルを変えたら再起動する（ソースグリッドは内容のハッシュで判定するので不要）。
+
+使い方:
+  npm run icons -- preview                                  # http://127.0.0.1:8765/
+  npm run icons -- preview scripts/source_icon.png --port 9000
+"""
+
+import argparse
+import glob
+import html
+import os
+import sys
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from .asset_cache import MemoryLRU, SingleFlight, cache_key, file_sha256
+from .generate_icons import SDF_VARIANTS
+from .lazy_modules import lazy_import
+from .sinks import encode_png
+
+Image = lazy_import("PIL.Image")
+
+DEFAULT_PORT = 8765
+DEFAULT_MEMORY_MB = 256
+DEFAULT_PALETTE_DIR = "scripts/palettes"
+THUMBNAIL_SIZE = 128
+MIN_SIZE, MAX_SIZE = 16, 2048
+# 種別名 -> 出力ファイル名（generate_icons.SDF_VARIANTS の逆引き）
+VARIANT_FILES = {variant: fname for fname, variant in SDF_VARIANTS.items()}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def query_size(query):
+    """クエリの size（省略時は THUMBNAIL_SIZE、MIN_SIZE〜MAX_SIZE 以外は BadRequest）"""
+    try:
+        size = int(query.get("size", THUMBNAIL_SIZE))
+    except ValueError:
+        raise BadRequest(f"size が整数ではありません: {query['size']}")
+    if not MIN_SIZE <= size <= MAX_SIZE:
+        raise BadRequest(f"size は {MIN_SIZE}〜{MAX_SIZE}: {size}")
+    return size
+
+
+class PreviewRenderer:
+    """リクエストのパラメータから PNG を作る（MemoryLRU + single-flight）"""
+
+    def __init__(self, palette_dir=DEFAULT_PALETTE_DIR, sources=(), memory_mb=DEFAULT_MEMORY_MB):
+        from .icon_variants import load_palette
+        from .sdf_render import DEFAULT_PALETTE
+        self.palettes = {"default": dict(DEFAULT_PALETTE)}
+        for path in sorted(glob.glob(os.path.join(palette_dir, "*.json"))):
+            name, colors = load_palette(path)
+            self.palettes[name] = colors
+        self.sources = list(sources)
+        self.memo = MemoryLRU(int(memory_mb * (1 << 20)))
+        self.flight = SingleFlight()
+        self.renders = 0
+        self._hashes = {}
+
+    def _cached(self, key, compute, nbytes=None):
+        """memo にあればそれを、なければ single-flight で compute() して memo に入れる"""
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+
+        def run():
+            value = self.memo.get(key)
+            if value is None:
+                value = compute()
+                self.memo.put(key, value, nbytes(value) if nbytes else None)
+            return value
+
+        return self.flight.do(key, run)
+
+    def _base(self, fname, size):
+        from .icon_variants import render_base
+
+        def render():
+            self.renders += 1
+            return render_base(fname, size)
+
+        return self._cached(("base", fname, size), render,
+                            nbytes=lambda base: base.index.nbytes + base.table.nbytes)
+
+    def _source_hash(self, path):
+        """ソースのハッシュ（mtime・サイズが変わっていなければ前回の値）"""
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = self._hashes[path] = (stamp, file_sha256(path))
+        return cached[1]
+
+    def _source_output(self, path, fname):
+        """ソースグリッドの処理済み出力（フルサイズの PIL 画像）"""
+        from .process_icons import decode_source, process_quadrant_array
+        source_hash = self._source_hash(path)
+
+        def decode():
+            with Image.open(path) as source:
+                return decode_source(source)
+
+        def process():
+            self.renders += 1
+            source_data = self._cached(("source", source_hash), decode)
+            return process_quadrant_array(source_data, fname)
+
+        return source_hash, self._cached(("output", source_hash, fname), process)
+
+    def icon(self, query):
+        """/icon のクエリ -> (ETag, PNG のバイト列)"""
+        variant = query.get("variant", "icon")
+        if variant not in VARIANT_FILES:
+            raise BadRequest(f"variant は {' / '.join(VARIANT_FILES)} のいずれか: {variant}")
+        fname = VARIANT_FILES[variant]
+        size = query_size(query)
+
+        source = query.get("source")
+        if source is not None:
+            if source not in self.sources:
+                raise BadRequest(f"起動時に指定していないソースです: {source}")
+            source_hash, image = self._source_output(source, fname)
+            key = cache_key("source", source_hash, fname, size)
+
+            def encode():
+                resized = image if image.size == (size, size) else image.resize((size, size), Image.LANCZOS)
+                return encode_png(resized)
+        else:
+            name = query.get("palette", "default")
+            if name not in self.palettes:
+                raise BadRequest(f"未知のパレット: {name}（{' / '.join(self.palettes)}）")
+            colors = self.palettes[name]
+            key = cache_key("sdf", fname, size, colors)
+
+            def encode():
+                from .icon_variants import recolor
+                return encode_png(recolor(self._base(fname, size), colors))
+
+        return key[:32], self._cached(("png", key), encode)
+
+    def index_html(self, size=THUMBNAIL_SIZE):
+        """全パレット・全ソース x 全種別のサムネイル一覧"""
+        rows = [(f"palette: {name}", f"palette={quote(name)}") for name in self.palettes]
+        rows += [(f"source: {path}", f"source={quote(path)}") for path in self.sources]
+        cells = []
+        for title, param in rows:
+            images = "".join(
+                f'<figure><img src="/icon?variant={variant}&amp;size={size}&amp;{param}" '
+                f'width="{size}" height="{size}" alt="{variant}"><figcaption>{variant}</figcaption></figure>'
+                for variant in VARIANT_FILES
+            )
+            cells.append(f"<section><h2>{html.escape(title)}</h2>{images}</section>")
+        return (
+            "<!doctype html><meta charset=\"utf-8\"><title>MidLab アイコンプレビュー</title>"
+            "<style>body{background:#222;color:#ddd;font:13px sans-serif}"
+            "figure{display:inline-block;margin:6px;text-align:center}"
+            "img{background:repeating-conic-gradient(#555 0 25%,#777 0 50%) 0 0/16px 16px}</style>"
+            + "".join(cells)
+        )
+
+    def summary(self):
+        return f"描画 {self.renders}回 / {self.memo.summary()}"
+
+
+def make_handler(renderer, verbose=True):
+    class Handler(BaseHTTPRequestHandler):
+        # 常に Content-Length を返すので接続を使い回せる。小さな応答をヘッダと本体の
+        # 2回に分けて書くので、Nagle と遅延 ACK による数十 ms の待ちを避ける
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            start = time.perf_counter()
+            try:
+                if url.path == "/":
+                    self._send(200, "text/html; charset=utf-8", renderer.index_html(query_size(query)).encode())
+                elif url.path == "/icon":
+                    etag, data = renderer.icon(query)
+                    if self.headers.get("If-None-Match") == f'"{etag}"':
+                        self._send(304, None, b"", etag)
+                    else:
+                        self._send(200, "image/png", data, etag)
+                else:
+                    self._send(404, "text/plain; charset=utf-8", b"not found")
+            except (BadRequest, ValueError) as e:
+                self._send(400, "text/plain; charset=utf-8", str(e).encode())
+            except Exception as e:
+                # 描画の失敗（壊れた PNG・起動後に消えたソースなど）でも応答を返し、接続を使い回せるようにする
+                traceback.print_exc()
+                self._send(500, "text/plain; charset=utf-8", f"描画に失敗しました: {type(e).__name__}: {e}".encode())
+            if verbose and url.path != "/":
+                print(f"{self.path} ({(time.perf_counter() - start) * 1000:.1f}ms) {renderer.summary()}")
+
+        def _send(self, status, content_type, body, etag=None):
+            self.send_response(status)
+            if content_type:
+                self.send_header("Content-Type", content_type)
+            if etag:
+                self.send_header("ETag", f'"{etag}"')
+                self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, palette_dir=DEFAULT_PALETTE_DIR, sources=(),
+          memory_mb=DEFAULT_MEMORY_MB, verbose=True):
+    """Ctrl+C までプレビューサーバーを動かす"""
+    renderer = PreviewRenderer(palette_dir, sources, memory_mb)
+    server = ThreadingHTTPServer((host, port), make_handler(renderer, verbose))
+    server.daemon_threads = True
+    print(f"プレビュー: http://{host}:{server.server_port}/（Ctrl+C で終了）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nプレビューを終了しました")
+    finally:
+        server.server_close()
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="アイコンをその場で描画するローカルのプレビューサーバー")
+    parser.add_argument("sources", nargs="*", help="プレビューするソースグリッド（process_icons.py の処理結果を表示）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"ポート (デフォルト: {DEFAULT_PORT})")
+    parser.add_argument("--palettes", default=DEFAULT_PALETTE_DIR,
+                        help=f"パレットファイル（*.json）のディレクトリ (デフォルト: {DEFAULT_PALETTE_DIR})")
+    parser.add_argument("--memory", type=float, default=DEFAULT_MEMORY_MB, metavar="MB",
+                        help=f"描画結果を保持するメモリの上限 (デフォルト: {DEFAULT_MEMORY_MB}MB)")
+    parser.add_argument("--quiet", action="store_true", help="リクエストごとのログを出さない")
+    args = parser.parse_args(argv)
+
+    serve(args.host, args.port, args.palettes, args.sources, args.memory, verbose=not args.quiet)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,854 @@
+"""
+nanobanana proで生成された2x2グリッド画像を
+4つの個別アイコンファイルに分割・処理するスクリプト
+
+使い方:
+  python3 scripts/process_icons.py scripts/source_icon.png
+
+  # バッチモード: ディレクトリまたはglobの候補グリッドをプロセスプールで一括処理
+  python3 scripts/process_icons.py --batch "candidates/*.png" --out build/candidates --workers 16
+
+  # 8192x8192 などの大きなグリッド: 横帯単位のストリーミング処理で作業メモリを 256MB に制限
+  python3 scripts/process_icons.py scripts/source_icon.png --max-memory 256
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from .asset_cache import AssetCache, cache_key, file_sha256, function_version
+from .intermediate_store import add_store_arguments, store_from_args
+from .lazy_modules import lazy_import
+from .pixel_masks import CHECKER_CANDIDATE, KEEP_GREEN, SPLASH_WHITE, classify_pixels
+from .sinks import LINK_MODES, FileSink, MultiSink, encode_png, primary_directory
+from .stage_profiler import enabled as profiler_enabled, profiling, span
+
+# 重い依存は実際に画像を処理するときに初めて import する（キャッシュヒットだけの実行を速くする）
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ndimage = lazy_import("scipy.ndimage")
+
+# 出力ファイル名（2x2グリッドの左上・右上・左下・右下の順）
+OUTPUT_FILES = ["icon.png", "adaptive-icon.png", "splash-icon.png", "favicon.png"]
+
+# バッチモードで拾うソース画像の拡張子
+SOURCE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# ラベル・ガイド線の除去幅（px）
+ICON_LABEL_BAND = 100       # icon: 上部ラベルを黒で塗りつぶす高さ
+SPLASH_LABEL_BAND = 100     # splash: 上部ラベルを白で塗りつぶす高さ
+CHECKER_LABEL_BAND = 140    # remove_all_checker: 上部ラベルの無条件透過
+GUIDE_BAND = 40             # remove_all_checker: 右端・下端ガイド破線の無条件透過
+LEFT_EDGE_BAND = 5          # remove_all_checker: 左端の薄い線
+FLOOD_LABEL_BAND = 100      # remove_bg_edge_flood: 背景候補に含める上部ラベル
+FAVICON_SIZE = 48
+
+
+def is_checker_pixel(r, g, b):
+    """チェッカー柄のピクセルかどうか判定（灰色〜白のグレースケール）"""
+    return (abs(int(r) - int(g)) < 15 and
+            abs(int(g) - int(b)) < 15 and
+            abs(int(r) - int(b)) < 15 and
+            (int(r) + int(g) + int(b)) / 3 > 170)
+
+
+def _clear_non_logo_rows(data, top, height, label_band=CHECKER_LABEL_BAND, guide_band=GUIDE_BAND, mask=None):
+    """
+    remove_all_checker の行カーネル。data は高さ height の画像の
+    [top, top + len(data)) 行の RGBA 配列で、その場で透過を書き込む。
+    label_band / guide_band はシートのグリッド検出で求めた幅を渡す場合に使う。
+    mask に計算済みの KEEP_GREEN（中間ストアの memmap など）を渡すと計算を省く。
+    """
+    # ロゴの主要色（緑系）と中間的な緑（アンチエイリアス境界）を保護
+    with span("mask"):
+        if mask is None:
+            keep_mask = classify_pixels(data, (KEEP_GREEN,))[KEEP_GREEN]
+        else:
+            # 下で書き換えるので、読み取り専用の memmap はコピーする
+            keep_mask = np.array(mask)
+
+    # 上部140px（ラベルテキスト領域）は無条件で透過
+    keep_mask[:max(0, label_band - top), :] = False
+
+    # 右端・下端40px（ガイド破線）は無条件で透過
+    # （-guide_band: と書くと guide_band = 0 で全列になるので、幅から数える）
+    keep_mask[:, keep_mask.shape[1] - guide_band:] = False
+    keep_mask[max(0, height - guide_band - top):, :] = False
+
+    # 左端の薄い線も除去
+    keep_mask[:, :LEFT_EDGE_BAND] = False
+
+    # 透過マスク = 保護対象以外の全ピクセル
+    bg_mask = np.logical_not(keep_mask, out=keep_mask)
+    np.copyto(data[:, :, 3], 0, where=bg_mask)
+
+
+def remove_all_checker(img):
+    """
+    チェッカー柄ピクセルを全て透過にする。
+    adaptive-icon用：ロゴの緑色以外を全て透過に。
+    """
+    with span("convert"):
+        data = np.array(img.convert("RGBA"))
+    _clear_non_logo_rows(data, 0, data.shape[0])
+    return Image.fromarray(data)
+
+
+def _flood_candidate_rows(data, top):
+    """remove_bg_edge_flood の背景候補（チェッカー柄＋上部ラベル）を行単位で計算"""
+    with span("mask"):
+        checker_candidate = classify_pixels(data, (CHECKER_CANDIDATE,))[CHECKER_CANDIDATE]
+    # ラベルテキストエリア（上部100px）も候補に含める
+    checker_candidate[:max(0, FLOOD_LABEL_BAND - top), :] = True
+    return checker_candidate
+
+
+# remove_bg_edge_flood の外周連結成分の抽出エンジン
+#   label:       全連結成分をラベル付けし、外周のラベル集合を set + np.isin で選択（従来方式）
+#   border:      全連結成分をラベル付けし、外周に現れたラベルだけを真にした
+#                ルックアップテーブルで選択（Python の set / list を作らない）
+#   reconstruct: 外周の候補ピクセルを種にした膨張による再構成（binary_propagation）。
+#                外周に繋がる成分だけを辿り、int32 のラベル画像を作らない
+FLOOD_ENGINES = ("label", "border", "reconstruct")
+DEFAULT_FLOOD_ENGINE = "border"
+
+
+def edge_connected_mask(candidate, engine=DEFAULT_FLOOD_ENGINE):
+    """候補マスクのうち、画像の外周に（4近傍で）連結する成分を返す"""
+    if engine == "label":
+        h, w = candidate.shape
+        edge_mask = np.zeros((h, w), dtype=bool)
+        edge_mask[0, :] = True
+        edge_mask[-1, :] = True
+        edge_mask[:, 0] = True
+        edge_mask[:, -1] = True
+
+        labeled, _ = ndimage.label(candidate)
+        edge_labels = set(labeled[edge_mask].flatten()) - {0}
+        return np.isin(labeled, list(edge_labels))
+
+    if engine == "border":
+        labeled, n = ndimage.label(candidate)
+        is_edge_label = np.zeros(n + 1, dtype=bool)
+        for edge in (labeled[0], labeled[-1], labeled[:, 0], labeled[:, -1]):
+            is_edge_label[edge] = True
+        is_edge_label[0] = False
+        return is_edge_label[labeled]
+
+    if engine == "reconstruct":
+        seed = np.zeros_like(candidate)
+        seed[0] = candidate[0]
+        seed[-1] = candidate[-1]
+        seed[:, 0] = candidate[:, 0]
+        seed[:, -1] = candidate[:, -1]
+        return ndimage.binary_propagation(seed, mask=candidate)
+
+    raise ValueError(f"unknown flood engine: {engine} (choose from {', '.join(FLOOD_ENGINES)})")
+
+
+def remove_bg_edge_flood(img, engine=DEFAULT_FLOOD_ENGINE):
+    """エッジからのflood-fillで背景チェッカーを透過（favicon用）"""
+    with span("convert"):
+        data = np.array(img.convert("RGBA"))
+    checker_candidate = _flood_candidate_rows(data, 0)
+    # エッジからの連結成分
+    with span("label", engine=engine):
+        bg_mask = edge_connected_mask(checker_candidate, engine)
+    np.copyto(data[:, :, 3], 0, where=bg_mask)
+    return Image.fromarray(data)
+
+
+def _app_icon_rows(data, top, height, label_band=ICON_LABEL_BAND):
+    """make_app_icon の行カーネル: ラベルテキストを黒で塗りつぶし（上部100px、境界行を含む）"""
+    data[:max(0, label_band + 1 - top)] = 0
+
+
+def _splash_rows(data, top, height, label_band=SPLASH_LABEL_BAND, mask=None):
+    """make_splash_icon の行カーネル（mask に計算済みの SPLASH_WHITE を渡すと計算を省く）"""
+    # ラベルテキストを白で塗りつぶし（上部100px、境界行を含む）
+    data[:max(0, label_band + 1 - top)] = 255
+    # チェッカー柄の灰色部分と、ラベルエリアの下にある微細なドット
+    # （非白・非緑・非黒のグレー）を白で修正。ロゴの緑は保護
+    # （ラベル帯の塗りつぶし後の 255 は SPLASH_WHITE に含まれないので、塗る前のソースで計算したマスクでも同じ結果）
+    with span("mask"):
+        white_mask = mask
+        if white_mask is None:
+            white_mask = classify_pixels(data, (SPLASH_WHITE,))[SPLASH_WHITE]
+    np.copyto(data, 255, where=white_mask[:, :, None])
+
+
+def make_app_icon(img):
+    """App Icon: iOS用 1024x1024, 透過なし, 黒背景"""
+    with span("convert"):
+        data = np.array(img.convert("RGB"))
+    _app_icon_rows(data, 0, data.shape[0])
+    return Image.fromarray(data)
+
+
+def make_adaptive_icon(img):
+    """Adaptive Icon: Android用 1024x1024, 透過あり（全チェッカー柄＋ラベル＋ガイド線を除去）"""
+    return remove_all_checker(img)
+
+
+def make_splash_icon(img):
+    """Splash Icon: スプラッシュスクリーン用 1024x1024, 白背景"""
+    with span("convert"):
+        data = np.array(img.convert("RGB"))
+    _splash_rows(data, 0, data.shape[0])
+    return Image.fromarray(data)
+
+
+def make_favicon(img):
+    """Favicon: Web用 48x48, 透過あり"""
+    favicon_large = remove_all_checker(img)
+    with span("resize"):
+        return favicon_large.resize((FAVICON_SIZE, FAVICON_SIZE), Image.LANCZOS)
+
+
+# --- ストリップ（横帯）単位のストリーミング処理 ---
+# 8192x8192 クラスのマスターグリッドでは象限全体の numpy 配列・マスク・ラベルを
+# 持つとメモリが足りないため、象限を横帯に分けて処理し、出力画像に貼り込む。
+# ソースのデコード結果（PIL）と出力画像1枚分は常に保持する。
+
+# ストリップ1ピクセルあたりの作業メモリ見積もり（RGBA + int16スクラッチ + マスク + ラベル）
+STREAM_BYTES_PER_PIXEL = 32
+
+
+def strip_rows_for(width, max_memory_mb):
+    """メモリ上限（MB）に収まるストリップの行数"""
+    return max(1, int(max_memory_mb * (1 << 20)) // (width * STREAM_BYTES_PER_PIXEL))
+
+
+def _iter_strips(source, box, rows, mode):
+    """box 領域を rows 行ずつ切り出し (上端オフセット, 配列) を返す"""
+    x0, y0, x1, y1 = box
+    for top in range(0, y1 - y0, rows):
+        bottom = min(y1 - y0, top + rows)
+        with span("crop", rows=bottom - top):
+            strip = np.array(source.crop((x0, y0 + top, x1, y0 + bottom)).convert(mode))
+        yield top, strip
+
+
+def _stream_rows(source, box, rows, mode, kernel):
+    """行カーネルをストリップごとに適用し、出力画像に貼り込む"""
+    x0, y0, x1, y1 = box
+    height = y1 - y0
+    out = Image.new(mode, (x1 - x0, height))
+    for top, data in _iter_strips(source, box, rows, mode):
+        kernel(data, top, height)
+        out.paste(Image.fromarray(data), (0, top))
+    return out
+
+
+def remove_all_checker_streaming(source, box, rows):
+    """remove_all_checker のストリーミング版（box 領域を rows 行ずつ処理）"""
+    return _stream_rows(source, box, rows, "RGBA", _clear_non_logo_rows)
+
+
+def remove_bg_edge_flood_streaming(source, box, rows):
+    """
+    remove_bg_edge_flood のストリーミング版。
+    1パス目: ストリップごとに連結成分をラベル付けし、ストリップ境界で上下に接する
+             ラベル同士を辺として記録。画像の外周に触れるラベルも記録する。
+    境界の辺から全体の連結成分を求め、外周に繋がるラベルを背景とする。
+    2パス目: 同じストリップを再ラベル付け（ラベル番号は決定的）して透過を書き込む。
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    x0, y0, x1, y1 = box
+    height = y1 - y0
+
+    offsets = []
+    edges = []
+    edge_labels = []
+    total = 0
+    prev_last_row = None
+    for top, data in _iter_strips(source, box, rows, "RGBA"):
+        candidate = _flood_candidate_rows(data, top)
+        with span("label"):
+            labeled, n = ndimage.label(candidate)
+        labeled[labeled > 0] += total
+        offsets.append(total)
+        total += n
+        # 左右端は全ストリップ、上端は最初、下端は最後のストリップ
+        edge_labels += [labeled[:, 0], labeled[:, -1]]
+        if top == 0:
+            edge_labels.append(labeled[0])
+        if top + labeled.shape[0] >= height:
+            edge_labels.append(labeled[-1])
+        if prev_last_row is not None:
+            touching = (prev_last_row > 0) & (labeled[0] > 0)
+            edges.append(np.stack([prev_last_row[touching], labeled[0][touching]]))
+        prev_last_row = labeled[-1].copy()
+
+    # ストリップを跨いだ連結成分をまとめる
+    pairs = np.concatenate(edges, axis=1) if edges else np.zeros((2, 0), dtype=np.int32)
+    graph = coo_matrix(
+        (np.ones(pairs.shape[1], dtype=np.int8), (pairs[0], pairs[1])),
+        shape=(total + 1, total + 1),
+    )
+    with span("label", step="merge"):
+        _, component = connected_components(graph, directed=False)
+    edge_components = np.zeros(component.max() + 1, dtype=bool)
+    edge_components[component[np.concatenate(edge_labels)]] = True
+    is_bg_label = edge_components[component]
+    is_bg_label[0] = False
+
+    out = Image.new("RGBA", (x1 - x0, height))
+    for offset, (top, data) in zip(offsets, _iter_strips(source, box, rows, "RGBA")):
+        candidate = _flood_candidate_rows(data, top)
+        with span("label"):
+            labeled, _ = ndimage.label(candidate)
+        labeled[labeled > 0] += offset
+        np.copyto(data[:, :, 3], 0, where=is_bg_label[labeled])
+        out.paste(Image.fromarray(data), (0, top))
+    return out
+
+
+def make_app_icon_streaming(source, box, rows):
+    return _stream_rows(source, box, rows, "RGB", _app_icon_rows)
+
+
+def make_adaptive_icon_streaming(source, box, rows):
+    return remove_all_checker_streaming(source, box, rows)
+
+
+def make_splash_icon_streaming(source, box, rows):
+    return _stream_rows(source, box, rows, "RGB", _splash_rows)
+
+
+def make_favicon_streaming(source, box, rows):
+    favicon_large = remove_all_checker_streaming(source, box, rows)
+    with span("resize"):
+        return favicon_large.resize((FAVICON_SIZE, FAVICON_SIZE), Image.LANCZOS)
+
+
+# 出力ごとの処理ステージ:
+# (ファイル名, 表示名, 象限, 処理関数, ストリーミング版, 依存関数, 出力モード)
+# 象限は 2x2 グリッドの (列, 行)
+STAGES = [
+    ("icon.png", "App Icon", (0, 0), make_app_icon, make_app_icon_streaming,
+     (_app_icon_rows,), "RGB"),
+    ("adaptive-icon.png", "Adaptive Icon", (1, 0), make_adaptive_icon, make_adaptive_icon_streaming,
+     (remove_all_checker, _clear_non_logo_rows, classify_pixels), "RGBA"),
+    ("splash-icon.png", "Splash Icon", (0, 1), make_splash_icon, make_splash_icon_streaming,
+     (_splash_rows, classify_pixels), "RGB"),
+    ("favicon.png", "Favicon", (1, 1), make_favicon, make_favicon_streaming,
+     (remove_all_checker, _clear_non_logo_rows, classify_pixels), "RGBA"),
+]
+
+
+def stage_params():
+    """キャッシュキーに含めるステージパラメータ"""
+    return {
+        "icon_label_band": ICON_LABEL_BAND,
+        "splash_label_band": SPLASH_LABEL_BAND,
+        "checker_label_band": CHECKER_LABEL_BAND,
+        "guide_band": GUIDE_BAND,
+        "left_edge_band": LEFT_EDGE_BAND,
+        "favicon_size": FAVICON_SIZE,
+    }
+
+
+def quadrant_box(size, quadrant):
+    """2x2 グリッドの象限 (列, 行) の切り出し範囲"""
+    sw, sh = size
+    col, row = quadrant
+    xs = [0, sw // 2, sw]
+    ys = [0, sh // 2, sh]
+    return (xs[col], ys[row], xs[col + 1], ys[row + 1])
+
+
+def process_quadrant(source, fname, max_memory_mb=None):
+    """ソースグリッド（PIL画像）から1つの出力を処理して返す（保存はしない）"""
+    for name, _, quadrant, func, stream_func, _, _ in STAGES:
+        if name == fname:
+            break
+    else:
+        raise ValueError(f"unknown output: {fname}")
+    box = quadrant_box(source.size, quadrant)
+    if max_memory_mb:
+        return stream_func(source, box, strip_rows_for(box[2] - box[0], max_memory_mb))
+    with span("crop"):
+        quadrant = source.crop(box)
+    return func(quadrant)
+
+
+# デコード済みのソース配列から象限を処理するときの (出力モード, 行カーネル, 縮小サイズ)。
+# make_* と同じ処理を、crop() / convert() のコピーなしで象限のビューから行う
+QUADRANT_KERNELS = {
+    "icon.png": ("RGB", _app_icon_rows, None),
+    "adaptive-icon.png": ("RGBA", _clear_non_logo_rows, None),
+    "splash-icon.png": ("RGB", _splash_rows, None),
+    "favicon.png": ("RGBA", _clear_non_logo_rows, FAVICON_SIZE),
+}
+
+
+def decode_source(source):
+    """
+    ソースグリッドを1回だけデコードして (h, w, 3 or 4) の uint8 配列にする。
+    RGB / RGBA 以外のモードは RGBA に変換する（各出力の convert() と同じ結果になる）。
+    """
+    with span("decode"):
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA")
+        return np.asarray(source)
+
+
+def load_source(source_path, source_hash=None, store=None):
+    """
+    ソースグリッドをデコードした配列。store（intermediate_store.IntermediateStore）を渡すと
+    ソースのハッシュで .npy に保存し、次回以降（他のツール・ワーカーを含む）はデコードせずに memmap で読む。
+    """
+    def decode():
+        with span("open"):
+            source = Image.open(source_path)
+        data = decode_source(source)
+        source.close()
+        return data
+
+    if store is None:
+        return decode()
+    with span("store", entry="source"):
+        return store.get(source_hash or file_sha256(source_path), "source", decode)
+
+
+# 行カーネルが使うマスク（中間ストアに保存して再利用する）
+KERNEL_MASKS = {_clear_non_logo_rows: KEEP_GREEN, _splash_rows: SPLASH_WHITE}
+
+
+def cell_mask(source_data, box, name, store, source_key):
+    """ソース配列の box の範囲の name マスクを中間ストアから読む（なければ計算して保存）"""
+    x0, y0, x1, y1 = box
+
+    def compute():
+        return classify_pixels(source_data[y0:y1, x0:x1], (name,))[name]
+
+    with span("store", entry=name):
+        return store.get(source_key, f"{name}-{x0}-{y0}-{x1}-{y1}-{function_version(classify_pixels)}", compute)
+
+
+def _quadrant_data(view, mode):
+    """象限のビューを出力モードの書き込み可能な配列にコピー（コピーはこの1回だけ）"""
+    if mode == "RGB":
+        return np.ascontiguousarray(view[:, :, :3])
+    data = np.empty(view.shape[:2] + (4,), dtype=np.uint8)
+    data[:, :, :3] = view[:, :, :3]
+    data[:, :, 3] = view[:, :, 3] if view.shape[2] == 4 else 255
+    return data
+
+
+def process_quadrant_array(source_data, fname, store=None, source_key=None):
+    """
+    decode_source() の配列から1つの出力を処理して返す（保存はしない）。
+    象限はビューで参照するので、複数スレッドから同じ配列を読んでもよい。
+    結果は process_quadrant() と同一。store / source_key は process_cell() と同じ。
+    """
+    for name, _, quadrant, *_ in STAGES:
+        if name == fname:
+            break
+    else:
+        raise ValueError(f"unknown output: {fname}")
+    h, w = source_data.shape[:2]
+    return process_cell(source_data, quadrant_box((w, h), quadrant), fname, store=store, source_key=source_key)
+
+
+def process_cell(source_data, box, fname, label_band=None, guide_band=None, store=None, source_key=None):
+    """
+    decode_source() の配列の任意の矩形 box = (x0, y0, x1, y1) を fname の出力として処理する。
+    label_band / guide_band を省略すると 2x2 グリッド用の固定幅を使う
+    （グリッド検出したシートのセルでは grid_detect.py の値を渡す）。
+    remove_all_checker のラベル帯は固定幅と同じ比率（140 / 100）で label_band より広く取る。
+    store（中間ストア）と source_key（ソースのハッシュ）を渡すと、カーネルのマスクを保存・再利用する。
+    """
+    x0, y0, x1, y1 = box
+    mode, kernel, resize = QUADRANT_KERNELS[fname]
+    options = {}
+    if kernel is _clear_non_logo_rows:
+        if label_band is not None:
+            options["label_band"] = round(label_band * CHECKER_LABEL_BAND / ICON_LABEL_BAND)
+        if guide_band is not None:
+            options["guide_band"] = guide_band
+    elif label_band is not None:
+        options["label_band"] = label_band
+    if store is not None and kernel in KERNEL_MASKS:
+        options["mask"] = cell_mask(source_data, box, KERNEL_MASKS[kernel], store, source_key)
+    with span("crop"):
+        data = _quadrant_data(source_data[y0:y1, x0:x1], mode)
+    kernel(data, 0, data.shape[0], **options)
+    result = Image.fromarray(data)
+    if resize:
+        with span("resize"):
+            result = result.resize((resize, resize), Image.LANCZOS)
+    return result
+
+
+# どの出力でも実行される配列パスの関数（stage_version でステージ固有の依存と一緒にハッシュする）
+ARRAY_PATH_FUNCTIONS = (decode_source, cell_mask, _quadrant_data, process_quadrant_array, process_cell)
+
+
+def stage_version(fname):
+    """
+    出力 fname のキャッシュキー用のバージョン。STAGES の関数・ストリーミング版・依存に加えて、
+    実際に実行される配列パスの関数と QUADRANT_KERNELS の設定を含める。
+    """
+    for name, _, _, func, stream_func, deps, _ in STAGES:
+        if name == fname:
+            break
+    else:
+        raise ValueError(f"unknown output: {fname}")
+    mode, kernel, resize = QUADRANT_KERNELS[fname]
+    return cache_key(function_version(func, stream_func, *deps, *ARRAY_PATH_FUNCTIONS, kernel),
+                     mode, kernel.__qualname__, resize)
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def process_outputs(source_data, fnames=None, threads=None, store=None, source_key=None):
+    """
+    メモリ内の API: decode_source() の配列から出力を処理して {ファイル名: PIL 画像} で返す。
+    ファイルには書かない（エンコード・保存は sinks.py のシンクで行う）。
+    """
+    fnames = list(fnames or OUTPUT_FILES)
+    if profiler_enabled():
+        threads = 1
+    threads = min(threads or os.cpu_count() or 1, len(fnames))
+    if threads <= 1:
+        return {fname: process_quadrant_array(source_data, fname, store, source_key) for fname in fnames}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {fname: pool.submit(process_quadrant_array, source_data, fname, store, source_key)
+                   for fname in fnames}
+        return {fname: future.result() for fname, future in futures.items()}
+
+
+def _mirror_summary(sink):
+    """MultiSink で複製先に反映した件数を方法ごとにまとめる"""
+    counts = {}
+    for _, method in getattr(sink, "mirrored", ()):
+        counts[method] = counts.get(method, 0) + 1
+    return ", ".join(f"{method} {n}件" for method, n in counts.items())
+
+
+def process_source_image(source_path, output_dir="assets/images", copy_dir="assets",
+                         verbose=True, force=False, cache=None, max_memory_mb=None, optimize=False,
+                         threads=None, memo=None, compress_level=None, sink=None, link="auto", store=None):
+    """
+    ソース画像を4分割して個別アイコンとして保存。
+    各出力は一度だけエンコードし、シンク（sinks.py）に書き出す。sink を省略すると
+    output_dir と copy_dir の MultiSink（copy_dir が None なら output_dir の FileSink）を使い、
+    copy_dir には link の方法（auto: reflink → ハードリンク → 書き込み）で反映する。
+    キャッシュキー（ソースのハッシュ・パラメータ・関数バージョン）が変わっていない
+    出力はデコードも含めてスキップする（複製先がずれていれば反映だけ行う）。force=True で全て再生成。
+    キャッシュは先頭の出力先ディレクトリに置く。ファイルに書かないシンクではキャッシュしない。
+    max_memory_mb を指定すると各象限を横帯単位で処理し、作業メモリをその範囲に抑える
+    （出力は通常モードと同一）。
+    optimize=True でエンコードした PNG を optimize_assets.py の可逆最適化にかけてから書き出す。
+    通常モードではソースを1回だけデコードし、更新が必要な出力を threads 個のスレッドで
+    並行に処理・保存する（デフォルト: 出力数と CPU コア数の小さい方。1 で逐次）。
+    並行数ぶん象限の作業メモリが同時に確保される。ストリーミング時は常に逐次。
+    memo（asset_cache.MemoryLRU）を渡すと、デコード済みのソースをハッシュで、
+    エンコード済みの出力をキャッシュキーで保持し、次の呼び出しで再利用する（watch モード用）。
+    store（intermediate_store.IntermediateStore）を渡すと、デコード済みのソースとマスクを
+    .npy に保存し、次の実行や他のツールでは memmap で読む（ストリーミング時は使わない）。
+    compress_level で PNG の zlib 圧縮レベルを指定できる（None は Pillow の既定）。
+    指定した場合はキャッシュキーにも含めるので、既定の圧縮の出力とは別物として扱われる。
+    戻り値: 出力ファイル名 -> 保存先（sink.location）の辞書
+    """
+    log = print if verbose else _silent
+    if sink is None:
+        sink = FileSink(output_dir)
+        if copy_dir is not None:
+            sink = MultiSink([sink, FileSink(copy_dir)], link)
+    cache_dir = primary_directory(sink)
+    if cache is None and cache_dir is not None:
+        cache = AssetCache.for_directory(cache_dir, force=force)
+
+    log(f"ソース画像を読み込み中: {source_path}")
+    with span("hash"):
+        source_hash = file_sha256(source_path)
+
+    params = stage_params()
+    save_options = {} if compress_level is None else {"compress_level": compress_level}
+
+    outputs = {}
+    messages = {}
+    stale = []
+    for fname, *_ in STAGES:
+        path = sink.location(fname)
+        outputs[fname] = path
+        key = cache_key(source_hash, fname, params, optimize, stage_version(fname))
+        if compress_level is not None:
+            key = cache_key(key, compress_level)
+        if cache is not None and cache.is_fresh(path, key):
+            messages[fname] = [f"  スキップ: {path}（変更なし）"]
+            with span("sync", file=fname):
+                sink.sync(fname)
+        else:
+            stale.append((fname, path, key))
+
+    if stale:
+        # メモリ内にエンコード済みの出力が全てあればソースを開かずにそれを書き込む
+        memoized = {}
+        if memo is not None:
+            memoized = {key: memo.get(key) for _, _, key in stale}
+        source_data = None
+        if memo is None or any(result is None for result in memoized.values()):
+            if memo is not None and not max_memory_mb:
+                source_data = memo.get(source_hash)
+            if source_data is None and store is not None and not max_memory_mb:
+                source_data = load_source(source_path, source_hash, store)
+            if source_data is not None:
+                log(f"  サイズ: {source_data.shape[1]}x{source_data.shape[0]}（デコード済み）")
+            else:
+                # Pillow の import と Image.open（ヘッダのみ）も更新が必要な出力がある場合だけ行う
+                with span("open"):
+                    source = Image.open(source_path)
+                sw, sh = source.size
+                log(f"  サイズ: {sw}x{sh}, モード: {source.mode}")
+                if not max_memory_mb:
+                    source_data = decode_source(source)
+                    source.close()
+                    if memo is not None:
+                        memo.put(source_hash, source_data)
+
+        if max_memory_mb:
+            def run(fname):
+                return process_quadrant(source, fname, max_memory_mb)
+            threads = 1
+        else:
+            def run(fname):
+                return process_quadrant_array(source_data, fname, store, source_hash)
+
+        def branch(fname, key):
+            # 1つの出力の処理・エンコード・書き出し（スレッドごとに独立、他の出力の計算と書き出しが重なる）
+            lines = []
+            with span("stage", cprofile=True, file=fname):
+                encoded = memoized.get(key)
+                if encoded is not None:
+                    data, size, mode = encoded
+                else:
+                    result = run(fname)
+                    size, mode = result.size, result.mode
+                    with span("encode", file=fname):
+                        data = encode_png(result, **save_options)
+                    if optimize:
+                        from .optimize_assets import optimize_png
+                        with span("optimize", file=fname):
+                            optimized, method = optimize_png(result, data)
+                        lines.append(f"  最適化: {len(data):,} -> {len(optimized):,} bytes ({method})")
+                        data = optimized
+                    if memo is not None:
+                        memo.put(key, (data, size, mode), len(data))
+                with span("write", file=fname):
+                    path = sink.write(fname, data)
+            lines.append(f"  保存: {path} ({size[0]}x{size[1]}, {mode})")
+            return lines
+
+        if profiler_enabled():
+            # tracemalloc のピークと cProfile はプロセス全体で1つなので、計測中は出力を順に処理する
+            threads = 1
+        threads = min(threads or os.cpu_count() or 1, len(stale))
+        if threads == 1:
+            results = [branch(fname, key) for fname, _, key in stale]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                futures = [pool.submit(branch, fname, key) for fname, _, key in stale]
+                results = [f.result() for f in futures]
+        for (fname, path, key), lines in zip(stale, results):
+            if cache is not None:
+                cache.record(path, key)
+            messages[fname] = lines
+    if cache is not None:
+        cache.save()
+
+    for i, (fname, title, *_) in enumerate(STAGES, 1):
+        log(f"\n[{i}/{len(STAGES)}] {title} ({fname})")
+        for line in messages[fname]:
+            log(line)
+
+    mirrored = _mirror_summary(sink)
+    if mirrored:
+        log(f"\n{copy_dir if copy_dir is not None else '複製先'}/ にも反映しました（{mirrored}）")
+    if cache is not None:
+        log(f"\n{cache.summary()}")
+    log("\n全アイコンの処理が完了しました！")
+    return outputs
+
+
+def collect_sources(pattern):
+    """ディレクトリまたはglobパターンからソースグリッド画像の一覧を取得"""
+    if os.path.isdir(pattern):
+        paths = [
+            os.path.join(pattern, name) for name in os.listdir(pattern)
+            if os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS
+        ]
+    else:
+        paths = glob.glob(pattern)
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def _batch_output_dirs(sources, output_root):
+    """ソースごとの出力ディレクトリを決定（同名ファイルは連番で区別）"""
+    dirs = []
+    used = set()
+    for src in sources:
+        stem = os.path.splitext(os.path.basename(src))[0]
+        name = stem
+        n = 2
+        while name in used:
+            name = f"{stem}-{n}"
+            n += 1
+        used.add(name)
+        dirs.append(os.path.join(output_root, name))
+    return dirs
+
+
+def _process_batch_item(source_path, output_dir, force=False, max_memory_mb=None, store=None):
+    """ワーカープロセスで1枚のソースグリッドを処理（store は中間ストア。ワーカー間で同じディレクトリを共有する）"""
+    start = time.perf_counter()
+    cache = AssetCache.for_directory(output_dir, force=force)
+    try:
+        # プロセスプールで並列化しているので象限はワーカー内で逐次に処理する
+        outputs = process_source_image(source_path, output_dir, copy_dir=None,
+                                       verbose=False, cache=cache, max_memory_mb=max_memory_mb,
+                                       threads=1, store=store)
+    except Exception as e:
+        return {
+            "source": source_path,
+            "output_dir": output_dir,
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+    return {
+        "source": source_path,
+        "output_dir": output_dir,
+        "status": "ok",
+        "outputs": outputs,
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def process_batch(pattern, output_root, workers=None, force=False, max_memory_mb=None, store=None):
+    """
+    複数のソースグリッドをプロセスプールで並列処理。
+    各結果は output_root/<ソース名>/ に保存し、manifest.json にまとめる。
+    """
+    sources = collect_sources(pattern)
+    if not sources:
+        print(f"ソース画像が見つかりません: {pattern}")
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(sources))
+    output_dirs = _batch_output_dirs(sources, output_root)
+    os.makedirs(output_root, exist_ok=True)
+
+    print(f"バッチ処理: {len(sources)}枚, ワーカー数 {workers}")
+    start = time.perf_counter()
+    results = []
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_process_batch_item, src, out, force, max_memory_mb, store)
+            for src, out in zip(sources, output_dirs)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            mark = "完了" if result["status"] == "ok" else "失敗"
+            print(f"  [{len(results)}/{len(sources)}] {mark}: {result['source']} ({result['seconds']:.2f}s)")
+
+    order = {src: i for i, src in enumerate(sources)}
+    results.sort(key=lambda r: order[r["source"]])
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r["status"] != "ok"]
+    hits = sum(r.get("cache_hits", 0) for r in results)
+    misses = sum(r.get("cache_misses", 0) for r in results)
+    manifest = {
+        "pattern": pattern,
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "total": len(results),
+        "failed": len(failed),
+        "cache_hits": hits,
+        "cache_misses": misses,
+        "results": results,
+    }
+    manifest_path = os.path.join(output_root, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"\nバッチ処理完了: {len(results) - len(failed)}/{len(results)}枚成功 ({elapsed:.2f}s)")
+    print(f"キャッシュ: ヒット {hits} / ミス {misses}")
+    print(f"マニフェスト: {manifest_path}")
+    for r in failed:
+        print(f"  失敗: {r['source']}: {r['error']}")
+    return manifest
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="2x2グリッド画像を個別アイコンに分割・処理")
+    parser.add_argument("source", nargs="?", help="ソース画像パス")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="ディレクトリまたはglobで指定した複数のソースグリッドを一括処理")
+    parser.add_argument("--out", default=None,
+                        help="出力先 (デフォルト: assets/images、バッチモードは出力ルート build/icon-batch)")
+    parser.add_argument("--copy-dir", default="assets",
+                        help="出力を内容が変わったときだけコピーする先 (デフォルト: assets)")
+    parser.add_argument("--no-copy", action="store_true", help="--copy-dir へのコピーを行わない")
+    parser.add_argument("--link", choices=LINK_MODES, default="auto",
+                        help="--copy-dir への反映方法 (デフォルト: auto = reflink → ハードリンク → 書き込み)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="バッチモードのワーカープロセス数 (デフォルト: CPUコア数)")
+    parser.add_argument("--force", action="store_true",
+                        help="キャッシュを無視して全出力を再生成")
+    parser.add_argument("--max-memory", type=float, default=None, metavar="MB",
+                        help="象限を横帯単位で処理し、1象限あたりの作業メモリをこの値（MB）に抑える")
+    parser.add_argument("--optimize", action="store_true",
+                        help="保存した PNG を可逆最適化する（optimize_assets.py）")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="4つの出力を並行に処理するスレッド数 (デフォルト: 出力数と CPU コア数の小さい方、"
+                             "--profile 時は 1)")
+    add_store_arguments(parser)
+    parser.add_argument("--profile", nargs="?", const="build/profile/process_icons.json", default=None,
+                        metavar="TRACE_JSON",
+                        help="ステージごとの時間・メモリを計測し、Chrome トレース JSON と集計表を出力 "
+                             "(デフォルト: build/profile/process_icons.json)")
+    parser.add_argument("--profile-cprofile", default=None, metavar="PROF",
+                        help="--profile 時、最も時間のかかった出力ステージの cProfile をこのパスに保存")
+    args = parser.parse_args(argv)
+
+    if args.batch and args.profile:
+        parser.error("--profile はバッチモードでは使えません")
+    store = store_from_args(args)
+    if args.batch:
+        manifest = process_batch(args.batch, args.out or "build/icon-batch", args.workers,
+                                 force=args.force, max_memory_mb=args.max_memory, store=store)
+        return 0 if manifest and not manifest["failed"] else 1
+    if not args.source:
+        parser.print_usage()
+        return 1
+    options = dict(output_dir=args.out or "assets/images", copy_dir=None if args.no_copy else args.copy_dir,
+                   force=args.force, max_memory_mb=args.max_memory, optimize=args.optimize,
+                   threads=args.threads, link=args.link, store=store)
+    if args.profile:
+        with profiling(args.profile, args.profile_cprofile):
+            process_source_image(args.source, **options)
+        return 0
+    process_source_image(args.source, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+NxM の探索シートを1回のデコードで全セル分処理するスクリプト
+
+nanobanana で 3x3・4x4 のバリエーションをまとめて出したシートを、手で 2x2 に切り分けずに処理する。
+grid_detect.py でガイド破線とラベル帯を検出し、各セルを process_icons.py と同じカーネル
+（ラベル帯・ガイド帯の幅だけセルごとの検出値）で処理して <出力先>/r<行>c<列>/ に書き出す。
+セルの配置は manifest.json に記録する。
+
+ソースのハッシュと検出関数のバージョンが変わっていなければ manifest.json の配置を使うので、
+全出力がキャッシュヒットする実行ではデコードもしない。
+
+使い方:
+  npm run icons -- sheet build/sheets/explore-4x4.png --out build/icon-sheet
+  npm run icons -- sheet explore.png --grid 3x3 --outputs icon.png favicon.png
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .asset_cache import AssetCache, cache_key, file_sha256, function_version
+from .grid_detect import DETECT_FUNCTIONS, CellGeometry, detect_grid
+from .intermediate_store import add_store_arguments, store_from_args
+from .process_icons import GUIDE_BAND, ICON_LABEL_BAND, OUTPUT_FILES, load_source, process_cell, stage_params, stage_version
+from .sinks import FileSink, encode_png
+from .stage_profiler import span
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def parse_grid(text):
+    """"3x3" / "4x2" を (列, 行) に"""
+    try:
+        cols, rows = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"列x行 の形式で指定してください: {text}")
+    if cols < 1 or rows < 1:
+        raise argparse.ArgumentTypeError(f"列数・行数は 1 以上: {text}")
+    return cols, rows
+
+
+def cell_dir(cell):
+    return f"r{cell.row}c{cell.col}"
+
+
+def _load_layout(manifest_path, layout_key):
+    """前回の manifest.json のセル配置（ソース・検出方法が同じ場合だけ）"""
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("layout_key") != layout_key:
+        return None
+    return [CellGeometry(c["row"], c["col"], tuple(c["box"]), c["label_band"], c["guide_band"])
+            for c in manifest["cells"]]
+
+
+def process_sheet(source_path, output_root="build/icon-sheet", grid=None, outputs=None,
+                  force=False, optimize=False, threads=None, verbose=True, store=None):
+    """
+    シートの全セルから outputs（デフォルト: 4種類すべて）を処理して書き出す。
+    grid = (列, 行) を指定すると、その本数のガイドが見つからない軸は等分する。
+    セル x 出力を threads 個のスレッドで並行に処理する（ソース配列は全スレッドで共有）。
+    store（中間ストア）を渡すとデコード済みのシートと各セルのマスクを memmap で再利用する。
+    戻り値: manifest（dict）
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    outputs = list(outputs or OUTPUT_FILES)
+    cols, rows = grid or (None, None)
+    cache = AssetCache.for_directory(output_root, force=force)
+    manifest_path = os.path.join(output_root, MANIFEST_FILENAME)
+
+    log(f"シートを読み込み中: {source_path}")
+    with span("hash"):
+        source_hash = file_sha256(source_path)
+    layout_key = cache_key(source_hash, cols, rows, ICON_LABEL_BAND, GUIDE_BAND, function_version(*DETECT_FUNCTIONS))
+
+    source_data = None
+    cells = None if force else _load_layout(manifest_path, layout_key)
+    if cells is None:
+        source_data = load_source(source_path, source_hash, store)
+        with span("detect"):
+            cells = detect_grid(source_data, cols, rows, ICON_LABEL_BAND, GUIDE_BAND)
+    grid_cols = max(cell.col for cell in cells) + 1
+    grid_rows = max(cell.row for cell in cells) + 1
+    log(f"  グリッド: {grid_cols}x{grid_rows}（{len(cells)}セル）")
+
+    params = stage_params()
+    versions = {fname: stage_version(fname) for fname in outputs}
+    tasks = []
+    files = {}
+    for cell in cells:
+        sink = FileSink(os.path.join(output_root, cell_dir(cell)))
+        for fname in outputs:
+            path = sink.location(fname)
+            files.setdefault(cell_dir(cell), {})[fname] = path
+            key = cache_key(source_hash, cell, fname, params, optimize, versions[fname])
+            if not cache.is_fresh(path, key):
+                tasks.append((cell, fname, sink, key))
+
+    if tasks and source_data is None:
+        source_data = load_source(source_path, source_hash, store)
+
+    def run(cell, fname, sink):
+        with span("stage", file=f"{cell_dir(cell)}/{fname}"):
+            result = process_cell(source_data, cell.box, fname, cell.label_band, cell.guide_band,
+                                  store, source_hash)
+            data = encode_png(result)
+            if optimize:
+                from .optimize_assets import optimize_png
+                data, _ = optimize_png(result, data)
+            return sink.write(fname, data)
+
+    threads = min(threads or os.cpu_count() or 1, max(1, len(tasks)))
+    if threads == 1:
+        written = [run(cell, fname, sink) for cell, fname, sink, _ in tasks]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(run, cell, fname, sink) for cell, fname, sink, _ in tasks]
+            written = [f.result() for f in futures]
+    for (_, _, _, key), path in zip(tasks, written):
+        cache.record(path, key)
+        log(f"  保存: {path}")
+    cache.save()
+
+    manifest = {
+        "source": source_path,
+        "layout_key": layout_key,
+        "grid": [grid_cols, grid_rows],
+        "cells": [dict(cell._asdict(), files=files[cell_dir(cell)]) for cell in cells],
+    }
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    log(f"\n{cache.summary()}")
+    log(f"マニフェスト: {manifest_path}")
+    return manifest
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="NxM の探索シートを全セル分まとめて処理")
+    parser.add_argument("source", help="シート画像パス")
+    parser.add_argument("--out", default="build/icon-sheet", help="出力ルート (デフォルト: build/icon-sheet)")
+    parser.add_argument("--grid", type=parse_grid, default=None, metavar="COLSxROWS",
+                        help="列数x行数（ガイドがこの本数見つからない軸は等分。デフォルト: ガイドから自動検出）")
+    parser.add_argument("--outputs", nargs="+", choices=OUTPUT_FILES, default=None,
+                        help="各セルから作る出力 (デフォルト: 4種類すべて)")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視して全出力を再生成")
+    parser.add_argument("--optimize", action="store_true", help="保存した PNG を可逆最適化する")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="セル x 出力を並行に処理するスレッド数 (デフォルト: CPU コア数)")
+    add_store_arguments(parser)
+    args = parser.parse_args(argv)
+
+    process_sheet(args.source, args.out, args.grid, args.outputs, force=args.force,
+                  optimize=args.optimize, threads=args.threads, store=store_from_args(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
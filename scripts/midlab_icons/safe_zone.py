@@ -0,0 +1,223 @@
+"""
+適応型アイコン前景のランチャーマスク・セーフゾーン検査
+
+create_adaptive_icon は手で決めた 17% の safe_margin に収めているだけで、remove_all_checker が
+残した不透明部分が実際のランチャーのマスクで欠けないかは確認していなかった。
+候補の前景（探索シートの全セルなど）をまとめて読み込み、マスクごとに欠ける不透明部分の割合を求める。
+
+幾何は Android の仕様（108dp のレイヤー、表示されるのは中央 72dp、66dp の円がセーフゾーン）に従う:
+  マスク:   circle / squircle（超楕円 n=4）/ rounded（角丸正方形）/ teardrop（右下だけ角）
+  動き:     パララックス（PARALLAX_DP だけ 8 方向にずれる）・パルス（OVERSCAN 倍に拡大）
+  セーフ:   66dp の円の外にある不透明部分（ガイドラインの目安、動きなし）
+
+全候補のアルファを ANALYSIS_SIZE に縮小して (候補, 画素) の行列に、全マスク x 全動きの
+表示範囲（アンチエイリアスしたカバレッジ）を (平面, 画素) の行列にし、欠ける割合を
+1回の行列積 alpha @ (1 - coverage).T で求める。不透明部分はアルファで重み付けする。
+マスクごとの最悪値（全ての動きのうち）が --max-clipped を超えた候補を違反として報告する。
+
+使い方:
+  npm run icons -- safezone assets/images                        # adaptive-icon.png を探す
+  npm run icons -- safezone build/icon-sheet --builtin --json build/safezone.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .lazy_modules import lazy_import
+from .verify_assets import collect_pngs
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+LAYER_DP = 108              # 前景レイヤーの大きさ
+VISIBLE_DP = 72             # マスクで表示される範囲（直径・一辺）
+SAFE_DP = 66                # ロゴを収めるセーフゾーンの直径
+ROUNDED_RADIUS_DP = 12      # rounded マスクの角の半径
+SQUIRCLE_EXPONENT = 4
+PARALLAX_DP = 3             # パララックスでずれる量（(VISIBLE_DP - SAFE_DP) / 2 = セーフゾーンが欠けない上限）
+OVERSCAN = 1.08             # パルスで拡大する倍率
+ANALYSIS_SIZE = 216         # 解析の解像度（2px/dp）
+BATCH = 256                 # 1回の行列積に入れる候補数の上限（メモリの目安）
+MAX_CLIPPED = 0.5           # 欠けてよい不透明部分の割合の上限（%）
+MASKS = ("circle", "squircle", "rounded", "teardrop")
+DEFAULT_NAME = "adaptive-icon.png"
+
+
+def _transforms():
+    """(名前, 倍率, ずれ x, ずれ y) dp。ずれは斜めでも距離が PARALLAX_DP になるようにする"""
+    transforms = [("identity", 1.0, 0.0, 0.0), ("overscan", OVERSCAN, 0.0, 0.0)]
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dx or dy:
+                norm = PARALLAX_DP / np.hypot(dx, dy)
+                transforms.append((f"parallax({dx:+d},{dy:+d})", 1.0, dx * norm, dy * norm))
+    return transforms
+
+
+def mask_distance(name, x, y):
+    """マスクの符号付き距離（dp、内側が負）。x, y はレイヤー中心からの dp（下向きが正）"""
+    r = VISIBLE_DP / 2
+    if name == "circle":
+        return np.hypot(x, y) - r
+    if name == "squircle":
+        n = SQUIRCLE_EXPONENT
+        return (np.abs(x) ** n + np.abs(y) ** n) ** (1 / n) - r
+    if name == "rounded":
+        c = ROUNDED_RADIUS_DP
+        qx, qy = np.abs(x) - (r - c), np.abs(y) - (r - c)
+        outside = np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+        return outside + np.minimum(np.maximum(qx, qy), 0) - c
+    if name == "teardrop":
+        square = np.maximum(np.abs(x), np.abs(y)) - r
+        return np.where((x > 0) & (y > 0), square, np.hypot(x, y) - r)
+    if name == "safe":
+        return np.hypot(x, y) - SAFE_DP / 2
+    raise ValueError(f"未知のマスク: {name}")
+
+
+def coverage_planes(size=ANALYSIS_SIZE):
+    """
+    全マスク x 全動きの表示範囲のカバレッジ。
+    戻り値: ([(マスク, 動き), ...], (平面, size * size) float32)
+    前景が倍率 s・ずれ d で動くと、前景の点 p はマスク上の s * p + d に表示される。
+    """
+    px_per_dp = size / LAYER_DP
+    c = (np.arange(size, dtype=np.float32) + 0.5) / px_per_dp - LAYER_DP / 2
+    y, x = np.meshgrid(c, c, indexing="ij")
+    transforms = _transforms()
+    scale, dx, dy = (np.array([t[i] for t in transforms], dtype=np.float32)[:, None, None] for i in (1, 2, 3))
+    tx, ty = x * scale + dx, y * scale + dy
+    labels, planes = [], []
+    for name in MASKS:
+        planes.append(mask_distance(name, tx, ty))
+        labels += [(name, t[0]) for t in transforms]
+    planes.append(mask_distance("safe", x, y)[None])
+    labels.append(("safe", "identity"))
+    distance = np.concatenate(planes)
+    coverage = np.clip(0.5 - distance * px_per_dp, 0.0, 1.0)
+    return labels, coverage.reshape(len(labels), -1).astype(np.float32)
+
+
+def load_alpha(image, size=ANALYSIS_SIZE):
+    """前景の PIL 画像 -> アルファ（size x size に面積平均で縮小、0〜1 の float32 を平坦化）"""
+    alpha = image.convert("RGBA").getchannel("A")
+    if alpha.size != (size, size):
+        alpha = alpha.resize((size, size), Image.BOX)
+    return np.asarray(alpha, dtype=np.float32).reshape(-1) / 255
+
+
+def clipped_percent(alphas, coverage):
+    """(候補, 画素) のアルファと (平面, 画素) のカバレッジ -> (候補, 平面) の欠ける割合（%）"""
+    total = alphas.sum(axis=1, keepdims=True)
+    clipped = alphas @ (1.0 - coverage).T
+    return 100 * clipped / np.maximum(total, 1e-6)
+
+
+def collect_candidates(paths, name=DEFAULT_NAME):
+    """ファイルはそのまま、ディレクトリは配下の name を探す。戻り値: パスのリスト"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += [os.path.join(path, rel) for rel in collect_pngs(path) if os.path.basename(rel) == name]
+        else:
+            found.append(path)
+    return found
+
+
+def builtin_candidates():
+    """generate_icons.py の前景（pil / sdf）。戻り値: [(名前, PIL 画像), ...]"""
+    from .generate_icons import create_adaptive_icon
+    from .sdf_render import render_variant
+    return [("generate:pil", create_adaptive_icon(1024)), ("generate:sdf", render_variant("adaptive", 1024))]
+
+
+def analyze(candidates, max_clipped=MAX_CLIPPED, workers=None):
+    """
+    candidates: [(名前, パス or PIL 画像), ...]
+    戻り値: 候補ごとの dict（name / masks: マスク -> {identity, worst, motion} / safe / violations）
+    """
+    def load(source):
+        if isinstance(source, str):
+            with Image.open(source) as image:
+                return load_alpha(image)
+        return load_alpha(source)
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(candidates)))
+    if workers == 1:
+        alphas = [load(source) for _, source in candidates]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            alphas = list(pool.map(load, (source for _, source in candidates)))
+
+    labels, coverage = coverage_planes()
+    index = {label: i for i, label in enumerate(labels)}
+    percents = np.concatenate([clipped_percent(np.stack(alphas[i:i + BATCH]), coverage)
+                               for i in range(0, len(alphas), BATCH)]) if alphas else np.zeros((0, len(labels)))
+
+    results = []
+    for (name, _), row in zip(candidates, percents):
+        masks = {}
+        violations = []
+        for mask in MASKS:
+            cols = [i for (m, _), i in index.items() if m == mask]
+            worst = max(cols, key=lambda i: row[i])
+            masks[mask] = {"identity": round(float(row[index[mask, "identity"]]), 3),
+                           "worst": round(float(row[worst]), 3), "motion": labels[worst][1]}
+            if row[worst] > max_clipped:
+                violations.append(mask)
+        results.append({"name": name, "masks": masks, "safe": round(float(row[index["safe", "identity"]]), 3),
+                        "violations": violations})
+    return results
+
+
+def print_report(results, max_clipped=MAX_CLIPPED):
+    width = max([len(r["name"]) for r in results] + [8])
+    print(f"{'候補':<{width - 2}}  " + "  ".join(f"{m:>9}" for m in MASKS) + f"  {'safe':>6}")
+    for r in results:
+        cells = "  ".join(f"{r['masks'][m]['worst']:>8.2f}%" for m in MASKS)
+        mark = "  違反: " + ", ".join(
+            f"{m}（{r['masks'][m]['motion']} で {r['masks'][m]['worst']:.2f}%）" for m in r["violations"]
+        ) if r["violations"] else ""
+        print(f"{r['name']:<{width}}  {cells}  {r['safe']:>5.2f}%{mark}")
+    print(f"\n（各マスクの値はパララックス ±{PARALLAX_DP}dp・パルス x{OVERSCAN} を含む最悪の欠け、"
+          f"safe は {SAFE_DP}dp の円の外の割合。上限 {max_clipped}%）")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="適応型アイコン前景をランチャーマスクでまとめて検査")
+    parser.add_argument("paths", nargs="*", default=["assets/images"],
+                        help="前景の PNG またはディレクトリ（配下の --name を探す。デフォルト: assets/images）")
+    parser.add_argument("--name", default=DEFAULT_NAME, help=f"ディレクトリから探すファイル名 (デフォルト: {DEFAULT_NAME})")
+    parser.add_argument("--builtin", action="store_true", help="generate_icons.py の前景（pil / sdf）も検査する")
+    parser.add_argument("--max-clipped", type=float, default=MAX_CLIPPED,
+                        help=f"マスクで欠けてよい不透明部分の割合の上限 %% (デフォルト: {MAX_CLIPPED})")
+    parser.add_argument("--json", default=None, metavar="PATH", help="結果を JSON で書き出す")
+    parser.add_argument("--workers", type=int, default=None, help="並行に読み込むスレッド数 (デフォルト: CPU コア数)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    candidates = [(path, path) for path in collect_candidates(args.paths, args.name)]
+    if args.builtin:
+        candidates += builtin_candidates()
+    if not candidates:
+        print(f"検査する前景がありません: {' '.join(args.paths)}（{args.name}）")
+        return 1
+    results = analyze(candidates, args.max_clipped, args.workers)
+    print_report(results, args.max_clipped)
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"max_clipped": args.max_clipped, "results": results}, f, ensure_ascii=False, indent=2)
+
+    failed = [r for r in results if r["violations"]]
+    print(f"検査: {len(results) - len(failed)}/{len(results)} 合格 ({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
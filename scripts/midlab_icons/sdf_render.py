@@ -0,0 +1,284 @@
+"""
+logo_scene.py のシーンを符号付き距離場（SDF）で描画する NumPy ラスタライザ
+
+各プリミティブの符号付き距離をキャンバス全体（行チャンク単位）で配列演算として評価し、
+同じ種類のプリミティブはまとめて (K, 行, 列) のブロードキャストで計算する。
+カバレッジは距離から解析的に求める（coverage = clamp(0.5 - d, 0, 1)、d はピクセル単位）ため、
+48px のような小さいサイズでも直接描画してアンチエイリアスが効く。
+
+連続する同じ色（ロール・不透明度）のプリミティブは1レイヤーにまとめ、
+レイヤーのカバレッジはプリミティブのカバレッジの最大値とする。
+"""
+
+from .generate_icons import BG_DARK, EMERALD, EMERALD_DARK, EMERALD_LIGHT, TEAL, WHITE
+from .lazy_modules import lazy_import
+from .logo_scene import Circle, Ellipse, Polygon, Ring, Segment, build_scene
+
+np = lazy_import('numpy')
+Image = lazy_import('PIL.Image')
+
+DEFAULT_PALETTE = {
+    'BG_DARK': BG_DARK,
+    'EMERALD': EMERALD,
+    'EMERALD_LIGHT': EMERALD_LIGHT,
+    'EMERALD_DARK': EMERALD_DARK,
+    'TEAL': TEAL,
+    'WHITE': WHITE,
+    'BLACK': (0, 0, 0),
+}
+
+# 1チャンクあたりのピクセル数の目安（(K, 行, 列) の float32 一時配列の大きさを抑える）
+CHUNK_PIXELS = 1 << 17
+
+
+def group_layers(prims):
+    """連続する同じ (ロール, 不透明度) のプリミティブを1レイヤーにまとめる"""
+    layers = []
+    for prim in prims:
+        key = (prim.role, prim.alpha)
+        if layers and layers[-1][0] == key:
+            layers[-1][1].append(prim)
+        else:
+            layers.append((key, [prim]))
+    return layers
+
+
+def _scaled(prim, size):
+    """正規化座標をピクセル座標に"""
+    if isinstance(prim, Polygon):
+        return prim._replace(points=tuple((x * size, y * size) for x, y in prim.points))
+    fields = {}
+    for name, value in prim._asdict().items():
+        if name in ('role', 'alpha') or value is None:
+            continue
+        fields[name] = value * size
+    return prim._replace(**fields)
+
+
+def _stack(prims, *names):
+    return [np.array([getattr(p, n) for p in prims], dtype=np.float32)[:, None, None] for n in names]
+
+
+def _sd_segments(prims, x, y):
+    x0, y0, x1, y1, w = _stack(prims, 'x0', 'y0', 'x1', 'y1', 'width')
+    bax, bay = x1 - x0, y1 - y0
+    pax, pay = x - x0, y - y0
+    denom = np.maximum(bax * bax + bay * bay, 1e-12)
+    h = np.clip((pax * bax + pay * bay) / denom, 0.0, 1.0)
+    return np.hypot(pax - bax * h, pay - bay * h) - w / 2
+
+
+def _sd_circles(prims, x, y):
+    cx, cy, r = _stack(prims, 'cx', 'cy', 'r')
+    return np.hypot(x - cx, y - cy) - r
+
+
+def _sd_ellipse(x, y, cx, cy, rx, ry):
+    """楕円の符号付き距離の1次近似（境界付近で正確、アンチエイリアスには十分）"""
+    px, py = x - cx, y - cy
+    k0 = np.hypot(px / rx, py / ry)
+    k1 = np.maximum(np.hypot(px / (rx * rx), py / (ry * ry)), 1e-12)
+    return k0 * (k0 - 1.0) / k1
+
+
+def _sd_ellipses(prims, x, y):
+    cx, cy, rx, ry = _stack(prims, 'cx', 'cy', 'rx', 'ry')
+    return _sd_ellipse(x, y, cx, cy, rx, ry)
+
+
+def _sd_rings(prims, x, y):
+    cx, cy, rx, ry, t = _stack(prims, 'cx', 'cy', 'rx', 'ry', 'thickness')
+    outer = _sd_ellipse(x, y, cx, cy, rx, ry)
+    inner = _sd_ellipse(x, y, cx, cy, np.maximum(rx - t, 1e-6), np.maximum(ry - t, 1e-6))
+    d = np.maximum(outer, -inner)
+    clip = np.array([np.inf if p.clip_below is None else p.clip_below for p in prims],
+                    dtype=np.float32)[:, None, None]
+    return np.maximum(d, y - clip)
+
+
+def _sd_polygon(prim, x, y):
+    """多角形の符号付き距離（辺ごとの距離をまとめて計算し、交差数で内外判定）"""
+    pts = np.array(prim.points, dtype=np.float32)
+    a = pts[:, None, None, :]
+    b = np.roll(pts, -1, axis=0)[:, None, None, :]
+    ex, ey = b[..., 0] - a[..., 0], b[..., 1] - a[..., 1]
+    wx, wy = x - a[..., 0], y - a[..., 1]
+    h = np.clip((wx * ex + wy * ey) / np.maximum(ex * ex + ey * ey, 1e-12), 0.0, 1.0)
+    dist = np.hypot(wx - ex * h, wy - ey * h).min(axis=0)
+    # +x 方向の半直線と辺の交差数（奇数なら内側）
+    ay, by = a[..., 1], b[..., 1]
+    x_cross = a[..., 0] + (y - ay) * ex / np.where(ey == 0, 1.0, ey)
+    crosses = ((ay > y) != (by > y)) & (x < x_cross)
+    inside = np.logical_xor.reduce(crosses, axis=0)
+    return np.where(inside, -dist, dist)
+
+
+def _layer_distance(prims, x, y):
+    """レイヤー内の全プリミティブの和集合の符号付き距離"""
+    best = None
+    kinds = (
+        (Segment, _sd_segments), (Circle, _sd_circles),
+        (Ellipse, _sd_ellipses), (Ring, _sd_rings),
+    )
+    for kind, func in kinds:
+        same = [p for p in prims if isinstance(p, kind)]
+        if same:
+            d = func(same, x, y).min(axis=0)
+            best = d if best is None else np.minimum(best, d)
+    for prim in prims:
+        if isinstance(prim, Polygon):
+            d = _sd_polygon(prim, x, y)
+            best = d if best is None else np.minimum(best, d)
+    return best
+
+
+def _bounds(prim):
+    """プリミティブのピクセル座標でのバウンディングボックス (x0, y0, x1, y1)"""
+    if isinstance(prim, Segment):
+        r = prim.width / 2
+        return (min(prim.x0, prim.x1) - r, min(prim.y0, prim.y1) - r,
+                max(prim.x0, prim.x1) + r, max(prim.y0, prim.y1) + r)
+    if isinstance(prim, Circle):
+        return (prim.cx - prim.r, prim.cy - prim.r, prim.cx + prim.r, prim.cy + prim.r)
+    if isinstance(prim, Polygon):
+        xs = [x for x, _ in prim.points]
+        ys = [y for _, y in prim.points]
+        return (min(xs), min(ys), max(xs), max(ys))
+    y1 = prim.cy + prim.ry
+    if isinstance(prim, Ring) and prim.clip_below is not None:
+        y1 = min(y1, prim.clip_below)
+    return (prim.cx - prim.rx, prim.cy - prim.ry, prim.cx + prim.rx, y1)
+
+
+def _layer_box(group, size):
+    """レイヤーの整数バウンディングボックス（アンチエイリアス分を1px広げ、キャンバスでクリップ）"""
+    boxes = [_bounds(p) for p in group]
+    x0 = max(0, int(np.floor(min(b[0] for b in boxes))) - 1)
+    y0 = max(0, int(np.floor(min(b[1] for b in boxes))) - 1)
+    x1 = min(size, int(np.ceil(max(b[2] for b in boxes))) + 2)
+    y1 = min(size, int(np.ceil(max(b[3] for b in boxes))) + 2)
+    return x0, y0, x1, y1
+
+
+def iter_layer_coverage(prims, size, chunk_rows=None):
+    """
+    (行範囲, [(ロール, 不透明度, カバレッジ, (列開始, 列終了)), ...]) をチャンクごとに返す。
+    カバレッジは各レイヤーのバウンディングボックスと交わる部分だけの (行, 列) float32 で 0〜1。
+    バウンディングボックスと交わらないレイヤーはそのチャンクでは返さない。
+    """
+    layers = []
+    for key, group in group_layers(prims):
+        group = [_scaled(p, size) for p in group]
+        layers.append((key, group, _layer_box(group, size)))
+    rows = chunk_rows or max(1, CHUNK_PIXELS // size)
+    for y0 in range(0, size, rows):
+        y1 = min(size, y0 + rows)
+        chunk = []
+        for (role, alpha), group, (bx0, by0, bx1, by1) in layers:
+            if by1 <= y0 or by0 >= y1 or bx1 <= bx0:
+                continue
+            ry0, ry1 = max(y0, by0), min(y1, by1)
+            x = (np.arange(bx0, bx1, dtype=np.float32) + 0.5)[None, :]
+            y = (np.arange(ry0, ry1, dtype=np.float32) + 0.5)[:, None]
+            coverage = np.zeros((y1 - y0, bx1 - bx0), dtype=np.float32)
+            d = _layer_distance(group, x, y)
+            np.clip(0.5 - d, 0.0, 1.0, out=coverage[ry0 - y0:ry1 - y0])
+            chunk.append((role, alpha, coverage, (bx0, bx1)))
+        yield (y0, y1), chunk
+
+
+def render_scene(background, prims, size, palette=None):
+    """シーンを描画。背景ありは RGB、背景なしは RGBA の PIL 画像を返す"""
+    palette = {**DEFAULT_PALETTE, **(palette or {})}
+    colors = {role: np.array(rgb[:3], dtype=np.float32) / 255 for role, rgb in palette.items()}
+    rgb = np.zeros((size, size, 3), dtype=np.float32)
+    alpha = np.zeros((size, size), dtype=np.float32)
+    if background:
+        rgb[:] = colors[background]
+        alpha[:] = 1.0
+
+    for (y0, y1), chunk in iter_layer_coverage(prims, size):
+        for role, layer_alpha, coverage, (x0, x1) in chunk:
+            out_rgb, out_a = rgb[y0:y1, x0:x1], alpha[y0:y1, x0:x1]
+            a = coverage * layer_alpha
+            # プリマルチプライドアルファで over 合成
+            out_rgb *= (1.0 - a)[:, :, None]
+            out_rgb += colors[role] * a[:, :, None]
+            out_a *= 1.0 - a
+            out_a += a
+
+    if background:
+        return Image.fromarray(np.rint(rgb * 255).astype(np.uint8), 'RGB')
+    straight = rgb / np.maximum(alpha, 1e-6)[:, :, None]
+    rgba = np.dstack([straight, alpha])
+    return Image.fromarray(np.rint(np.clip(rgba, 0.0, 1.0) * 255).astype(np.uint8), 'RGBA')
+
+
+def scene_box(prims, size):
+    """プリミティブ群のピクセル座標の整数バウンディングボックス（アンチエイリアス分を含む）"""
+    return _layer_box([_scaled(p, size) for p in prims], size)
+
+
+def render_region(background, prims, size, box, palette=None):
+    """
+    シーンのうち box = (x0, y0, x1, y1) の範囲だけを描画する（差分の再描画用）。
+    box と交わらないレイヤーは距離を計算しない。
+    戻り値: (プリマルチプライド RGB (h, w, 3), アルファ (h, w))。どちらも 0〜1 の float32
+    """
+    palette = {**DEFAULT_PALETTE, **(palette or {})}
+    x0, y0, x1, y1 = box
+    rgb = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.float32)
+    alpha = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+    if background:
+        rgb[:] = np.array(palette[background][:3], dtype=np.float32) / 255
+        alpha[:] = 1.0
+    for (role, layer_alpha), group in group_layers(prims):
+        group = [_scaled(p, size) for p in group]
+        bx0, by0, bx1, by1 = _layer_box(group, size)
+        ix0, iy0, ix1, iy1 = max(x0, bx0), max(y0, by0), min(x1, bx1), min(y1, by1)
+        if ix1 <= ix0 or iy1 <= iy0:
+            continue
+        x = (np.arange(ix0, ix1, dtype=np.float32) + 0.5)[None, :]
+        y = (np.arange(iy0, iy1, dtype=np.float32) + 0.5)[:, None]
+        a = np.clip(0.5 - _layer_distance(group, x, y), 0.0, 1.0) * layer_alpha
+        out_rgb, out_a = rgb[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0], alpha[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+        out_rgb *= (1.0 - a)[:, :, None]
+        out_rgb += np.array(palette[role][:3], dtype=np.float32) / 255 * a[:, :, None]
+        out_a *= 1.0 - a
+        out_a += a
+    return rgb, alpha
+
+
+def role_weights(background, prims, size):
+    """
+    パレットに依存しない合成結果を返す: (ロールのタプル, 重み (R, h, w) float32, アルファ (h, w) float32)。
+    over 合成は色について線形なので、任意のパレットでの出力（プリマルチプライド）は
+    sum(重み[i] * 色[ロール[i]]) になる。アルファはパレットに依存しない。
+    """
+    roles = [background] if background else []
+    for role, _ in (key for key, _ in group_layers(prims)):
+        if role not in roles:
+            roles.append(role)
+    index = {role: i for i, role in enumerate(roles)}
+    weights = np.zeros((len(roles), size, size), dtype=np.float32)
+    alpha = np.zeros((size, size), dtype=np.float32)
+    if background:
+        weights[0] = 1.0
+        alpha[:] = 1.0
+
+    for (y0, y1), chunk in iter_layer_coverage(prims, size):
+        for role, layer_alpha, coverage, (x0, x1) in chunk:
+            a = coverage * layer_alpha
+            keep = 1.0 - a
+            out_w, out_a = weights[:, y0:y1, x0:x1], alpha[y0:y1, x0:x1]
+            out_w *= keep
+            out_w[index[role]] += a
+            out_a *= keep
+            out_a += a
+    return tuple(roles), weights, alpha
+
+
+def render_variant(variant, size, palette=None):
+    """アイコン種別を size x size で直接描画"""
+    background, prims = build_scene(variant, size)
+    return render_scene(background, prims, size, palette)
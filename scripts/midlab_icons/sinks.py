@@ -0,0 +1,203 @@
+"""
+出力先（シンク）
+
+パイプラインの各ステージは配列・PIL 画像を受け取って返し、最後にエンコードした PNG の
+バイト列をシンクに渡す。ファイルパスに縛られないので、メモリ内で組み合わせたりテストしたりできる。
+
+  FileSink(dir)             ディレクトリに書き出す（一時ファイル + os.replace で置き換え）
+  MemorySink()              バイト列を dict に保持する
+  MultiSink([a, b], link)   一度エンコードしたものを複数の出力先に反映する。
+                            先頭の出力先に書き、2つ目以降のディレクトリには link の方法で反映する:
+                              auto      reflink → ハードリンク → 書き込み の順に試す
+                              reflink   reflink（Linux の FICLONE、Btrfs / XFS など）、だめなら書き込み
+                              hardlink  ハードリンク、だめなら（別デバイスなど）書き込み
+                              copy      同じバイト列をもう一度書き込む
+                            書き込み・reflink でも mtime を先頭の出力先に揃えるので、
+                            サイズ・mtime（またはハードリンクなら inode）で反映済みかを判定できる。
+
+シンクの共通インタフェース:
+  location(name)     出力の場所（ファイルならパス）
+  write(name, data)  バイト列を書き出して location を返す（複数スレッドから呼んでよい）
+  sync(name)         キャッシュヒットで書き込まなかった出力について、複製先を揃える
+"""
+
+import io
+import os
+import threading
+
+from .asset_cache import read_bytes
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+FICLONE = 0x40049409  # linux/fs.h
+
+
+def encode_png(image, **options):
+    """PIL 画像を PNG のバイト列に（options は Image.save にそのまま渡す）"""
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", **options)
+    return buffer.getvalue()
+
+
+def write_atomic(path, data):
+    """一時ファイルに書いてから置き換える（ハードリンクされた既存ファイルを書き換えない）"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _reflink(src, dst):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _hardlink(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def is_synced(src, dst):
+    """dst が src と同じファイル（ハードリンク）か、サイズ・mtime が一致するか"""
+    try:
+        s, d = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    if (s.st_dev, s.st_ino) == (d.st_dev, d.st_ino):
+        return True
+    return s.st_size == d.st_size and s.st_mtime_ns == d.st_mtime_ns
+
+
+def link_file(src, dst, mode="auto", data=None):
+    """
+    dst を src と同じ内容にする（一時ファイル + os.replace）。
+    data に src の内容を渡すと書き込みに使う（なければ src を読む）。
+    戻り値: 使った方法（"reflink" / "hardlink" / "copy"）
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"unknown link mode: {mode}")
+    tmp_path = f"{dst}.tmp"
+    if os.path.lexists(tmp_path):
+        os.unlink(tmp_path)
+    method = "copy"
+    if mode in ("auto", "reflink") and _reflink(src, tmp_path):
+        method = "reflink"
+    elif mode in ("auto", "hardlink") and _hardlink(src, tmp_path):
+        method = "hardlink"
+    else:
+        with open(tmp_path, "wb") as f:
+            f.write(read_bytes(src) if data is None else data)
+    if method != "hardlink":
+        st = os.stat(src)
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp_path, dst)
+    return method
+
+
+class FileSink:
+    """ディレクトリに書き出すシンク"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def location(self, name):
+        return f"{self.directory}/{name}"
+
+    def write(self, name, data):
+        path = self.location(name)
+        write_atomic(path, data)
+        return path
+
+    def sync(self, name):
+        pass
+
+
+class MemorySink:
+    """バイト列を files（名前 -> bytes）に保持するシンク"""
+
+    def __init__(self):
+        self.files = {}
+
+    def location(self, name):
+        return f"memory:{name}"
+
+    def write(self, name, data):
+        self.files[name] = data
+        return self.location(name)
+
+    def sync(self, name):
+        pass
+
+
+class MultiSink:
+    """
+    先頭のシンクに書き、残りのシンクには同じバイト列を反映する。
+    ファイル同士は link の方法で反映し、mirrored に (場所, 方法) を記録する。
+    """
+
+    def __init__(self, sinks, link="auto"):
+        if not sinks:
+            raise ValueError("MultiSink には出力先が1つ以上必要です")
+        if link not in LINK_MODES:
+            raise ValueError(f"unknown link mode: {link}")
+        self.sinks = list(sinks)
+        self.link = link
+        self.mirrored = []
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self):
+        return self.sinks[0]
+
+    def location(self, name):
+        return self.primary.location(name)
+
+    def write(self, name, data):
+        location = self.primary.write(name, data)
+        for sink in self.sinks[1:]:
+            self._mirror(sink, name, location, data)
+        return location
+
+    def sync(self, name):
+        self.primary.sync(name)
+        location = self.primary.location(name)
+        for sink in self.sinks[1:]:
+            if isinstance(sink, FileSink) and isinstance(self.primary, FileSink):
+                if is_synced(location, sink.location(name)):
+                    continue
+            elif isinstance(sink, MemorySink) and name in sink.files:
+                continue
+            self._mirror(sink, name, location, None)
+
+    def _mirror(self, sink, name, location, data):
+        if isinstance(sink, FileSink) and isinstance(self.primary, FileSink):
+            method = link_file(location, sink.location(name), self.link, data)
+        else:
+            if data is None:
+                data = read_bytes(location)
+            sink.write(name, data)
+            method = "write"
+        with self._lock:
+            self.mirrored.append((sink.location(name), method))
+
+
+def primary_directory(sink):
+    """キャッシュ（.icon-cache.json）を置くディレクトリ。ファイルに書かないシンクは None"""
+    while isinstance(sink, MultiSink):
+        sink = sink.primary
+    return sink.directory if isinstance(sink, FileSink) else None
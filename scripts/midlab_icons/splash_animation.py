@@ -0,0 +1,325 @@
+"""
+スプラッシュのアニメーション（APNG / アニメーション WebP）
+
+logo_scene.py の splash シーンから、上昇グラフの線が伸びていき（下の塗りも一緒に広がる）、
+ドットが線の到達に合わせて弾み、最後に矢印が飛び出すフレーム列を作る。
+トラックと "M" は最初から表示し、最終フレームは静止画の splash と同じシーンになる。
+
+差分描画:
+  - シーンはフレームごとに「スロット」（プリミティブ or 非表示の None）の固定長リストで表す
+  - 前のフレームと変わったスロットのバウンディングボックス（多角形は動いた頂点とその両隣だけ）を
+    汚れた範囲とし、sdf_render.render_region でその範囲だけを全レイヤーについて描き直す
+  - 変化のないフレームは前のフレームの表示時間を延ばすだけ
+  60 フレームでも描画する画素はフル描画の数回分で済む。
+
+出力:
+  APNG   汚れた範囲だけのフレーム（fcTL の位置・大きさ + fdAT）。dispose_op=NONE・blend_op=SOURCE で
+         前のフレームの上に範囲ごと置き換える。各範囲は encode_png で圧縮し、IDAT を fdAT に詰め替える
+  WebP   Pillow（libwebp）のアニメーションエンコーダに渡す（部分矩形と破棄方法はエンコーダが選ぶ）
+
+使い方:
+  npm run icons -- animate                                   # build/animation/splash-animated.png
+  npm run icons -- animate --format webp --frames 60 --fps 30 --size 512
+"""
+
+import argparse
+import math
+import struct
+import sys
+import time
+import zlib
+
+from .asset_cache import AssetCache, cache_key, function_version, module_version
+from .lazy_modules import lazy_import
+from .logo_scene import DESIGN_SIZE, VARIANTS, Circle, Polygon, Ring, Segment, build_scene, m_strokes
+from .sinks import FileSink, encode_png
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+
+VARIANT = "splash"
+DEFAULT_SIZE = 1024
+DEFAULT_FRAMES = 60
+DEFAULT_FPS = 30
+DEFAULT_OUTPUT_DIR = "build/animation"
+# タイムライン（全体を 0〜1 とした時刻）
+DRAW = (0.05, 0.6)          # グラフの線が伸びる区間
+DOT_POP = 0.1               # ドットが弾む長さ
+ARROW = (0.6, 0.8)          # 矢印が飛び出す区間
+DIRTY_PAD = 2               # 汚れた範囲に足すアンチエイリアス分（px）
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+APNG_DISPOSE_NONE = 0
+APNG_BLEND_SOURCE = 0
+
+
+def ease_out_cubic(u):
+    return 1 - (1 - u) ** 3
+
+
+def ease_out_back(u, overshoot=1.70158):
+    """終点を少し行き過ぎてから戻る（弾む動き）"""
+    return 1 + (overshoot + 1) * (u - 1) ** 3 + overshoot * (u - 1) ** 2
+
+
+def _progress(t, start, end):
+    return min(1.0, max(0.0, (t - start) / (end - start)))
+
+
+def split_scene(size):
+    """
+    splash のシーンを動く部分ごとに分ける。
+    戻り値: dict（background / track / glow / line / dots / arrow / letter）。
+    track + glow + line + dots + arrow + letter の順に並べると build_scene と同じプリミティブ列になる。
+    """
+    spec = VARIANTS[VARIANT]
+    background, prims = build_scene(VARIANT, size)
+    letter = m_strokes(*spec["m"], u=1.0 / DESIGN_SIZE, min_w=spec["min_px"] / size) if spec["m"] else []
+    dots = [p for p in prims if isinstance(p, Circle)]
+    return {
+        "background": background,
+        "track": [p for p in prims if isinstance(p, Ring)],
+        "glow": next(p for p in prims if isinstance(p, Polygon) and p.alpha < 1),
+        "line": [p for p in prims if isinstance(p, Segment) and p.role == "EMERALD_LIGHT"],
+        "dots": dots,
+        "arrow": [p for p in prims[prims.index(dots[-1]) + 1:] if p not in letter],
+        "letter": list(letter),
+    }
+
+
+def frame_slots(parts, t):
+    """時刻 t のシーンのスロット（全フレームで同じ長さ。非表示は None）"""
+    line = parts["line"]
+    points = [(s.x0, s.y0) for s in line] + [(line[-1].x1, line[-1].y1)]
+    lengths = [math.hypot(s.x1 - s.x0, s.y1 - s.y0) for s in line]
+    total = sum(lengths)
+    reached = ease_out_cubic(_progress(t, *DRAW)) * total
+
+    # 線: 到達した線分はそのまま、途中の線分は先端まで
+    segments, head, walked = [], points[0], 0.0
+    for seg, length in zip(line, lengths):
+        if reached >= walked + length:
+            segments.append(seg)
+            head = (seg.x1, seg.y1)
+        elif reached > walked:
+            f = (reached - walked) / length
+            head = (seg.x0 + (seg.x1 - seg.x0) * f, seg.y0 + (seg.y1 - seg.y0) * f)
+            segments.append(seg._replace(x1=head[0], y1=head[1]))
+        else:
+            segments.append(None)
+        walked += length
+
+    # 塗り: 到達した点 + 先端（残りの点は先端に重ねて頂点数を保つ）
+    glow = parts["glow"]
+    bottom = glow.points[-2:]
+    cumulative = [sum(lengths[:i]) for i in range(len(points))]
+    upper = [p if reached >= c else head for p, c in zip(points, cumulative)]
+    fill = None
+    if reached > 0:
+        fill = glow._replace(points=tuple(upper) + ((head[0], bottom[0][1]), bottom[1]))
+
+    # ドット: 線が届いた時刻から DOT_POP の間に弾む
+    dots = []
+    for dot, c in zip(parts["dots"], cumulative):
+        arrive = DRAW[0] + (1 - (1 - c / total) ** (1 / 3)) * (DRAW[1] - DRAW[0])
+        u = _progress(t, arrive, arrive + DOT_POP)
+        dots.append(dot._replace(r=dot.r * ease_out_back(u)) if u > 0 else None)
+
+    # 矢印: 根元（線分の始点）を中心に拡大
+    s = ease_out_back(_progress(t, *ARROW))
+    arrow = [None] * len(parts["arrow"])
+    if s > 0:
+        bx, by = parts["arrow"][0].x0, parts["arrow"][0].y0
+        arrow = [_scaled_about(p, bx, by, s) for p in parts["arrow"]]
+    return parts["track"] + [fill] + segments + dots + arrow + parts["letter"]
+
+
+def _scaled_about(prim, bx, by, s):
+    def pt(x, y):
+        return bx + (x - bx) * s, by + (y - by) * s
+    if isinstance(prim, Polygon):
+        return prim._replace(points=tuple(pt(x, y) for x, y in prim.points))
+    (x0, y0), (x1, y1) = pt(prim.x0, prim.y0), pt(prim.x1, prim.y1)
+    return prim._replace(x0=x0, y0=y0, x1=x1, y1=y1, width=prim.width * s)
+
+
+def _changed_points(old, new):
+    """頂点数が同じ多角形の、動いた頂点とその両隣（新旧とも）"""
+    n = len(old.points)
+    moved = [i for i in range(n) if old.points[i] != new.points[i]]
+    near = {j % n for i in moved for j in (i - 1, i, i + 1)}
+    return [old.points[i] for i in near] + [new.points[i] for i in near]
+
+
+def dirty_box(previous, current, size):
+    """2つのフレームのスロットの差分を覆うピクセルの範囲 (x0, y0, x1, y1)。変化がなければ None"""
+    from .sdf_render import scene_box
+    boxes = []
+    for old, new in zip(previous, current):
+        if old == new:
+            continue
+        if isinstance(old, Polygon) and isinstance(new, Polygon) and len(old.points) == len(new.points):
+            pts = _changed_points(old, new)
+            boxes.append(scene_box([Polygon(tuple(pts), new.role, new.alpha)], size))
+        else:
+            boxes += [scene_box([p], size) for p in (old, new) if p is not None]
+    if not boxes:
+        return None
+    return (max(0, min(b[0] for b in boxes) - DIRTY_PAD), max(0, min(b[1] for b in boxes) - DIRTY_PAD),
+            min(size, max(b[2] for b in boxes) + DIRTY_PAD), min(size, max(b[3] for b in boxes) + DIRTY_PAD))
+
+
+def _to_rgba(rgb, alpha):
+    """プリマルチプライドの float 配列 -> ストレートアルファの RGBA の PIL 画像"""
+    straight = rgb / np.maximum(alpha, 1e-6)[:, :, None]
+    rgba = np.dstack([straight, alpha])
+    return Image.fromarray(np.rint(np.clip(rgba, 0.0, 1.0) * 255).astype(np.uint8), "RGBA")
+
+
+def render_frames(size=DEFAULT_SIZE, frames=DEFAULT_FRAMES, palette=None, keep_full=False):
+    """
+    フレーム列を差分描画する。
+    戻り値: ([(範囲, 範囲の RGBA 画像, 表示フレーム数, フル画像 or None), ...], 描画した画素数)
+    範囲は最初のフレームだけキャンバス全体。keep_full=True なら各フレームのフル画像（WebP 用）も返す。
+    """
+    from .sdf_render import render_region
+    if frames < 1:
+        raise ValueError(f"フレーム数は 1 以上: {frames}")
+    parts = split_scene(size)
+    background = parts["background"]
+    canvas = None
+    previous = None
+    result = []
+    pixels = 0
+    for f in range(frames):
+        # 1フレームだけなら最終状態（静止画の splash）
+        current = frame_slots(parts, f / (frames - 1) if frames > 1 else 1.0)
+        box = (0, 0, size, size) if previous is None else dirty_box(previous, current, size)
+        previous = current
+        if box is None:
+            # 変化なし: 前のフレームを1フレーム長く表示する
+            last_box, image, count, full = result[-1]
+            result[-1] = (last_box, image, count + 1, full)
+            continue
+        prims = [p for p in current if p is not None]
+        region = _to_rgba(*render_region(background, prims, size, box, palette))
+        pixels += region.width * region.height
+        if canvas is None:
+            canvas = region.copy()
+        else:
+            canvas.paste(region, box[:2])
+        result.append((box, region, 1, canvas.copy() if keep_full else None))
+    return result, pixels
+
+
+def _png_chunks(data):
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], "big")
+        yield data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _png_chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def encode_apng(frames, fps=DEFAULT_FPS, loop=1):
+    """
+    render_frames() のフレーム列を APNG のバイト列に。
+    最初のフレーム（キャンバス全体）が既定画像を兼ね、以降は範囲だけの fdAT。
+    loop は再生回数（0 で無限）。
+    """
+    out = [PNG_SIGNATURE]
+    seq = 0
+    for i, (box, image, count, _) in enumerate(frames):
+        chunks = list(_png_chunks(encode_png(image)))
+        if i == 0:
+            out.append(_png_chunk(b"IHDR", dict(chunks)[b"IHDR"]))
+            out.append(_png_chunk(b"acTL", struct.pack(">II", len(frames), loop)))
+        out.append(_png_chunk(b"fcTL", struct.pack(">IIIIIHHBB", seq, image.width, image.height, box[0], box[1],
+                                                   count, fps, APNG_DISPOSE_NONE, APNG_BLEND_SOURCE)))
+        seq += 1
+        for kind, body in chunks:
+            if kind != b"IDAT":
+                continue
+            if i == 0:
+                out.append(_png_chunk(b"IDAT", body))
+            else:
+                out.append(_png_chunk(b"fdAT", struct.pack(">I", seq) + body))
+                seq += 1
+    out.append(_png_chunk(b"IEND", b""))
+    return b"".join(out)
+
+
+def encode_webp(frames, fps=DEFAULT_FPS, loop=1, quality=None):
+    """render_frames(keep_full=True) のフレーム列をアニメーション WebP に（quality 省略時は可逆）"""
+    import io
+    images = [full for _, _, _, full in frames]
+    durations = [round(count * 1000 / fps) for _, _, count, _ in frames]
+    options = dict(lossless=True, method=4) if quality is None else dict(quality=quality, method=4)
+    buffer = io.BytesIO()
+    images[0].save(buffer, "WEBP", save_all=True, append_images=images[1:], duration=durations,
+                   loop=loop, minimize_size=True, **options)
+    return buffer.getvalue()
+
+
+# 出力に影響する関数（キャッシュキーの関数バージョンに含める）
+ANIMATION_FUNCTIONS = (split_scene, frame_slots, _scaled_about, dirty_box, _changed_points, _to_rgba,
+                       render_frames, encode_apng, encode_webp, ease_out_cubic, ease_out_back)
+
+
+def generate_animation(output_dir=DEFAULT_OUTPUT_DIR, fmt="apng", size=DEFAULT_SIZE, frames=DEFAULT_FRAMES,
+                       fps=DEFAULT_FPS, loop=1, quality=None, force=False, verbose=True):
+    """アニメーションを書き出す（入力が変わっていなければスキップ）。戻り値: 出力パス"""
+    from . import logo_scene, sdf_render
+    if frames < 1:
+        raise ValueError(f"フレーム数は 1 以上: {frames}")
+    log = print if verbose else (lambda *args, **kwargs: None)
+    fname = "splash-animated.png" if fmt == "apng" else "splash-animated.webp"
+    sink = FileSink(output_dir)
+    cache = AssetCache.for_directory(output_dir, force=force)
+    path = sink.location(fname)
+    key = cache_key(fmt, size, frames, fps, loop, quality, DRAW, DOT_POP, ARROW,
+                    function_version(*ANIMATION_FUNCTIONS), module_version(logo_scene, sdf_render))
+    if cache.is_fresh(path, key):
+        log(f"スキップ（変更なし）: {path}")
+        return path
+
+    start = time.perf_counter()
+    result, pixels = render_frames(size, frames, keep_full=fmt == "webp")
+    rendered = time.perf_counter() - start
+    data = encode_apng(result, fps, loop) if fmt == "apng" else encode_webp(result, fps, loop, quality)
+    sink.write(fname, data)
+    cache.record(path, key)
+    cache.save()
+    log(f"保存: {path}（{len(data) / 1024:.1f}KB, {frames}フレーム → 差分 {len(result)}枚）")
+    log(f"  描画した画素: フル描画 {pixels / (size * size):.2f}回分（描画 {rendered:.2f}s / "
+        f"合計 {time.perf_counter() - start:.2f}s）")
+    return path
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="スプラッシュのアニメーション（グラフが伸びて矢印が飛び出す）を生成")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help=f"出力ディレクトリ (デフォルト: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--format", choices=("apng", "webp"), default="apng", help="出力形式 (デフォルト: apng)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help=f"一辺の px (デフォルト: {DEFAULT_SIZE})")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help=f"フレーム数 (デフォルト: {DEFAULT_FRAMES})")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help=f"フレームレート (デフォルト: {DEFAULT_FPS})")
+    parser.add_argument("--loop", type=int, default=1, help="再生回数。0 で無限ループ (デフォルト: 1)")
+    parser.add_argument("--quality", type=int, default=None,
+                        help="WebP を非可逆にするときの品質 0〜100 (デフォルト: 可逆)")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視して再生成")
+    args = parser.parse_args(argv)
+    if args.frames < 1:
+        parser.error(f"--frames は 1 以上: {args.frames}")
+    if args.fps < 1:
+        parser.error(f"--fps は 1 以上: {args.fps}")
+
+    generate_animation(args.out, args.format, args.size, args.frames, args.fps, args.loop, args.quality,
+                       force=args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
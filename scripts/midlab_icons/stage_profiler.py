@@ -0,0 +1,244 @@
+"""
+process_icons.py / generate_icons.py 共通のステージプロファイラ
+
+各ステージ（open / decode / crop / mask / label / resize / encode / copy など）を
+span() で囲んでおき、--profile 指定時だけ時間・メモリを記録する。
+無効時の span() はグローバル変数を1回見て共有の no-op オブジェクトを返すだけなので、
+オーバーヘッドは呼び出し1回あたり 1µs 未満。
+
+記録する内容（span ごと）:
+  - 開始時刻・所要時間（perf_counter_ns）、スレッド ID
+  - tracemalloc のピーク増分（span 開始時点からの増分、入れ子の子 span のピークも含む）
+  - RSS の増減（/proc/self/statm、Linux のみ）
+
+出力:
+  - Chrome トレース形式の JSON（chrome://tracing や https://ui.perfetto.dev で開ける）
+  - 名前ごとの集計表（回数・合計・平均・最大・自身の時間・ピークメモリ）
+  - cprofile_path を指定すると、cprofile=True の span（出力ごとのステージ）を
+    cProfile で計測し、最も時間のかかったものを .prof に保存して上位関数を表示する
+    （cProfile 自体のオーバーヘッドでトレースの時間は長めに出る）
+  - tracemalloc のピークと cProfile はプロセス全体で1つなので、メモリと cProfile の値が正しいのは
+    span を1スレッドで実行した場合だけ（process_icons.py は計測中はスレッド数を 1 にする）
+
+使い方:
+  with profiling("build/profile/trace.json"):
+      with span("encode", file="icon.png"):
+          image.save(path)
+"""
+
+import io
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_active = None
+
+
+class _NullSpan:
+    """プロファイラ無効時の span（何もしない）"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, cprofile=False, **args):
+    """
+    ステージを計測する context manager。プロファイラが無効なら何もしない。
+    args はトレースの args にそのまま入る（ファイル名など）。
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _Span(_active, name, cprofile, args)
+
+
+def enabled():
+    return _active is not None
+
+
+def _rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "cprofile", "args", "start", "mem_start", "peak", "rss_start",
+                 "child_ns", "parent", "cprof")
+
+    def __init__(self, profiler, name, cprofile, args):
+        self.profiler = profiler
+        self.name = name
+        self.cprofile = cprofile
+        self.args = args
+
+    def __enter__(self):
+        profiler = self.profiler
+        stack = profiler._stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.child_ns = 0
+        self.rss_start = _rss()
+        current, peak = tracemalloc.get_traced_memory()
+        if self.parent is not None:
+            # reset_peak で失われる親のピークを退避しておく
+            self.parent.peak = max(self.parent.peak, peak)
+        tracemalloc.reset_peak()
+        self.mem_start = current
+        self.peak = current
+        self.cprof = None
+        if self.cprofile and profiler.cprofile_path and not profiler._cprofile_busy:
+            profiler._cprofile_busy = True
+            import cProfile
+            self.cprof = cProfile.Profile()
+            self.cprof.enable()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if self.cprof is not None:
+            self.cprof.disable()
+            self.profiler._cprofile_busy = False
+        duration = end - self.start
+        peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        rss_end = _rss()
+        stack = self.profiler._stack()
+        stack.pop()
+        if self.parent is not None:
+            self.parent.child_ns += duration
+            self.parent.peak = max(self.parent.peak, peak)
+        self.profiler._record(self, duration, peak - self.mem_start, rss_end)
+        return False
+
+
+class Profiler:
+    """span の記録を保持し、トレース JSON と集計表を作る"""
+
+    def __init__(self, cprofile_path=None):
+        self.cprofile_path = cprofile_path
+        self.events = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cprofile_busy = False
+        self._cprofiles = []
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, s, duration, peak, rss_end):
+        event = {
+            "name": s.name,
+            "start_ns": s.start - self.origin,
+            "dur_ns": duration,
+            "self_ns": duration - s.child_ns,
+            "tid": threading.get_ident(),
+            "peak_bytes": peak,
+            "rss_delta_bytes": None if rss_end is None or s.rss_start is None else rss_end - s.rss_start,
+            "args": {k: str(v) for k, v in s.args.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+            if s.cprof is not None:
+                self._cprofiles.append((duration, s.name, s.args, s.cprof))
+
+    def chrome_trace(self):
+        """Chrome トレース形式（Trace Event Format の complete event）"""
+        pid = os.getpid()
+        trace = []
+        for e in sorted(self.events, key=lambda e: e["start_ns"]):
+            args = dict(e["args"])
+            args["peak_mb"] = round(e["peak_bytes"] / (1 << 20), 2)
+            if e["rss_delta_bytes"] is not None:
+                args["rss_delta_mb"] = round(e["rss_delta_bytes"] / (1 << 20), 2)
+            trace.append({
+                "name": e["name"],
+                "cat": "stage",
+                "ph": "X",
+                "ts": e["start_ns"] / 1000,
+                "dur": e["dur_ns"] / 1000,
+                "pid": pid,
+                "tid": e["tid"],
+                "args": args,
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def summary(self):
+        """名前ごとの集計: [(名前, 回数, 合計ns, 自身ns, 最大ns, 最大ピークbytes)]（合計の大きい順）"""
+        rows = {}
+        for e in self.events:
+            row = rows.setdefault(e["name"], [e["name"], 0, 0, 0, 0, 0])
+            row[1] += 1
+            row[2] += e["dur_ns"]
+            row[3] += e["self_ns"]
+            row[4] = max(row[4], e["dur_ns"])
+            row[5] = max(row[5], e["peak_bytes"])
+        return sorted((tuple(r) for r in rows.values()), key=lambda r: -r[2])
+
+    def format_summary(self):
+        lines = [f"{'stage':<20} {'count':>6} {'total':>12} {'avg':>12} {'max':>12} {'self':>12} {'peak':>9}"]
+        for name, count, total, own, longest, peak in self.summary():
+            lines.append(f"{name:<20} {count:>6} {total / 1e6:>10.1f}ms {total / count / 1e6:>10.1f}ms "
+                         f"{longest / 1e6:>10.1f}ms {own / 1e6:>10.1f}ms {peak / (1 << 20):>7.1f}MB")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+    def dump_hottest_cprofile(self, limit=15):
+        """最も時間のかかった cprofile span を保存し、上位関数の表を返す（なければ None）"""
+        if not self.cprofile_path or not self._cprofiles:
+            return None
+        duration, name, args, prof = max(self._cprofiles, key=lambda c: c[0])
+        os.makedirs(os.path.dirname(os.path.abspath(self.cprofile_path)), exist_ok=True)
+        prof.dump_stats(self.cprofile_path)
+        out = io.StringIO()
+        label = " ".join(f"{k}={v}" for k, v in args.items())
+        out.write(f"cProfile: {name} {label} ({duration / 1e6:.1f}ms) -> {self.cprofile_path}\n")
+        import pstats
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+@contextmanager
+def profiling(trace_path, cprofile_path=None):
+    """
+    ブロック内の span を記録し、終了時にトレース JSON を書き出して集計表を表示する。
+    tracemalloc が止まっていれば開始し、終了時に止める。
+    """
+    global _active
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    profiler = Profiler(cprofile_path)
+    _active = profiler
+    try:
+        yield profiler
+    finally:
+        _active = None
+        if started_tracemalloc:
+            tracemalloc.stop()
+        profiler.write_trace(trace_path)
+        print(f"\nプロファイル（{len(profiler.events)} span）: {trace_path}")
+        print(profiler.format_summary())
+        report = profiler.dump_hottest_cprofile()
+        if report:
+            print(f"\n{report}")
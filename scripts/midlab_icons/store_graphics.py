@@ -0,0 +1,506 @@
+"""
+Play ストア用グラフィック（フィーチャーグラフィック・スクリーンショットのフレーム）の一括生成
+
+fastlane/metadata/android/<ロケール>/ の title.txt・short_description.txt を読み、
+logo_scene.py のロゴ（splash の配置）と合わせてロケールごとに合成する:
+
+  featureGraphic.png          1024x500 のフィーチャーグラフィック（左にロゴ、右にタイトルと説明文）
+  frame-<幅>x<高さ>.png        スクリーンショットのフレーム（上部にロゴ・タイトル・説明文、下に画面の枠）
+  frame-<幅>x<高さ>-<名前>.png  --screenshots DIR/<ロケール>/<名前>.png を枠に嵌め込んだもの
+
+レイヤーはロケールに依存するかどうかで分けてメモリ上に持つ:
+  - 背景（BG_DARK + 同心円）にロゴ（sdf_render.py）を重ねたベースと、画面枠の角丸マスク:
+    レイアウト x サイズごとに1回だけ描く（ロケール間で共有）
+  - テキストの行: フォント x 文字サイズ x 文字列ごとに1回だけ描いた RGBA（折り返しの幅の計測も同様）
+ロケールやサイズを増やしても、増えるのはテキストの描画と貼り合わせだけ。
+出力はスレッドで並行に合成し（共有レイヤーは single-flight で1回だけ描く）、
+テキスト・フォント・スクリーンショット・描画関数が変わっていない出力は AssetCache でスキップする。
+
+フォントは --font（全ロケール）/ --font ja-JP=PATH（ロケールごと）で指定する。省略時は
+FONT_CANDIDATES からテキストの全文字の字形があるものを探す（なければ警告して、字形のない文字は豆腐になる）。
+
+使い方:
+  npm run icons -- store                                     # build/store-graphics/<ロケール>/
+  npm run icons -- store --frames 1080x1920 1600x2560 --screenshots build/screenshots
+  npm run icons -- store --locales ja-JP --font ja-JP=/path/to/NotoSansCJKjp-Bold.otf
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+
+from .asset_cache import AssetCache, MemoryLRU, SingleFlight, cache_key, file_sha256, function_version, module_version
+from .generate_icons import BG_DARK, EMERALD, EMERALD_LIGHT, WHITE
+from .lazy_modules import lazy_import
+from .sinks import FileSink, encode_png
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+
+DEFAULT_METADATA_DIR = "fastlane/metadata/android"
+DEFAULT_OUTPUT_DIR = "build/store-graphics"
+DEFAULT_FRAMES = ["1080x1920", "1200x1920"]
+DEFAULT_MEMORY_MB = 512
+FEATURE_SIZE = (1024, 500)         # Play Console の指定サイズ
+LOGO_VARIANT = "splash"            # 背景なしでトラック・グラフ・"M" が揃う配置
+TITLE_COLOR = WHITE
+BODY_COLOR = (200, 214, 204)
+SLOT_FILL = (22, 24, 30)
+MIN_TEXT_SCALE = 0.6               # 収まらないときに文字を縮める下限（レイアウトの文字サイズに対する比）
+# 行頭に置かない文字（前の行にぶら下げる）
+LINE_START_FORBIDDEN = set("、。，．,.）)」』】！？!?ー〜…・：:；;")
+
+# ロケールの言語 -> フォントの候補（先に見つかったもの）。None はそれ以外の言語
+FONT_CANDIDATES = {
+    "ja": [
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
+        "/System/Library/Fonts/ヒラギノ角ゴシック W6.ttc",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "C:/Windows/Fonts/YuGothB.ttc",
+        "C:/Windows/Fonts/meiryob.ttc",
+    ],
+    None: [
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf",
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/Library/Fonts/Arial Bold.ttf",
+        "C:/Windows/Fonts/arialbd.ttf",
+    ],
+}
+
+# ロケールのテキスト
+LocaleText = namedtuple("LocaleText", "locale title description")
+# 出力のレイアウト（座標は px）
+#   logo:  ロゴを収める範囲 (x0, y0, x1, y1)。ロゴは透明部分を切り詰めて中央に置く
+#   text:  タイトルと説明文を置く範囲 (x0, y0, x1, y1)。align は "left" / "center"
+#   slot:  スクリーンショットの枠 (x0, y0, x1, y1)（なければ None）。radius は枠の角丸の半径
+Layout = namedtuple("Layout", "kind width height logo logo_px text align title_size body_size max_lines slot radius")
+
+
+def feature_layout(width, height):
+    """フィーチャーグラフィック: 左 4 割にロゴ、右にタイトルと説明文（左揃え）"""
+    split = round(width * 0.42)
+    return Layout("feature", width, height,
+                  logo=(0, 0, split, height), logo_px=round(height * 1.05),
+                  text=(split, round(height * 0.12), width - round(width * 0.05), height - round(height * 0.12)),
+                  align="left", title_size=round(height * 0.15), body_size=round(height * 0.058), max_lines=3,
+                  slot=None, radius=0)
+
+
+def frame_layout(width, height):
+    """スクリーンショットのフレーム: 上部にロゴ・タイトル・説明文（中央揃え）、下に画面の枠"""
+    margin = round(width * 0.08)
+    logo_bottom = round(height * 0.1)
+    header = round(height * 0.28)
+    return Layout("frame", width, height,
+                  logo=(0, round(height * 0.02), width, logo_bottom), logo_px=round(height * 0.15),
+                  text=(margin, logo_bottom + round(height * 0.01), width - margin, header),
+                  align="center", title_size=round(width * 0.075), body_size=round(width * 0.036), max_lines=3,
+                  slot=(round(width * 0.12), header + round(height * 0.02), width - round(width * 0.12),
+                        height - round(height * 0.03)),
+                  radius=round(width * 0.05))
+
+
+def read_locales(metadata_dir=DEFAULT_METADATA_DIR, locales=None):
+    """metadata_dir/<ロケール>/ の title.txt・short_description.txt（locales でロケールを絞る）"""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(metadata_dir, "*", "title.txt"))):
+        directory = os.path.dirname(path)
+        locale = os.path.basename(directory)
+        if locales and locale not in locales:
+            continue
+        with open(path, encoding="utf-8") as f:
+            title = f.read().strip()
+        description = ""
+        description_path = os.path.join(directory, "short_description.txt")
+        if os.path.exists(description_path):
+            with open(description_path, encoding="utf-8") as f:
+                description = " ".join(f.read().split())
+        texts.append(LocaleText(locale, title, description))
+    return texts
+
+
+def missing_glyphs(path, text, size=32):
+    """フォント（None は内蔵フォント）に字形がない文字（.notdef と同じ形で描かれる文字）"""
+    font = ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
+    notdef = font.getmask("\uffff")
+    notdef = (notdef.size, bytes(notdef))
+    missing = []
+    for ch in sorted(set(text)):
+        if ch.isspace() or ch in missing:
+            continue
+        mask = font.getmask(ch)
+        if (mask.size, bytes(mask)) == notdef:
+            missing.append(ch)
+    return "".join(missing)
+
+
+def find_font(locale, overrides=None, text=""):
+    """
+    ロケールのフォントのパス（overrides: ロケール or None -> パス、指定があればそれを使う）。
+    候補のうち text の全文字の字形があるものを選ぶ。どれにもなければ最初に見つかった候補、
+    候補が1つもなければ None（内蔵フォント）。
+    """
+    overrides = overrides or {}
+    if locale in overrides:
+        return overrides[locale]
+    if None in overrides:
+        return overrides[None]
+    language = locale.split("-")[0]
+    found = [path for path in FONT_CANDIDATES.get(language, []) + FONT_CANDIDATES[None] if os.path.exists(path)]
+    for path in found:
+        if text.isascii() or not missing_glyphs(path, text):
+            return path
+    return found[0] if found else None
+
+
+def parse_size(text):
+    """"1080x1920" を (幅, 高さ) に"""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"幅x高さ の形式で指定してください: {text}")
+    if width < 64 or height < 64:
+        raise argparse.ArgumentTypeError(f"幅・高さは 64 以上: {text}")
+    return width, height
+
+
+def parse_font(text):
+    """"PATH"（全ロケール）または "ja-JP=PATH" を (ロケール or None, パス) に"""
+    locale, sep, path = text.partition("=")
+    if not sep:
+        locale, path = None, text
+    if not os.path.exists(path):
+        raise argparse.ArgumentTypeError(f"フォントが見つかりません: {path}")
+    return locale, path
+
+
+def wrap_tokens(text):
+    """折り返しの単位: 英数字の単語（後ろの空白を含む）・空白・それ以外は1文字ずつ"""
+    return re.findall(r"[0-9A-Za-z'’.,%+\-/]+\s*|\s+|.", text)
+
+
+def _background(width, height, center, radius):
+    """BG_DARK にロゴを中心とした EMERALD の同心円（アイコンの circles と同じ不透明度）を重ねた RGB"""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    distance = np.hypot(x - center[0], y - center[1])
+    rgb = np.empty((height, width, 3), dtype=np.float32)
+    rgb[:] = np.array(BG_DARK, dtype=np.float32)
+    emerald = np.array(EMERALD, dtype=np.float32)
+    for i in range(3):
+        r = radius * (1 - i * 60 / 512)
+        a = (np.clip(r - distance + 0.5, 0.0, 1.0) * ((15 + i * 5) / 255))[:, :, None]
+        rgb += (emerald - rgb) * a
+    return Image.fromarray(np.rint(rgb).astype(np.uint8), "RGB")
+
+
+def _logo(px):
+    """ロゴを px x px で描画し、透明な余白を切り詰めた RGBA"""
+    from .sdf_render import render_variant
+    logo = render_variant(LOGO_VARIANT, px)
+    return logo.crop(logo.getbbox())
+
+
+def _rounded_mask(size, radius):
+    mask = Image.new("L", size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, size[0] - 1, size[1] - 1), radius=radius, fill=255)
+    return mask
+
+
+def _fit_cover(image, size):
+    """image をアスペクト比を保って size を覆うように縮小し、中央を切り出す"""
+    scale = max(size[0] / image.width, size[1] / image.height)
+    resized = image.resize((max(size[0], round(image.width * scale)), max(size[1], round(image.height * scale))),
+                           Image.LANCZOS)
+    x0, y0 = (resized.width - size[0]) // 2, (resized.height - size[1]) // 2
+    return resized.crop((x0, y0, x0 + size[0], y0 + size[1]))
+
+
+class StoreGraphicsRenderer:
+    """レイアウトとロケールのテキストから画像を合成する（共有レイヤーは MemoryLRU + single-flight）"""
+
+    def __init__(self, fonts=None, memory_mb=DEFAULT_MEMORY_MB):
+        self.fonts = dict(fonts or {})
+        self.memo = MemoryLRU(int(memory_mb * (1 << 20)))
+        self.flight = SingleFlight()
+        self.counts = {"base": 0, "text": 0}
+        self._count_lock = threading.Lock()
+        # FreeType のフェイスはスレッド間で共有できないので、計測とテキストの描画だけ直列にする
+        self._font_lock = threading.Lock()
+        self._font_objects = {}
+        self._font_paths = {}
+        self._lengths = {}
+
+    def _cached(self, key, compute):
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+
+        def run():
+            value = self.memo.get(key)
+            if value is None:
+                value = compute()
+                self.memo.put(key, value)
+            return value
+
+        return self.flight.do(key, run)
+
+    def _count(self, name):
+        with self._count_lock:
+            self.counts[name] += 1
+
+    def font_path(self, text):
+        """ロケールのテキストを描くフォント（ロケールごとに1回だけ探す）"""
+        path = self._font_paths.get(text.locale, ())
+        if path == ():
+            path = self._font_paths[text.locale] = find_font(text.locale, self.fonts, text.title + text.description)
+        return path
+
+    def _font(self, path, size):
+        font = self._font_objects.get((path, size))
+        if font is None:
+            font = ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
+            self._font_objects[path, size] = font
+        return font
+
+    def _length(self, path, size, text):
+        """文字列の送り幅（_font_lock の中で呼ぶ）"""
+        key = (path, size, text)
+        length = self._lengths.get(key)
+        if length is None:
+            length = self._lengths[key] = self._font(path, size).getlength(text)
+        return length
+
+    def base(self, layout):
+        """背景 + ロゴ（+ 画面枠）の RGBA。ロケールに依存しないので全ロケールで共有する"""
+        def render():
+            self._count("base")
+            logo = self._cached(("logo", layout.logo_px), lambda: _logo(layout.logo_px))
+            x0, y0, x1, y1 = layout.logo
+            scale = min(1.0, (x1 - x0) / logo.width, (y1 - y0) / logo.height)
+            if scale < 1.0:
+                logo = logo.resize((round(logo.width * scale), round(logo.height * scale)), Image.LANCZOS)
+            dest = (x0 + (x1 - x0 - logo.width) // 2, y0 + (y1 - y0 - logo.height) // 2)
+            center = (dest[0] + logo.width / 2, dest[1] + logo.height / 2)
+            radius = max(layout.width, layout.height) * (0.5 if layout.kind == "feature" else 0.35)
+            image = _background(layout.width, layout.height, center, radius).convert("RGBA")
+            image.alpha_composite(logo, dest=dest)
+            if layout.slot:
+                sx0, sy0, sx1, sy1 = layout.slot
+                ImageDraw.Draw(image).rounded_rectangle(
+                    (sx0 - 3, sy0 - 3, sx1 + 2, sy1 + 2), radius=layout.radius + 3, fill=SLOT_FILL,
+                    outline=EMERALD, width=3)
+            return image
+
+        return self._cached(("base", layout), render)
+
+    def slot_mask(self, layout):
+        x0, y0, x1, y1 = layout.slot
+        return self._cached(("mask", x1 - x0, y1 - y0, layout.radius),
+                            lambda: _rounded_mask((x1 - x0, y1 - y0), layout.radius))
+
+    def text_run(self, path, size, text, color):
+        """1行ぶんのテキストの RGBA（高さは ascent + descent で揃える）"""
+        def render():
+            with self._font_lock:
+                self._count("text")
+                font = self._font(path, size)
+                ascent, descent = font.getmetrics()
+                left, _, right, _ = font.getbbox(text)
+                mask = Image.new("L", (max(1, right - min(left, 0)), ascent + descent), 0)
+                ImageDraw.Draw(mask).text((-min(left, 0), 0), text, font=font, fill=255)
+            run = Image.new("RGBA", mask.size, color + (0,))
+            run.putalpha(mask)
+            return run
+
+        return self._cached(("text", path, size, text, color), render)
+
+    def wrap(self, path, size, text, max_width):
+        """text を max_width に収まる行に折り返す（英語は単語単位、日本語は文字単位 + 簡易禁則）"""
+        lines = [""]
+        with self._font_lock:
+            for token in wrap_tokens(text):
+                line = lines[-1]
+                if not line and token.isspace():
+                    continue
+                fits = self._length(path, size, (line + token).rstrip()) <= max_width
+                if fits or not line or token[0] in LINE_START_FORBIDDEN:
+                    lines[-1] = line + token
+                else:
+                    lines.append(token.lstrip())
+        return [line.rstrip() for line in lines if line.strip()]
+
+    def fit_text(self, path, layout, text):
+        """
+        タイトル（1行）と説明文（max_lines 行まで）が text の範囲に収まる文字サイズと行。
+        収まらなければレイアウトの文字サイズから MIN_TEXT_SCALE まで縮める。
+        戻り値: (タイトルの文字サイズ, 説明文の文字サイズ, 説明文の行)
+        """
+        x0, y0, x1, y1 = layout.text
+        width = x1 - x0
+        title_size = layout.title_size
+        while title_size > layout.title_size * MIN_TEXT_SCALE:
+            with self._font_lock:
+                if self._length(path, title_size, text.title) <= width:
+                    break
+            title_size -= max(1, title_size // 25)
+        body_size = layout.body_size
+        while True:
+            lines = self.wrap(path, body_size, text.description, width)
+            if len(lines) <= layout.max_lines or body_size <= layout.body_size * MIN_TEXT_SCALE:
+                return title_size, body_size, lines[:layout.max_lines]
+            body_size -= max(1, body_size // 25)
+
+    def compose(self, layout, text, screenshot=None):
+        """1枚分を合成した RGB。screenshot（PIL 画像）は画面枠に嵌め込む"""
+        path = self.font_path(text)
+        title_size, body_size, lines = self.fit_text(path, layout, text)
+        runs = [self.text_run(path, title_size, text.title, TITLE_COLOR)]
+        runs += [self.text_run(path, body_size, line, BODY_COLOR) for line in lines]
+        gap = round(title_size * 0.45)
+        accent = max(3, round(title_size * 0.06))
+        x0, y0, x1, y1 = layout.text
+        block = sum(run.height for run in runs) + gap + accent + round(body_size * 0.15) * (len(runs) - 2)
+
+        image = self.base(layout).copy()
+        draw = ImageDraw.Draw(image)
+        y = y0 + max(0, (y1 - y0 - block) // 2)
+        for i, run in enumerate(runs):
+            x = x0 if layout.align == "left" else x0 + (x1 - x0 - run.width) // 2
+            image.alpha_composite(run, dest=(x, y))
+            y += run.height
+            if i == 0:
+                # タイトルの下のアクセントライン
+                bar = round(title_size * 1.6)
+                bx = x0 if layout.align == "left" else x0 + (x1 - x0 - bar) // 2
+                draw.rectangle((bx, y + gap // 2 - accent // 2, bx + bar, y + gap // 2 + accent - accent // 2),
+                               fill=EMERALD_LIGHT)
+                y += gap + accent
+            else:
+                y += round(body_size * 0.15)
+
+        if screenshot is not None and layout.slot:
+            sx0, sy0, sx1, sy1 = layout.slot
+            fitted = _fit_cover(screenshot.convert("RGB"), (sx1 - sx0, sy1 - sy0))
+            image.paste(fitted, (sx0, sy0), self.slot_mask(layout))
+        return image.convert("RGB")
+
+    def summary(self):
+        return f"ベース描画 {self.counts['base']}回 / テキスト行 {self.counts['text']}回 / {self.memo.summary()}"
+
+
+# 出力に影響する関数（キャッシュキーの関数バージョンに含める）
+COMPOSE_FUNCTIONS = (
+    feature_layout, frame_layout, wrap_tokens, _background, _logo, _rounded_mask, _fit_cover,
+    StoreGraphicsRenderer.base, StoreGraphicsRenderer.text_run, StoreGraphicsRenderer.wrap,
+    StoreGraphicsRenderer.fit_text, StoreGraphicsRenderer.compose,
+)
+
+
+def render_store_graphics(metadata_dir=DEFAULT_METADATA_DIR, output_root=DEFAULT_OUTPUT_DIR, locales=None,
+                          frames=None, screenshots_dir=None, fonts=None, feature=True, force=False,
+                          threads=None, memory_mb=DEFAULT_MEMORY_MB, verbose=True):
+    """
+    全ロケール x 全レイアウト（フィーチャーグラフィック + frames のサイズ）を書き出す。
+    戻り値: 書き出したパスのリスト
+    """
+    from . import logo_scene, sdf_render
+
+    log = print if verbose else (lambda *args, **kwargs: None)
+    texts = read_locales(metadata_dir, locales)
+    if not texts:
+        raise FileNotFoundError(f"ロケールが見つかりません: {metadata_dir}/<ロケール>/title.txt")
+    frames = [parse_size(f) if isinstance(f, str) else f for f in (DEFAULT_FRAMES if frames is None else frames)]
+    layouts = ([feature_layout(*FEATURE_SIZE)] if feature else []) + [frame_layout(w, h) for w, h in frames]
+    renderer = StoreGraphicsRenderer(fonts, memory_mb)
+    version = cache_key(function_version(*COMPOSE_FUNCTIONS), module_version(logo_scene, sdf_render))
+    cache = AssetCache.for_directory(output_root, force=force)
+
+    tasks = []
+    for text in texts:
+        font = renderer.font_path(text)
+        missing = missing_glyphs(font, text.title + text.description)
+        if missing:
+            log(f"警告: {text.locale} のフォント（{font or '内蔵フォント'}）に字形がない文字があります: "
+                f"{missing[:20]}{'…' if len(missing) > 20 else ''}（--font {text.locale}=PATH で指定してください）")
+        font_hash = file_sha256(font) if font else "default"
+        sink = FileSink(os.path.join(output_root, text.locale))
+        shots = [None]
+        if screenshots_dir:
+            shots += sorted(glob.glob(os.path.join(screenshots_dir, text.locale, "*.png")))
+        for layout in layouts:
+            for shot in (shots if layout.slot else [None]):
+                if layout.kind == "feature":
+                    fname = "featureGraphic.png"
+                else:
+                    stem = f"-{os.path.splitext(os.path.basename(shot))[0]}" if shot else ""
+                    fname = f"frame-{layout.width}x{layout.height}{stem}.png"
+                key = cache_key(text, layout, font_hash, file_sha256(shot) if shot else None, version)
+                if not cache.is_fresh(sink.location(fname), key):
+                    tasks.append((layout, text, shot, sink, fname, key))
+
+    def run(layout, text, shot, sink, fname):
+        screenshot = None
+        if shot:
+            with Image.open(shot) as source:
+                screenshot = source.convert("RGB")
+        return sink.write(fname, encode_png(renderer.compose(layout, text, screenshot)))
+
+    threads = min(threads or os.cpu_count() or 1, max(1, len(tasks)))
+    if threads == 1:
+        written = [run(*task[:5]) for task in tasks]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(run, *task[:5]) for task in tasks]
+            written = [f.result() for f in futures]
+    for task, path in zip(tasks, written):
+        cache.record(path, task[5])
+        log(f"  保存: {path}")
+    cache.save()
+
+    log(f"\n{cache.summary()}")
+    log(renderer.summary())
+    return written
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="fastlane のメタデータから Play ストア用グラフィックを一括生成")
+    parser.add_argument("--metadata", default=DEFAULT_METADATA_DIR,
+                        help=f"fastlane のメタデータのディレクトリ (デフォルト: {DEFAULT_METADATA_DIR})")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help=f"出力ルート (デフォルト: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--locales", nargs="+", default=None, help="生成するロケール (デフォルト: すべて)")
+    parser.add_argument("--frames", nargs="*", type=parse_size, default=None, metavar="WxH",
+                        help=f"スクリーンショットのフレームのサイズ (デフォルト: {' '.join(DEFAULT_FRAMES)})")
+    parser.add_argument("--no-feature", action="store_true", help="フィーチャーグラフィックを作らない")
+    parser.add_argument("--screenshots", default=None, metavar="DIR",
+                        help="DIR/<ロケール>/*.png をフレームに嵌め込んだ画像も書き出す")
+    parser.add_argument("--font", action="append", type=parse_font, default=[], metavar="[LOCALE=]PATH",
+                        help="フォントファイル（LOCALE= でロケールごと、繰り返し指定可）")
+    parser.add_argument("--force", action="store_true", help="キャッシュを無視して全出力を再生成")
+    parser.add_argument("--threads", type=int, default=None, help="並行に合成するスレッド数 (デフォルト: CPU コア数)")
+    parser.add_argument("--memory", type=float, default=DEFAULT_MEMORY_MB, metavar="MB",
+                        help=f"共有レイヤーを保持するメモリの上限 (デフォルト: {DEFAULT_MEMORY_MB}MB)")
+    args = parser.parse_args(argv)
+
+    try:
+        render_store_graphics(args.metadata, args.out, args.locales, args.frames, args.screenshots,
+                              dict(args.font), feature=not args.no_feature, force=args.force,
+                              threads=args.threads, memory_mb=args.memory)
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+ベンチマーク・検証用の合成ソースグリッド生成
+
+nanobanana の出力に似せた cols x rows のグリッド画像を作る。各セルは:
+  - チェッカー柄の背景（255 / 204 の2トーン + 弱いノイズ）
+  - 上部のラベル帯（暗い帯 + 白いテキスト風ブロック）
+  - 右端・下端のガイド破線（灰色）
+  - 緑のロゴ（トラックオーバルのリング + 上昇グラフ + ドット）
+
+使い方:
+  python3 scripts/synthetic_grid.py 2048 build/synthetic-2048.png
+"""
+
+import argparse
+import sys
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+CHECKER_TONES = (255, 204)
+LABEL_COLOR = (40, 40, 40)
+LABEL_TEXT_COLOR = (250, 250, 250)
+GUIDE_COLOR = (150, 150, 150)
+LOGO_GREEN = (45, 159, 45)
+LOGO_LIGHT = (60, 200, 80)
+
+
+def _checker(width, height, cell, rng):
+    yy, xx = np.ogrid[0:height, 0:width]
+    tone = np.where((yy // cell + xx // cell) % 2 == 0, CHECKER_TONES[0], CHECKER_TONES[1])
+    data = np.empty((height, width, 3), dtype=np.uint8)
+    noise = rng.integers(-4, 5, size=(height, width, 3), dtype=np.int16)
+    np.clip(tone[:, :, None].astype(np.int16) + noise, 0, 255, out=noise)
+    data[:] = noise
+    return data
+
+
+def _draw_cell(draw, x0, y0, w, h):
+    # ラベル帯とテキスト風ブロック
+    band = max(8, h // 12)
+    draw.rectangle([x0, y0, x0 + w - 1, y0 + band], fill=LABEL_COLOR)
+    block = max(2, band // 3)
+    for i in range(6):
+        bx = x0 + w // 16 + i * block * 2
+        draw.rectangle([bx, y0 + block, bx + block, y0 + 2 * block], fill=LABEL_TEXT_COLOR)
+
+    # ロゴ（トラックのリング + 上昇グラフ + ドット）
+    ring = max(3, w // 20)
+    draw.ellipse([x0 + w * 0.18, y0 + h * 0.3, x0 + w * 0.82, y0 + h * 0.76],
+                 outline=LOGO_GREEN, width=ring)
+    points = [(x0 + w * fx, y0 + h * fy) for fx, fy in
+              ((0.32, 0.62), (0.42, 0.58), (0.52, 0.55), (0.6, 0.48), (0.68, 0.42))]
+    draw.line(points, fill=LOGO_LIGHT, width=max(2, w // 60))
+    r = max(2, w // 80)
+    for px, py in points:
+        draw.ellipse([px - r, py - r, px + r, py + r], fill=LOGO_LIGHT)
+
+    # 右端・下端のガイド破線
+    dash = max(4, w // 100)
+    gx, gy = x0 + w - max(4, w // 50), y0 + h - max(4, h // 50)
+    width = max(1, w // 500)
+    for k in range(0, h, dash * 2):
+        draw.line([(gx, y0 + k), (gx, y0 + min(h - 1, k + dash))], fill=GUIDE_COLOR, width=width)
+    for k in range(0, w, dash * 2):
+        draw.line([(x0 + k, gy), (x0 + min(w - 1, k + dash), gy)], fill=GUIDE_COLOR, width=width)
+
+
+def make_source_grid(size, seed=0, cols=2, rows=2):
+    """size x size の合成ソースグリッド（RGB の PIL 画像）"""
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray(_checker(size, size, max(8, size // 64), rng), "RGB")
+    draw = ImageDraw.Draw(image)
+    xs = [size * c // cols for c in range(cols + 1)]
+    ys = [size * r // rows for r in range(rows + 1)]
+    for r in range(rows):
+        for c in range(cols):
+            _draw_cell(draw, xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r])
+    return image
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="合成ソースグリッドを生成")
+    parser.add_argument("size", type=int, help="一辺のピクセル数")
+    parser.add_argument("output", help="出力 PNG パス")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cols", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=2)
+    args = parser.parse_args(argv)
+    make_source_grid(args.size, args.seed, args.cols, args.rows).save(args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+生成したアセットとゴールデン画像の知覚的な比較（回帰チェック）
+
+remove_all_checker のしきい値や generate_icons.py の形状を変えると、出荷するアイコンが
+気づかないうちに変わることがある。出力ディレクトリの PNG（サブディレクトリを含む）を
+ゴールデンディレクトリの同じ相対パスの画像と比較し、見た目が変わったものを報告する。
+
+比較の手順（1ファイルごと、ファイル単位でスレッド並列）:
+  1. バイト列が一致すれば合格（決定的なパイプラインではほとんどがここで終わる）
+  2. 両方をデコードし、sRGB を線形化・アルファを乗算して 2x2 平均の縮小ピラミッドを作る
+  3. 粗いレベルから順に、黒・白の背景に合成した色の ΔE（CIE76、Lab）と
+     L* の SSIM（7x7 窓）を計算し、しきい値を超えたらそのレベルで打ち切って不合格
+     （大きく変わった画像は 32px 程度のレベルだけで判定が終わる）
+  4. 最後のフル解像度まで通れば合格
+
+不合格の画像だけ、フル解像度の ΔE を色で表したヒートマップ（ゴールデンの輝度に重ねる）を
+--heatmaps 配下に書き出す。
+
+使い方:
+  npm run icons -- verify assets/images --golden scripts/golden/images
+  npm run icons -- verify build/icon-variants --golden scripts/golden/variants --heatmaps build/verify-diff
+  npm run icons -- verify assets/images --golden scripts/golden/images --update   # ゴールデンを更新
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from .asset_cache import read_bytes
+from .lazy_modules import lazy_import
+from .sinks import encode_png, write_atomic
+
+np = lazy_import("numpy")
+Image = lazy_import("PIL.Image")
+ndimage = lazy_import("scipy.ndimage")
+
+DELTA_E_JND = 2.3           # これを超える ΔE を「見て分かる違い」とする
+MAX_CHANGED = 0.001         # ΔE > DELTA_E_JND の画素の割合の上限
+MAX_DELTA_E = 10.0          # 1画素でもこれを超えたら不合格
+MIN_SSIM = 0.98             # L* の平均 SSIM の下限
+SSIM_WINDOW = 7
+PYRAMID_MIN = 32            # ピラミッドの最も粗いレベルの短辺（px）
+
+# sRGB（0〜255）-> 線形のテーブル
+_LINEAR = None
+
+
+def _srgb_to_linear_table():
+    global _LINEAR
+    if _LINEAR is None:
+        c = np.arange(256, dtype=np.float32) / 255
+        _LINEAR = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4).astype(np.float32)
+    return _LINEAR
+
+
+def premultiplied(image):
+    """PIL 画像 -> (h, w, 4) float32（線形 RGB にアルファを乗算したもの + アルファ）"""
+    data = np.asarray(image.convert("RGBA"))
+    out = np.empty(data.shape, dtype=np.float32)
+    out[:, :, :3] = _srgb_to_linear_table()[data[:, :, :3]]
+    out[:, :, 3] = data[:, :, 3] * np.float32(1 / 255)
+    out[:, :, :3] *= out[:, :, 3:]
+    return out
+
+
+def pyramid(data, min_size=PYRAMID_MIN):
+    """2x2 平均で縮小したレベルのリスト（粗い順、最後がフル解像度）"""
+    levels = [data]
+    while min(levels[-1].shape[:2]) >= 2 * min_size:
+        d = levels[-1]
+        h, w = d.shape[0] // 2, d.shape[1] // 2
+        levels.append(d[:2 * h, :2 * w].reshape(h, 2, w, 2, 4).mean(axis=(1, 3), dtype=np.float32))
+    return levels[::-1]
+
+
+def linear_to_lab(rgb):
+    """線形 sRGB (..., 3) -> CIE Lab（D65）"""
+    m = np.array([[0.4124, 0.3576, 0.1805],
+                  [0.2126, 0.7152, 0.0722],
+                  [0.0193, 0.1192, 0.9505]], dtype=np.float32)
+    xyz = rgb @ m.T
+    xyz /= np.array([0.9505, 1.0, 1.089], dtype=np.float32)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), xyz * 7.787 + 16 / 116)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def _composites(level):
+    """黒背景・白背景に合成した Lab（透過の変化も色の変化として現れる）"""
+    rgb, alpha = level[:, :, :3], level[:, :, 3:]
+    return linear_to_lab(rgb), linear_to_lab(rgb + (1 - alpha))
+
+
+def delta_e(a, b):
+    """2つのレベルの画素ごとの ΔE（黒背景・白背景の大きい方）"""
+    (a_black, a_white), (b_black, b_white) = _composites(a), _composites(b)
+    return np.maximum(np.linalg.norm(a_black - b_black, axis=2), np.linalg.norm(a_white - b_white, axis=2))
+
+
+def ssim(x, y, window=SSIM_WINDOW, data_range=100.0):
+    """2次元配列（L*）の平均 SSIM（窓は一様フィルタ）"""
+    c1, c2 = (0.01 * data_range) ** 2, (0.03 * data_range) ** 2
+    mu_x, mu_y = ndimage.uniform_filter(x, window), ndimage.uniform_filter(y, window)
+    var_x = ndimage.uniform_filter(x * x, window) - mu_x * mu_x
+    var_y = ndimage.uniform_filter(y * y, window) - mu_y * mu_y
+    cov = ndimage.uniform_filter(x * y, window) - mu_x * mu_y
+    s = ((2 * mu_x * mu_y + c1) * (2 * cov + c2)) / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+    return float(s.mean())
+
+
+def compare_images(actual, golden, max_changed=MAX_CHANGED, max_delta_e=MAX_DELTA_E, min_ssim=MIN_SSIM):
+    """
+    2つの PIL 画像を粗いレベルから比較し、しきい値を超えたレベルで打ち切る。
+    戻り値: (合格か, 理由, 判定したレベルの (幅, 高さ), 不合格ならフル解像度の ΔE)
+    """
+    if actual.size != golden.size:
+        return (False, f"サイズが違います: {actual.size[0]}x{actual.size[1]}"
+                       f"（ゴールデン {golden.size[0]}x{golden.size[1]}）", None, None)
+    levels = list(zip(pyramid(premultiplied(actual)), pyramid(premultiplied(golden))))
+    for a, b in levels:
+        de = delta_e(a, b)
+        changed = float((de > DELTA_E_JND).mean())
+        worst = float(de.max())
+        reason = None
+        if changed > max_changed:
+            reason = f"ΔE>{DELTA_E_JND} の画素 {changed:.2%}"
+        elif worst > max_delta_e:
+            reason = f"最大 ΔE {worst:.1f}"
+        else:
+            score = ssim(linear_to_lab(a[:, :, :3] + (1 - a[:, :, 3:]))[:, :, 0],
+                         linear_to_lab(b[:, :, :3] + (1 - b[:, :, 3:]))[:, :, 0])
+            if score < min_ssim:
+                reason = f"SSIM {score:.4f}"
+        if reason is not None:
+            full = de if a is levels[-1][0] else delta_e(*levels[-1])
+            return False, reason, (a.shape[1], a.shape[0]), full
+    return True, f"最大 ΔE {worst:.2f}", (a.shape[1], a.shape[0]), None
+
+
+def heatmap(golden, de):
+    """ΔE を黒 -> 赤 -> 黄で表し、ゴールデンの輝度（暗くしたもの）に重ねた RGB 画像"""
+    base = np.asarray(golden.convert("L"), dtype=np.float32) * 0.35
+    t = np.clip(de / MAX_DELTA_E, 0, 1)
+    out = np.empty(de.shape + (3,), dtype=np.float32)
+    out[:, :, 0] = base + (255 - base) * np.clip(t * 2, 0, 1)
+    out[:, :, 1] = base + (255 - base) * np.clip(t * 2 - 1, 0, 1)
+    out[:, :, 2] = base * (1 - t)
+    out[de <= DELTA_E_JND] = base[de <= DELTA_E_JND, None]
+    return Image.fromarray(out.astype(np.uint8), "RGB")
+
+
+def collect_pngs(directory):
+    """directory 配下の PNG の相対パス（ドットで始まるファイル・ディレクトリは除く）"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.lower().endswith(".png") and not name.startswith("."):
+                paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return paths
+
+
+def verify_file(actual_path, golden_path, **thresholds):
+    """1ファイルの比較。戻り値: (状態, 理由, フル解像度の ΔE か None)。状態は ok / fail / missing"""
+    if not os.path.exists(golden_path):
+        return "missing", "ゴールデンがありません", None
+    actual_bytes, golden_bytes = read_bytes(actual_path), read_bytes(golden_path)
+    if actual_bytes == golden_bytes:
+        return "ok", "バイト一致", None
+    with Image.open(actual_path) as actual, Image.open(golden_path) as golden:
+        actual.load()
+        golden.load()
+        passed, reason, level, de = compare_images(actual, golden, **thresholds)
+    if level is not None:
+        reason = f"{reason}（{level[0]}x{level[1]} で判定）"
+    return ("ok" if passed else "fail"), reason, (None if passed else de)
+
+
+def verify(actual_dir, golden_dir, heatmap_dir=None, workers=None, **thresholds):
+    """
+    actual_dir の全 PNG をゴールデンと比較して結果を表示する。
+    戻り値: 不合格（ゴールデンなし・出力なしを含む）の相対パスのリスト
+    """
+    start = time.perf_counter()
+    names = collect_pngs(actual_dir)
+    golden_only = sorted(set(collect_pngs(golden_dir)) - set(names)) if os.path.isdir(golden_dir) else []
+
+    def check(name):
+        return verify_file(os.path.join(actual_dir, name), os.path.join(golden_dir, name), **thresholds)
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(names)))
+    if workers == 1:
+        results = [check(name) for name in names]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check, names))
+
+    failed = []
+    for name, (status, reason, de) in zip(names, results):
+        if status == "ok":
+            continue
+        failed.append(name)
+        line = f"  不合格: {name}: {reason}"
+        if heatmap_dir and de is not None:
+            path = os.path.join(heatmap_dir, os.path.splitext(name)[0] + ".diff.png")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with Image.open(os.path.join(golden_dir, name)) as golden:
+                write_atomic(path, encode_png(heatmap(golden, de)))
+            line += f" -> {path}"
+        print(line)
+    for name in golden_only:
+        failed.append(name)
+        print(f"  不合格: {name}: 出力がありません（ゴールデンのみ）")
+
+    total = len(names) + len(golden_only)
+    print(f"\n検証: {total - len(failed)}/{total} 合格 ({time.perf_counter() - start:.2f}s)")
+    return failed
+
+
+def update_goldens(actual_dir, golden_dir):
+    """actual_dir の PNG でゴールデンを置き換える（内容が同じものは書かない）"""
+    updated = 0
+    for name in collect_pngs(actual_dir):
+        src, dst = os.path.join(actual_dir, name), os.path.join(golden_dir, name)
+        data = read_bytes(src)
+        if os.path.exists(dst) and read_bytes(dst) == data:
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        write_atomic(dst, data)
+        updated += 1
+        print(f"  更新: {dst}")
+    print(f"ゴールデンを更新しました（{updated}件）")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="生成したアセットをゴールデン画像と知覚的に比較")
+    parser.add_argument("actual", help="比較する出力ディレクトリ（サブディレクトリの PNG も含む）")
+    parser.add_argument("--golden", required=True, help="ゴールデン画像のディレクトリ（同じ相対パスで比較）")
+    parser.add_argument("--heatmaps", default=None, metavar="DIR",
+                        help="不合格の画像の ΔE ヒートマップをこのディレクトリに書き出す")
+    parser.add_argument("--update", action="store_true", help="比較せずにゴールデンを出力で置き換える")
+    parser.add_argument("--max-changed", type=float, default=MAX_CHANGED,
+                        help=f"ΔE>{DELTA_E_JND} の画素の割合の上限 (デフォルト: {MAX_CHANGED})")
+    parser.add_argument("--max-delta-e", type=float, default=MAX_DELTA_E,
+                        help=f"画素ごとの ΔE の上限 (デフォルト: {MAX_DELTA_E})")
+    parser.add_argument("--min-ssim", type=float, default=MIN_SSIM,
+                        help=f"L* の SSIM の下限 (デフォルト: {MIN_SSIM})")
+    parser.add_argument("--workers", type=int, default=None, help="並行に比較するスレッド数 (デフォルト: CPU コア数)")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        update_goldens(args.actual, args.golden)
+        return 0
+    failed = verify(args.actual, args.golden, args.heatmaps, args.workers, max_changed=args.max_changed,
+                    max_delta_e=args.max_delta_e, min_ssim=args.min_ssim)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
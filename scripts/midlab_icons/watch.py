@@ -0,0 +1,171 @@
+"""
+watch モード: ソースグリッドやジェネレータのパラメータを監視し、入力が変わった出力だけを再生成する
+
+常駐プロセスなので、インタプリタの起動と numpy / scipy / Pillow の import は最初の1回だけ。
+  - ソース指定時（split）: ソースグリッドと process_icons.py / pixel_masks.py を監視
+  - ソース省略時（generate）: generate_icons.py / logo_scene.py / sdf_render.py
+    （カラーパレット・デザイン定数・描画関数）を監視
+変更は interval 秒ごとに mtime とサイズをポーリングして検出し、書き込み途中を拾わないよう
+値が落ち着いてから処理する。監視しているモジュールのソースが変わったら importlib.reload で
+読み直す（構文エラーなどで読み込めなければエラーを表示して次の保存を待つ）。
+
+デコード済みのソース配列とエンコード済みの出力は MemoryLRU（--memory MB）に保持する。
+キーは出力のキャッシュキーなので:
+  - 入力が変わっていない出力は .icon-cache.json で従来どおりスキップ
+  - 関数・パラメータだけ変えた場合はソースのデコードを省略
+  - 以前の状態に戻した場合は処理・描画・エンコードも省略して書き込むだけ
+
+時間の大半は PNG のエンコードなので、watch モードは zlib 圧縮レベル 1 で保存する
+（ピクセルは同一でファイルは 2 割ほど大きい）。圧縮レベルはキャッシュキーに含まれるため、
+コミット前に通常の split / generate を実行すると既定の圧縮で保存し直される。
+
+使い方:
+  npm run icons -- watch scripts/source_icon.png
+  npm run icons -- watch --renderer sdf     # ジェネレータの定数を編集しながら確認
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from .asset_cache import AssetCache, MemoryLRU
+from .generate_icons import RENDERERS
+
+# 監視して変更時に読み直すモジュール（依存される側が先）
+SPLIT_MODULES = ("pixel_masks", "process_icons")
+GENERATE_MODULES = ("generate_icons", "logo_scene", "sdf_render")
+
+DEFAULT_INTERVAL = 0.2      # ポーリング間隔（秒）
+SETTLE_INTERVAL = 0.05      # 変更検出後、mtime・サイズが落ち着いたか確認する間隔（秒）
+DEFAULT_MEMORY_MB = 1024
+WATCH_COMPRESS_LEVEL = 1
+
+
+def _module(name):
+    return importlib.import_module(f"{__package__}.{name}")
+
+
+def _snapshot(paths):
+    """パスごとの (mtime_ns, サイズ)。存在しないファイルは None"""
+    state = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            state.append(None)
+        else:
+            state.append((st.st_mtime_ns, st.st_size))
+    return tuple(state)
+
+
+def _wait_for_change(paths, last, interval):
+    """いずれかのファイルが変わり、書き込みが落ち着くまで待って新しいスナップショットを返す"""
+    while True:
+        time.sleep(interval)
+        current = _snapshot(paths)
+        if current == last:
+            continue
+        while True:
+            time.sleep(SETTLE_INTERVAL)
+            settled = _snapshot(paths)
+            if settled == current:
+                return current
+            current = settled
+
+
+def _reload(names):
+    """モジュールを順に読み直す。失敗したらエラーを表示して False"""
+    try:
+        for name in names:
+            importlib.reload(_module(name))
+    except Exception:
+        print("モジュールの読み直しに失敗しました:")
+        traceback.print_exc(limit=1)
+        return False
+    return True
+
+
+def _run_split(source, output_dir, copy_dir, optimize, memo, compress_level):
+    cache = AssetCache.for_directory(output_dir)
+    _module("process_icons").process_source_image(
+        source, output_dir, copy_dir=copy_dir, verbose=False, cache=cache, optimize=optimize, memo=memo,
+        compress_level=compress_level,
+    )
+    return cache.summary()
+
+
+def _run_generate(output_dir, renderer, optimize, memo, compress_level):
+    return _module("generate_icons").generate_assets(
+        output_dir, renderer=renderer, optimize=optimize, memo=memo, compress_level=compress_level,
+    ).summary()
+
+
+def watch(source=None, output_dir="assets/images", copy_dir="assets", renderer="pil", optimize=False,
+          interval=DEFAULT_INTERVAL, memory_mb=DEFAULT_MEMORY_MB, compress_level=WATCH_COMPRESS_LEVEL):
+    """Ctrl+C まで監視と再生成を繰り返す"""
+    memo = MemoryLRU(int(memory_mb * (1 << 20)))
+    names = SPLIT_MODULES if source else GENERATE_MODULES
+    here = os.path.dirname(os.path.abspath(__file__))
+    module_paths = [os.path.join(here, f"{name}.py") for name in names]
+    paths = ([source] if source else []) + module_paths
+    print(f"監視中: {source or 'ジェネレータのパラメータ'} -> {output_dir}（Ctrl+C で終了）")
+
+    last = _snapshot(paths)
+    first = True
+    try:
+        while True:
+            if not first:
+                current = _wait_for_change(paths, last, interval)
+                modules_changed = current[-len(module_paths):] != last[-len(module_paths):]
+                last = current
+                if modules_changed and not _reload(names):
+                    continue
+            first = False
+            if source and last[0] is None:
+                print(f"ソースがありません: {source}（作成されるまで待機）")
+                continue
+
+            start = time.perf_counter()
+            try:
+                if source:
+                    summary = _run_split(source, output_dir, copy_dir, optimize, memo, compress_level)
+                else:
+                    summary = _run_generate(output_dir, renderer, optimize, memo, compress_level)
+            except Exception:
+                print("再生成に失敗しました:")
+                traceback.print_exc()
+                continue
+            print(f"[{time.strftime('%H:%M:%S')}] 更新完了 ({time.perf_counter() - start:.2f}s) "
+                  f"{summary} / {memo.summary()}")
+    except KeyboardInterrupt:
+        print("\n監視を終了しました")
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="ソースグリッド・ジェネレータのパラメータを監視して再生成")
+    parser.add_argument("source", nargs="?", help="ソースグリッド（省略時は generate_icons のパラメータを監視）")
+    parser.add_argument("--out", default="assets/images", help="出力先 (デフォルト: assets/images)")
+    parser.add_argument("--copy-dir", default="assets",
+                        help="ソース指定時、出力を内容が変わったときだけコピーする先 (デフォルト: assets)")
+    parser.add_argument("--no-copy", action="store_true", help="--copy-dir へのコピーを行わない")
+    parser.add_argument("--renderer", choices=RENDERERS, default="pil",
+                        help="ソース省略時の描画方式（generate と同じ）")
+    parser.add_argument("--optimize", action="store_true", help="保存した PNG を可逆最適化する")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"ポーリング間隔（秒、デフォルト: {DEFAULT_INTERVAL}）")
+    parser.add_argument("--memory", type=float, default=DEFAULT_MEMORY_MB, metavar="MB",
+                        help=f"デコード済みソース・出力を保持するメモリの上限 (デフォルト: {DEFAULT_MEMORY_MB}MB)")
+    parser.add_argument("--compress-level", type=int, default=WATCH_COMPRESS_LEVEL, choices=range(10),
+                        metavar="0-9", help=f"PNG の zlib 圧縮レベル (デフォルト: {WATCH_COMPRESS_LEVEL})")
+    args = parser.parse_args(argv)
+
+    watch(args.source, args.out, None if args.no_copy else args.copy_dir, args.renderer, args.optimize,
+          args.interval, args.memory, args.compress_level)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
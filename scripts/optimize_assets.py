@@ -0,0 +1,10 @@
+"""
+互換用の入口: midlab_icons/optimize_assets.py の main() を実行する（python3 -m midlab_icons optimize と同じ）
+"""
+
+import sys
+
+from midlab_icons.optimize_assets import main
+
+if __name__ == "__main__":
+    sys.exit(main())